@@ -0,0 +1,275 @@
+# anytoggl/cache.py
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+import duckdb
+import httpx
+from loguru import logger
+
+CACHE_STATUS_HEADER = "X-Anytoggl-Cache"
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """Caching policy for GET requests whose path matches ``pattern``.
+
+    Writes (POST/PUT/PATCH/DELETE) to the cached path, a sub-path or a parent
+    path invalidate the entry; ``invalidated_by`` adds patterns for writes to
+    unrelated paths that still change the cached listing.
+    """
+
+    pattern: str
+    ttl: float
+    invalidated_by: tuple[str, ...] = ()
+
+    def matches(self, path: str) -> bool:
+        return re.search(self.pattern, path) is not None
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    stored_at: float
+
+    @property
+    def etag(self) -> str | None:
+        return next((v for k, v in self.headers if k.lower() == "etag"), None)
+
+    @property
+    def last_modified(self) -> str | None:
+        return next((v for k, v in self.headers if k.lower() == "last-modified"), None)
+
+    def to_response(self, status: str) -> httpx.Response:
+        headers = [
+            (k, v) for k, v in self.headers if k.lower() != CACHE_STATUS_HEADER.lower()
+        ]
+        headers.append((CACHE_STATUS_HEADER, status))
+        return httpx.Response(self.status_code, headers=headers, content=self.content)
+
+
+class HttpCache:
+    """Response store kept in memory and optionally persisted to DuckDB."""
+
+    def __init__(self, db_path: str | None = None):
+        """Initialize HTTP cache.
+
+        Args:
+            db_path: Optional DuckDB file so cached responses survive restarts
+        """
+        self.db_path = db_path
+        self._entries: dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            self._load_db()
+
+    def _load_db(self):
+        """Create the cache table and load persisted entries into memory."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                stored_at DOUBLE NOT NULL
+            )
+        """)
+        rows = conn.execute("""
+            SELECT key, url, status_code, headers, content, stored_at
+            FROM http_cache
+        """).fetchall()
+        conn.close()
+
+        for key, url, status_code, headers, content, stored_at in rows:
+            self._entries[key] = CachedResponse(
+                url,
+                status_code,
+                [tuple(h) for h in json.loads(headers)],
+                content,
+                stored_at,
+            )
+        logger.debug(f"Loaded {len(rows)} cached responses from {self.db_path}")
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            if not self.db_path:
+                return
+            conn = duckdb.connect(self.db_path)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO http_cache
+                    (key, url, status_code, headers, content, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                [
+                    key,
+                    entry.url,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.stored_at,
+                ],
+            )
+            conn.close()
+
+    def invalidate(self, predicate) -> int:
+        """Drop every entry whose URL satisfies ``predicate``.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if predicate(e.url)]
+            for key in keys:
+                del self._entries[key]
+            if keys and self.db_path:
+                conn = duckdb.connect(self.db_path)
+                conn.executemany(
+                    "DELETE FROM http_cache WHERE key = ?", [[k] for k in keys]
+                )
+                conn.close()
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.db_path:
+                conn = duckdb.connect(self.db_path)
+                conn.execute("DELETE FROM http_cache")
+                conn.close()
+
+
+def _is_within(path: str, parent: str) -> bool:
+    return path == parent or path.startswith(parent.rstrip("/") + "/")
+
+
+_cache = HttpCache()
+
+
+def get_cache() -> HttpCache:
+    """Get the process-wide HTTP cache."""
+    return _cache
+
+
+def configure_cache(db_path: str | None):
+    """Replace the process-wide HTTP cache, optionally persisted on disk."""
+    global _cache
+    _cache = HttpCache(db_path)
+
+
+class CachingTransport(httpx.BaseTransport):
+    """Transport wrapper serving cacheable GETs from the HTTP cache.
+
+    Fresh entries are answered locally. Expired entries are revalidated with
+    ``If-None-Match``/``If-Modified-Since`` and a 304 refreshes them without
+    transferring the body. Successful writes invalidate affected entries.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        rules: list[CacheRule],
+        cache: HttpCache | None = None,
+    ):
+        self.transport = transport
+        self.rules = rules
+        self._cache = cache
+
+    @property
+    def cache(self) -> HttpCache:
+        return self._cache or get_cache()
+
+    def _rule(self, path: str) -> CacheRule | None:
+        return next((r for r in self.rules if r.matches(path)), None)
+
+    def _key(self, request: httpx.Request) -> str:
+        # Responses differ per credential, keep tenants apart
+        identity = request.headers.get("Authorization", "")
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        return f"{digest} {request.url}"
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            response = self.transport.handle_request(request)
+            if (
+                request.method in ("POST", "PUT", "PATCH", "DELETE")
+                and response.status_code < 400
+            ):
+                self._invalidate(request.url.path)
+            return response
+
+        rule = self._rule(request.url.path)
+        if rule is None:
+            return self.transport.handle_request(request)
+
+        key = self._key(request)
+        entry = self.cache.get(key)
+        # "Cache-Control: no-cache" forces revalidation of a fresh entry
+        fresh = entry is not None and time.time() - entry.stored_at < rule.ttl
+        if fresh and "no-cache" not in request.headers.get("Cache-Control", ""):
+            return entry.to_response("hit")
+
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.transport.handle_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            entry.stored_at = time.time()
+            self.cache.put(key, entry)
+            return entry.to_response("revalidated")
+
+        if response.status_code != 200:
+            return response
+
+        # Store the decoded body, without the headers describing its encoding
+        content = response.read()
+        response.close()
+        headers = [
+            (k, v)
+            for k, v in response.headers.multi_items()
+            if k.lower() not in ("content-encoding", "content-length")
+        ]
+        entry = CachedResponse(
+            str(request.url), response.status_code, headers, content, time.time()
+        )
+        self.cache.put(key, entry)
+        return entry.to_response("miss")
+
+    def _invalidate(self, write_path: str):
+        extra = [
+            r.pattern
+            for r in self.rules
+            if any(re.search(p, write_path) for p in r.invalidated_by)
+        ]
+
+        def affected(url: str) -> bool:
+            path = httpx.URL(url).path
+            if _is_within(path, write_path) or _is_within(write_path, path):
+                return True
+            return any(re.search(p, path) for p in extra)
+
+        dropped = self.cache.invalidate(affected)
+        if dropped:
+            logger.debug(
+                f"Invalidated {dropped} cached responses after write to {write_path}"
+            )
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,239 @@
+# anytoggl/cassette.py
+import base64
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+import httpx
+from loguru import logger
+
+SCRUBBED = "***"
+SECRET_HEADERS = {"authorization", "cookie", "set-cookie", "x-api-key"}
+SECRET_FIELDS = {
+    "access_token",
+    "api_token",
+    "client_secret",
+    "password",
+    "refresh_token",
+    "secret",
+    "token",
+    "username",
+}
+
+
+class CassetteMissError(LookupError):
+    """A replayed request has no recorded exchange left to answer it."""
+
+
+def _scrub_json(data):
+    if isinstance(data, dict):
+        return {
+            k: SCRUBBED if k.lower() in SECRET_FIELDS else _scrub_json(v)
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [_scrub_json(v) for v in data]
+    return data
+
+
+def scrub_body(content: bytes, content_type: str) -> bytes:
+    """Blank out credential fields in a JSON or form-encoded body."""
+    if not content:
+        return content
+    if "json" in content_type:
+        try:
+            return json.dumps(_scrub_json(json.loads(content))).encode()
+        except ValueError:
+            return content
+    if "x-www-form-urlencoded" in content_type:
+        pairs = parse_qsl(content.decode(), keep_blank_values=True)
+        return urlencode(
+            [(k, SCRUBBED if k.lower() in SECRET_FIELDS else v) for k, v in pairs]
+        ).encode()
+    return content
+
+
+def scrub_headers(headers: httpx.Headers) -> list[tuple[str, str]]:
+    return [
+        (k, SCRUBBED if k.lower() in SECRET_HEADERS else v)
+        for k, v in headers.multi_items()
+        if k.lower() not in ("content-encoding", "content-length")
+    ]
+
+
+def _encode(content: bytes) -> dict:
+    try:
+        return {"text": content.decode()}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode()}
+
+
+def _decode(body: dict) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return body.get("text", "").encode()
+
+
+class Cassette:
+    """Recorded HTTP exchanges, one JSON object per line.
+
+    Secrets are scrubbed before anything reaches the file. Replay answers a
+    request with the next unused exchange for the same method and path,
+    preferring one with the same query string, so request bodies that embed
+    the current time still match.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._exchanges: dict[tuple[str, str], list[dict]] = defaultdict(list)
+
+    def clear(self):
+        """Start a new recording, discarding any previous one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+
+    def load(self):
+        """Read every exchange of a recording for replay."""
+        self._exchanges.clear()
+        with self.path.open() as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    request = exchange["request"]
+                    key = (request["method"], request["path"])
+                    self._exchanges[key].append(exchange)
+        count = sum(len(v) for v in self._exchanges.values())
+        logger.info(f"Loaded {count} recorded HTTP exchanges from {self.path}")
+
+    def record(self, request: httpx.Request, response: httpx.Response, elapsed: float):
+        content_type = request.headers.get("Content-Type", "")
+        exchange = {
+            "request": {
+                "method": request.method,
+                "host": request.url.host,
+                "path": request.url.path,
+                "query": request.url.query.decode(),
+                "headers": scrub_headers(request.headers),
+                "body": _encode(scrub_body(request.content, content_type)),
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": scrub_headers(response.headers),
+                "body": _encode(
+                    scrub_body(
+                        response.content, response.headers.get("Content-Type", "")
+                    )
+                ),
+            },
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock, self.path.open("a") as f:
+            f.write(json.dumps(exchange) + "\n")
+
+    def take(self, request: httpx.Request) -> dict:
+        """Pop the recorded exchange answering a request."""
+        query = request.url.query.decode()
+        with self._lock:
+            candidates = self._exchanges.get((request.method, request.url.path))
+            if not candidates:
+                raise CassetteMissError(
+                    f"No recorded exchange left for {request.method} {request.url}"
+                )
+            index = next(
+                (i for i, e in enumerate(candidates) if e["request"]["query"] == query),
+                0,
+            )
+            return candidates.pop(index)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Passes requests through and writes every exchange to a cassette."""
+
+    def __init__(self, transport: httpx.BaseTransport, cassette: Cassette):
+        self.transport = transport
+        self.cassette = cassette
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self.transport.handle_request(request)
+        # Keep the decoded body so the recording is readable and replayable
+        content = response.read()
+        elapsed = time.perf_counter() - started
+        response = httpx.Response(
+            response.status_code,
+            headers=[
+                (k, v)
+                for k, v in response.headers.multi_items()
+                if k.lower() not in ("content-encoding", "content-length")
+            ],
+            content=content,
+            request=request,
+        )
+        self.cassette.record(request, response, elapsed)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Answers requests from a cassette instead of the network.
+
+    ``latency`` scales the recorded response times: 0 replays as fast as
+    possible, 1 reproduces the original timings.
+    """
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0):
+        self.cassette = cassette
+        self.latency = latency
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        exchange = self.cassette.take(request)
+        if self.latency > 0:
+            time.sleep(exchange["elapsed"] * self.latency)
+        recorded = exchange["response"]
+        return httpx.Response(
+            recorded["status"],
+            headers=recorded["headers"],
+            content=_decode(recorded["body"]),
+            request=request,
+        )
+
+
+_cassette: Cassette | None = None
+_mode: str | None = None
+_latency = 0.0
+
+
+def configure_cassette(path: str | None, mode: str | None, latency: float = 0.0):
+    """Route every API client built afterwards through a cassette.
+
+    Args:
+        path: Cassette file, or None to talk to the network as usual
+        mode: "record" to capture live exchanges, "replay" to serve them
+        latency: Replay only, multiplier applied to recorded response times
+    """
+    global _cassette, _mode, _latency
+    if path is None:
+        _cassette, _mode = None, None
+        return
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    _cassette, _mode, _latency = Cassette(path), mode, latency
+    if mode == "record":
+        _cassette.clear()
+        logger.info(f"Recording HTTP exchanges to {path}")
+    else:
+        _cassette.load()
+
+
+def cassette_transport(transport: httpx.BaseTransport) -> httpx.BaseTransport:
+    """Wrap or replace a client's base transport according to the cassette mode."""
+    if _mode == "replay":
+        return ReplayTransport(_cassette, _latency)
+    if _mode == "record":
+        return RecordingTransport(transport, _cassette)
+    return transport
@@ -0,0 +1,126 @@
+# anytoggl/checkpoint.py
+import threading
+import time
+import duckdb
+from loguru import logger
+
+
+class SyncCheckpoint:
+    """Per-task progress of the Track sync that must survive a failed cycle.
+
+    * Pending links: a time entry was created for a task but the Anytype
+      write-back of its ID has not succeeded yet. The next attempt links the
+      existing entry instead of creating a duplicate.
+    * Retry set: tasks whose sync failed, each with its own exponential
+      backoff, so one broken task neither aborts a cycle nor is hammered
+      every cycle.
+
+    Everything else a cycle does is recomputed from local state (entry
+    index, write log), so a restarted cycle only acts on pending items.
+    With a ``db_path`` the checkpoint survives restarts.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        base_delay: float = 60,
+        max_delay: float = 3600,
+    ):
+        """Initialize sync checkpoint.
+
+        Args:
+            db_path: Optional DuckDB file persisting the checkpoint
+            base_delay: Seconds before the first retry of a failed task
+            max_delay: Upper bound of the doubling retry delay
+        """
+        self.db_path = db_path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pending_links: dict[str, int] = {}
+        # task ID → (failed attempts, wall-clock time of the next attempt)
+        self.failures: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            self._load_db()
+
+    def _load_db(self):
+        """Create the checkpoint table and load the persisted state."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_checkpoint (
+                anytype_id TEXT PRIMARY KEY,
+                pending_entry_id BIGINT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                retry_at DOUBLE NOT NULL DEFAULT 0
+            )
+        """)
+        rows = conn.execute("SELECT * FROM sync_checkpoint").fetchall()
+        conn.close()
+        for anytype_id, entry_id, attempts, retry_at in rows:
+            if entry_id is not None:
+                self.pending_links[anytype_id] = entry_id
+            if attempts:
+                self.failures[anytype_id] = (attempts, retry_at)
+        if rows:
+            logger.info(
+                f"Resuming sync checkpoint: {len(self.pending_links)} pending links, "
+                f"{len(self.failures)} tasks to retry"
+            )
+
+    def _save(self, anytype_id: str):
+        if not self.db_path:
+            return
+        entry_id = self.pending_links.get(anytype_id)
+        attempts, retry_at = self.failures.get(anytype_id, (0, 0.0))
+        conn = duckdb.connect(self.db_path)
+        if entry_id is None and not attempts:
+            conn.execute(
+                "DELETE FROM sync_checkpoint WHERE anytype_id = ?", [anytype_id]
+            )
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_checkpoint VALUES (?, ?, ?, ?)",
+                [anytype_id, entry_id, attempts, retry_at],
+            )
+        conn.close()
+
+    def link_pending(self, anytype_id: str, entry_id: int):
+        """Remember an entry created for a task, before writing its ID back."""
+        with self._lock:
+            self.pending_links[anytype_id] = entry_id
+            self._save(anytype_id)
+
+    def pending_link(self, anytype_id: str) -> int | None:
+        """Entry already created for a task whose write-back is pending."""
+        return self.pending_links.get(anytype_id)
+
+    def link_done(self, anytype_id: str):
+        """Forget a pending link once Anytype stores the entry ID."""
+        with self._lock:
+            if self.pending_links.pop(anytype_id, None) is not None:
+                self._save(anytype_id)
+
+    def is_due(self, anytype_id: str) -> bool:
+        """Whether a task may be attempted now (not backing off)."""
+        failure = self.failures.get(anytype_id)
+        return failure is None or failure[1] <= time.time()
+
+    def failed(self, anytype_id: str) -> float:
+        """Record a failed attempt, returning the seconds until the next one."""
+        with self._lock:
+            attempts = self.failures.get(anytype_id, (0, 0.0))[0] + 1
+            delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+            self.failures[anytype_id] = (attempts, time.time() + delay)
+            self._save(anytype_id)
+        return delay
+
+    def succeeded(self, anytype_id: str):
+        """Take a task out of the retry set."""
+        with self._lock:
+            if self.failures.pop(anytype_id, None) is not None:
+                self._save(anytype_id)
+
+    def waiting(self) -> int:
+        """Number of failed tasks still backing off."""
+        now = time.time()
+        return sum(1 for _, retry_at in self.failures.values() if retry_at > now)
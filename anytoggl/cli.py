@@ -1,20 +1,52 @@
 # anytoggl/cli.py
+import math
+import tempfile
 import typer
 import time
+from datetime import datetime, timezone
+from pathlib import Path
 from environs import Env
+from loguru import logger
 from anytoggl.sync_engine import SyncEngine
 from anytoggl.plan_sync_engine import PlanSyncEngine
 from anytoggl.clients.anytype import AnytypeClient
 from anytoggl.clients.toggl import TogglClient
 from anytoggl.clients.toggl_plan import TogglPlanClient
 from anytoggl.scheduler import TaskScheduler
+from anytoggl.tenants import load_tenants
+from anytoggl.daemon import TenantDaemon
+from anytoggl.cache import configure_cache
+from anytoggl.cassette import configure_cassette
+from anytoggl.http import DeadlineExceeded, cycle_deadline
+from anytoggl.quota import QuotaExceededError
+from anytoggl.webhooks import WebhookServer, build_event, send_event
+from anytoggl.timer_watch import TimerWatcher
+from anytoggl.trigger import TriggerServer, send_trigger
+from anytoggl.profiling import CycleProfiler
+from anytoggl.warehouse import EntryWarehouse
+from anytoggl.entry_index import EntryIndex
+from anytoggl.echo import WriteLog
+from anytoggl.creation import CreationPolicy
+from anytoggl.checkpoint import SyncCheckpoint
+from anytoggl.rollups import TimeRollups
+from anytoggl.tiers import TaskTiers
+from anytoggl.probes import ProbeResult, plan_cycle_cost, probe, track_cycle_cost
+from anytoggl.transport import keep_alive_between
 
 app = typer.Typer()
 env = Env()
 env.read_env()
+configure_cache(env.str("HTTP_CACHE_DB", None))
 
 
-def build_engine() -> SyncEngine:
+def build_tiers() -> TaskTiers:
+    return TaskTiers(
+        warm_every=env.int("TIER_WARM_EVERY", 4),
+        cold_every=env.int("TIER_COLD_EVERY", 24),
+    )
+
+
+def build_engine(isolated: bool = False) -> SyncEngine:
     anytype = AnytypeClient(
         base_url=env.str("ANYTYPE_API_URL"),
         token=env.str("ANYTYPE_TOKEN"),
@@ -23,11 +55,34 @@ def build_engine() -> SyncEngine:
     toggl = TogglClient(
         api_token=env.str("TOGGL_API_TOKEN"),
         workspace_id=env.int("TOGGL_WORKSPACE_ID"),
+        quota_per_hour=env.int("TOGGL_QUOTA_PER_HOUR", 30),
+        user_quota_per_hour=env.int("TOGGL_USER_QUOTA_PER_HOUR", 30),
+    )
+    creation = CreationPolicy.parse(env.str("TOGGL_CREATE_STATUSES", "In Progress"))
+    if isolated:
+        # Keep local state out of recorded/replayed cycles
+        return SyncEngine(anytype, toggl, creation=creation, tiers=build_tiers())
+    cache_dir = Path.home() / ".anytoggl"
+    cache_dir.mkdir(exist_ok=True)
+    # Write log and checkpoint live next to the entry index they go with
+    entries_db = env.str("ENTRY_INDEX_DB", str(cache_dir / "entries.db"))
+    return SyncEngine(
+        anytype,
+        toggl,
+        EntryWarehouse(env.str("WAREHOUSE_DB", None)),
+        EntryIndex(entries_db),
+        writes=WriteLog(entries_db),
+        creation=creation,
+        checkpoint=SyncCheckpoint(entries_db),
+        rollups=TimeRollups(entries_db),
+        tiers=build_tiers(),
     )
-    return SyncEngine(anytype, toggl)
 
 
-def build_plan_engine() -> PlanSyncEngine:
+def build_plan_engine(isolated: bool = False) -> PlanSyncEngine:
+    token_db_path = None
+    if isolated:
+        token_db_path = str(Path(tempfile.mkdtemp(prefix="anytoggl-")) / "tokens.db")
     anytype = AnytypeClient(
         base_url=env.str("ANYTYPE_API_URL"),
         token=env.str("ANYTYPE_TOKEN"),
@@ -39,6 +94,7 @@ def build_plan_engine() -> PlanSyncEngine:
         client_secret=env.str("TOGGL_PLAN_CLIENT_SECRET"),
         username=env.str("TOGGL_PLAN_USERNAME"),
         password=env.str("TOGGL_PLAN_PASSWORD"),
+        token_db_path=token_db_path,
     )
     scheduler = TaskScheduler(
         start_hour=env.int("SCHEDULE_START_HOUR", 8),
@@ -51,66 +107,369 @@ def build_plan_engine() -> PlanSyncEngine:
         scheduler,
         default_project_name=env.str("TOGGL_PLAN_DEFAULT_PROJECT", "anytoggl"),
         default_estimated_minutes=env.int("TOGGL_PLAN_DEFAULT_MINUTES", 60),
+        tiers=build_tiers(),
     )
 
 
+def use_cassette(record: str | None, replay: str | None, latency: float) -> bool:
+    """Set up HTTP record/replay, returning whether it is active.
+
+    Engines of an active cassette must be built isolated: recordings must not
+    depend on what persistent caches, token dbs or indexes hold.
+    """
+    if record and replay:
+        raise typer.BadParameter("--record and --replay are mutually exclusive")
+    if not (record or replay):
+        return False
+    configure_cassette(record or replay, "record" if record else "replay", latency)
+    configure_cache(None)
+    return True
+
+
+def run_cycle(
+    engine,
+    profile: str | None,
+    slow_http_ms: float,
+    name: str,
+    budget: float | None = None,
+) -> str | None:
+    """Run one sync cycle, optionally under the cycle profiler.
+
+    With a ``budget`` the cycle is cut off after that many seconds; writes
+    it did not get to are left for the next cycle.
+
+    Returns:
+        Why the cycle was cut short, or None if it ran to the end
+    """
+    try:
+        with cycle_deadline(budget):
+            if profile is None:
+                engine.run()
+                return None
+            with CycleProfiler(profile, slow_http_ms=slow_http_ms, name=name):
+                engine.run()
+    except DeadlineExceeded as e:
+        logger.warning(f"{e} ({budget}s budget), retrying next cycle")
+        return f"{e} ({budget}s budget)"
+    except QuotaExceededError as e:
+        logger.warning(f"{e}, retrying next cycle")
+        return str(e)
+    return None
+
+
 @app.command()
-def once():
+def once(
+    profile: str | None = None,
+    slow_http_ms: float = 500,
+    record: str | None = None,
+    replay: str | None = None,
+    replay_latency: float = 0.0,
+):
     """Run Toggl Track sync once"""
-    engine = build_engine()
-    engine.run()
+    isolated = use_cassette(record, replay, replay_latency)
+    engine = build_engine(isolated)
+    run_cycle(engine, profile, slow_http_ms, "track")
+
+
+def build_timer_watcher(
+    engine: SyncEngine, interval: int, sync_interval: int | None = None
+) -> TimerWatcher:
+    """Build the running-timer watcher, next to a full sync every ``sync_interval``."""
+    # The sync reads /me/time_entries once a cycle; the rest covers the
+    # hourly project listing, pending-link lookups and triggered cycles
+    reserve = math.ceil(3600 / sync_interval) + 4 if sync_interval else 0
+    return TimerWatcher(
+        engine.anytype,
+        engine.toggl,
+        interval=interval,
+        quota_per_hour=env.int("TIMER_QUOTA_PER_HOUR", 60),
+        reserve_per_hour=reserve,
+    )
+
+
+def start_trigger(port: int, debounce: float) -> TriggerServer | None:
+    """Start the local sync trigger API, unless ``port`` is 0."""
+    if not port:
+        return None
+    trigger = TriggerServer(port=port, debounce=debounce)
+    trigger.start()
+    return trigger
+
+
+def wait_for_next_cycle(
+    engine,
+    trigger: TriggerServer | None,
+    interval: int,
+    profile: str | None,
+    slow_http_ms: float,
+    name: str,
+    budget: float | None = None,
+):
+    """Sleep until the next poll, serving triggered syncs meanwhile."""
+    if trigger is None:
+        time.sleep(interval)
+        return
+    trigger.serve_until(
+        time.monotonic() + interval,
+        lambda: run_cycle(engine, profile, slow_http_ms, name, budget),
+        engine.sync_task,
+    )
 
 
 @app.command()
-def run(interval: int = 300):
+def run(
+    interval: int = 300,
+    timer_interval: int = 0,
+    profile: str | None = None,
+    slow_http_ms: float = 500,
+    trigger_port: int = 0,
+    debounce: float = 0.5,
+    cycle_budget: int = 0,
+):
     """Run Toggl Track sync continuously"""
+    # A cycle may take at most one interval unless told otherwise
+    budget = cycle_budget or interval
+    keep_alive_between(interval)
     engine = build_engine()
+    if timer_interval > 0:
+        # Fast path for the running timer between full syncs
+        build_timer_watcher(engine, timer_interval, interval).start()
+    trigger = start_trigger(trigger_port, debounce)
     while True:
-        engine.run()
-        time.sleep(interval)
+        run_cycle(engine, profile, slow_http_ms, "track", budget)
+        wait_for_next_cycle(
+            engine, trigger, interval, profile, slow_http_ms, "track", budget
+        )
+
+
+@app.command()
+def serve(host: str = "127.0.0.1", port: int = 8787, safety_interval: int = 3600):
+    """Sync Toggl Track on webhook events, with a slow full-sync safety net"""
+    engine = build_engine()
+    engine.run()
+    WebhookServer(
+        engine,
+        secret=env.str("TOGGL_WEBHOOK_SECRET"),
+        host=host,
+        port=port,
+        safety_interval=safety_interval,
+    ).serve_forever()
+
+
+@app.command()
+def webhook_emit(
+    entry_id: int,
+    description: str = "anytoggl test",
+    running: bool = False,
+    action: str = "updated",
+    url: str = "http://127.0.0.1:8787",
+):
+    """Send a signed test time entry event to a local `serve` receiver"""
+    now = datetime.now(timezone.utc)
+    entry = {
+        "id": entry_id,
+        "description": description,
+        "start": now.isoformat(),
+        "stop": None if running else now.isoformat(),
+        "duration": -1 if running else 0,
+        "at": now.isoformat(),
+    }
+    response = send_event(
+        url, env.str("TOGGL_WEBHOOK_SECRET"), build_event(entry, action)
+    )
+    print(f"{response.status_code} {response.text}")
+
+
+@app.command()
+def sync_task(anytype_id: str, track: bool = True, plan: bool | None = None):
+    """Sync a single Anytype task with Toggl Track and/or Toggl Plan"""
+    if plan is None:
+        # Plan sync only when it is configured
+        plan = env.str("TOGGL_PLAN_WORKSPACE_ID", None) is not None
+    if track:
+        build_engine().sync_task(anytype_id)
+    if plan:
+        build_plan_engine().sync_task(anytype_id)
 
 
 @app.command()
-def doctor():
-    """Check Toggl Track configuration"""
+def backfill_rollups(days: int = 365):
+    """Add older Toggl history to the tracked-time rollups, then sync once"""
+    engine = build_engine()
+    listed = engine.rollups.backfill(engine.toggl, days)
+    print(f"{listed} time entries from the last {days} days rolled up")
+    run_cycle(engine, None, 500, "track")
+
+
+@app.command()
+def migrate_entries(delete: bool = False, dry_run: bool = False):
+    """Unlink empty Toggl entries of tasks the creation policy would skip"""
+    engine = build_engine()
+    unlinked, deleted = engine.migrate_premature_entries(delete, dry_run)
+    if dry_run:
+        print(f"{unlinked} tasks would be unlinked")
+    else:
+        print(f"{unlinked} tasks unlinked, {deleted} Toggl entries deleted")
+
+
+@app.command()
+def watch_timer(interval: int = 60):
+    """Reflect Toggl timer starts/stops onto Anytype status, nothing else"""
+    keep_alive_between(interval)
+    build_timer_watcher(build_engine(), interval).run()
+
+
+def probe_anytype(anytype: AnytypeClient, samples: int) -> ProbeResult:
+    """Probe the Anytype local API with a cheap authenticated space lookup."""
+    url = str(anytype.client.base_url).rstrip("/") + f"/v1/spaces/{anytype.space_id}"
+    headers = {"Authorization": anytype.client.headers["Authorization"]}
+    return probe("Anytype", "anytype", url, samples, headers=headers)
+
+
+def print_probes(results: list[ProbeResult]) -> bool:
+    """Print probe results, returning whether every dependency answered."""
+    for result in results:
+        print(f"{'✓' if result.ok else '✗'} {result.summary()}")
+    return all(result.ok for result in results)
+
+
+@app.command()
+def doctor(bench: bool = False, samples: int = 3, interval: int = 300):
+    """Check Toggl Track configuration, with --bench probe latency and quota"""
     try:
         engine = build_engine()
         print("✓ Toggl Track configuration OK")
     except Exception as e:
         print(f"✗ Toggl Track configuration error: {e}")
         raise typer.Exit(code=1)
+    if not bench:
+        return
+
+    print("\nLatency (median of fresh connections):")
+    anytype_probe = probe_anytype(engine.anytype, samples)
+    track_probe = probe(
+        "Toggl Track", "toggl_track", str(engine.toggl.client.base_url), samples
+    )
+    reachable = print_probes([anytype_probe, track_probe])
+
+    if track_probe.ok:
+        # One request on the user quota
+        print("\nToggl quota (/me/quota):")
+        try:
+            for quota in engine.toggl.get_quota():
+                print(
+                    f"  Organization {quota.get('organization_id')}: "
+                    f"{quota.get('remaining')}/{quota.get('total')} left, "
+                    f"resets in {quota.get('resets_in_secs')}s"
+                )
+        except Exception as e:
+            print(f"✗ Could not read the quota: {e}")
+            reachable = False
+
+    total, unlinked = engine.warehouse.task_counts()
+    cost = track_cycle_cost(
+        interval,
+        engine.warehouse.unlinked_by_status(),
+        engine.creation,
+        user_limit=engine.toggl.quota["user"].limit,
+        org_limit=engine.toggl.quota["org"].limit,
+    )
+    print(f"\nCycle cost at --interval {interval}:")
+    if total:
+        print(f"  {total} cached tasks, {unlinked} without a time entry")
+    else:
+        print("  No cached task counts yet, run `once` to fill them")
+    print(f"  {cost.reads_per_cycle} Toggl read(s) per cycle")
+    print(f"  ~{cost.reads_per_hour} reads/hour of {cost.read_limit} (user quota)")
+    print(
+        f"  {cost.pending_writes} pending creates, {cost.write_limit}/hour (org quota)"
+    )
+    if cost.deferred_writes:
+        print(
+            f"  {cost.deferred_writes} unlinked tasks wait until work starts "
+            f"({engine.creation})"
+        )
+    for warning in cost.warnings():
+        print(f"⚠ {warning}")
+    if not reachable:
+        raise typer.Exit(code=1)
 
 
 @app.command()
-def plan_once():
+def plan_once(
+    profile: str | None = None,
+    slow_http_ms: float = 500,
+    record: str | None = None,
+    replay: str | None = None,
+    replay_latency: float = 0.0,
+):
     """Run Toggl Plan sync once"""
-    engine = build_plan_engine()
-    engine.run()
+    isolated = use_cassette(record, replay, replay_latency)
+    engine = build_plan_engine(isolated)
+    run_cycle(engine, profile, slow_http_ms, "plan")
 
 
 @app.command()
-def plan_run(interval: int = 300):
+def plan_run(
+    interval: int = 300,
+    profile: str | None = None,
+    slow_http_ms: float = 500,
+    trigger_port: int = 0,
+    debounce: float = 0.5,
+    cycle_budget: int = 0,
+):
     """Run Toggl Plan sync continuously"""
+    budget = cycle_budget or interval
+    keep_alive_between(interval)
     engine = build_plan_engine()
+    trigger = start_trigger(trigger_port, debounce)
     while True:
-        engine.run()
-        time.sleep(interval)
+        run_cycle(engine, profile, slow_http_ms, "plan", budget)
+        wait_for_next_cycle(
+            engine, trigger, interval, profile, slow_http_ms, "plan", budget
+        )
+
+
+@app.command()
+def trigger(
+    ids: list[str] = typer.Argument(None),
+    url: str = "http://127.0.0.1:8788",
+    wait: bool = True,
+):
+    """Ask a `run`/`plan-run --trigger-port` loop to sync all or some tasks now"""
+    response = send_trigger(url, ids, wait)
+    print(f"{response.status_code} {response.text}")
+    if response.status_code >= 400:
+        raise typer.Exit(code=1)
 
 
 @app.command()
-def plan_doctor():
-    """Check Toggl Plan configuration"""
+def plan_doctor(bench: bool = False, samples: int = 3, interval: int = 300):
+    """Check Toggl Plan configuration, with --bench probe latency and cycle cost"""
     try:
         engine = build_plan_engine()
-        print("✓ Toggl Plan configuration OK")
+        print("✓ Toggl Plan configuration OK (authenticated)")
 
-        # Test Anytype connection
-        tasks = engine.anytype.search_tasks()
-        print(f"✓ Found {len(tasks)} Anytype tasks tagged with 'Toggl'")
+        # Cheap probes instead of listing every task on both sides
+        reachable = print_probes(
+            [
+                probe_anytype(engine.anytype, samples if bench else 1),
+                probe(
+                    "Toggl Plan",
+                    "toggl_plan",
+                    str(engine.toggl_plan.client.base_url),
+                    samples if bench else 1,
+                ),
+            ]
+        )
+        if not reachable:
+            raise typer.Exit(code=1)
 
-        # Test Toggl Plan connection
-        plan_tasks = engine.toggl_plan.list_tasks()
-        print(f"✓ Found {len(plan_tasks)} existing Toggl Plan tasks")
+        if bench:
+            cost = plan_cycle_cost(interval)
+            print(f"\nCycle cost at --interval {interval}:")
+            print(f"  {cost.reads_per_cycle} Toggl Plan read(s) per cycle")
+            print(f"  ~{cost.reads_per_hour} reads/hour (no published limit)")
 
         # Show scheduler config
         print("\nScheduling configuration:")
@@ -126,10 +485,38 @@ def plan_doctor():
         print("  → Tasks with Anytype project will use that project")
         print("  → Tasks without project will use default project")
 
+    except typer.Exit:
+        raise
     except Exception as e:
         print(f"✗ Toggl Plan configuration error: {e}")
         raise typer.Exit(code=1)
 
 
+@app.command()
+def report(by: str = "project", since: str | None = None):
+    """Report tracked hours from the local warehouse, without API calls"""
+    warehouse = EntryWarehouse(env.str("WAREHOUSE_DB", None))
+    try:
+        columns, rows = warehouse.report(
+            by, datetime.fromisoformat(since) if since else None
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    table = [columns] + [[str(v) for v in row] for row in rows]
+    widths = [max(len(r[i]) for r in table) for i in range(len(columns))]
+    for i, row in enumerate(table):
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip())
+        if i == 0:
+            print("  ".join("-" * w for w in widths))
+
+
+@app.command()
+def daemon(config: str = "tenants.toml", workers: int = 4):
+    """Run Track/Plan sync for every tenant in a config file in one process"""
+    tenants = load_tenants(config)
+    TenantDaemon(tenants, workers=workers).run()
+
+
 if __name__ == "__main__":
     app()
@@ -1,24 +1,39 @@
 # anytoggl/anytype_client.py
 import httpx
+from anytoggl.cache import CacheRule
 from anytoggl.http import RETRY
 from anytoggl.models import AnytypeTask
+from anytoggl.transport import build_client
+
+CACHE_RULES = [
+    # Linked objects (projects) are fetched for every task but rarely change
+    CacheRule(r"^/v1/spaces/[^/]+/objects/[^/]+$", ttl=600),
+]
 
 
 class AnytypeClient:
-    def __init__(self, base_url: str, token: str, space_id: str):
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        space_id: str,
+        transport: httpx.BaseTransport | None = None,
+    ):
         self.space_id = space_id
-        self.client = httpx.Client(
-            base_url=base_url,
+        self.client = build_client(
+            "anytype",
+            base_url,
+            transport=transport,
+            cache_rules=CACHE_RULES,
             headers={
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json",
             },
-            timeout=10,
         )
 
     @RETRY
-    def _get(self, url: str):
-        r = self.client.get(url)
+    def _get(self, url: str, headers: dict | None = None):
+        r = self.client.get(url, headers=headers)
         r.raise_for_status()
         return r
 
@@ -48,95 +63,110 @@ class AnytypeClient:
         # Filter results to only include tasks with "Toggl" tag
         tasks = []
         for o in r.json().get("data", []):
-            # Extract properties
-            props = o.get("properties", [])
-
-            # Check if task has Toggl tag (in properties with key='tag')
-            tag_prop = next((p for p in props if p.get("key") == "tag"), None)
-            if tag_prop:
-                multi_select = tag_prop.get("multi_select", [])
-                tag_names = [t.get("name", "") for t in multi_select]
-            else:
-                tag_names = []
-
-            if "Toggl" not in tag_names:
-                continue
-
-            # Extract project name from linked_projects property
-            project_prop = next(
-                (p for p in props if p.get("key") == "linked_projects"), None
-            )
-            project_name = None
-            if project_prop and project_prop.get("objects"):
-                project_ids = project_prop.get("objects", [])
-                if project_ids:
-                    # IDs are strings, need to fetch the object to get name
-                    first_project_id = project_ids[0]
-                    if isinstance(first_project_id, str):
-                        try:
-                            project_obj = self.get_object(first_project_id)
-                            project_name = project_obj.get("name")
-                        except Exception:
-                            pass  # Skip if can't fetch project
-                    elif isinstance(first_project_id, dict):
-                        project_name = first_project_id.get("name")
-
-            # Extract done/status
-            done_prop = next((p for p in props if p.get("key") == "done"), None)
-            is_done = done_prop.get("checkbox", False) if done_prop else False
-
-            status_prop = next((p for p in props if p.get("key") == "status"), None)
-            if is_done:
-                status = "Done"
-            elif status_prop and status_prop.get("select"):
-                status = status_prop["select"].get("name", "To Do")
-            else:
-                status = "To Do"
-
-            # Extract toggl_track_id if exists (renamed from toggl_id)
-            toggl_track_prop = next(
-                (p for p in props if p.get("key") == "toggl_track_id"), None
-            )
-            toggl_track_id = toggl_track_prop.get("text") if toggl_track_prop else None
-
-            # Extract toggl_plan_id if exists
-            toggl_plan_prop = next(
-                (p for p in props if p.get("key") == "toggl_plan_id"), None
-            )
-            toggl_plan_id = toggl_plan_prop.get("text") if toggl_plan_prop else None
-
-            # Extract start_date if exists
-            start_date_prop = next(
-                (p for p in props if p.get("key") == "start_date"), None
-            )
-            start_date = start_date_prop.get("date") if start_date_prop else None
-
-            # Extract end_date if exists
-            end_date_prop = next((p for p in props if p.get("key") == "end_date"), None)
-            end_date = end_date_prop.get("date") if end_date_prop else None
-
-            # Extract last_modified_date
-            modified_prop = next(
-                (p for p in props if p.get("key") == "last_modified_date"), None
-            )
-            last_modified = modified_prop.get("date") if modified_prop else None
-
-            tasks.append(
-                AnytypeTask(
-                    id=o["id"],
-                    name=o.get("name", ""),
-                    description=o.get("snippet"),
-                    status=status,
-                    project=project_name,
-                    toggl_track_id=toggl_track_id,
-                    toggl_plan_id=toggl_plan_id,
-                    last_modified=last_modified,
-                    start_date=start_date,
-                    end_date=end_date,
-                )
-            )
+            task = self._parse_task(o)
+            if task is not None:
+                tasks.append(task)
         return tasks
 
+    def get_task(self, object_id: str) -> AnytypeTask | None:
+        """Get a single task, or None if it is not tagged with 'Toggl'."""
+        # Tasks change often, always revalidate a cached copy
+        r = self._get(
+            f"/v1/spaces/{self.space_id}/objects/{object_id}",
+            headers={"Cache-Control": "no-cache"},
+        )
+        return self._parse_task(r.json().get("object", {}))
+
+    def _parse_task(self, o: dict) -> AnytypeTask | None:
+        """Build a task from an API object, or None if not tagged with 'Toggl'."""
+        # Extract properties
+        props = o.get("properties", [])
+
+        # Check if task has Toggl tag (in properties with key='tag')
+        tag_prop = next((p for p in props if p.get("key") == "tag"), None)
+        if tag_prop:
+            multi_select = tag_prop.get("multi_select", [])
+            tag_names = [t.get("name", "") for t in multi_select]
+        else:
+            tag_names = []
+
+        if "Toggl" not in tag_names:
+            return None
+
+        # Extract project name from linked_projects property
+        project_prop = next(
+            (p for p in props if p.get("key") == "linked_projects"), None
+        )
+        project_name = None
+        project_object_id = None
+        if project_prop and project_prop.get("objects"):
+            project_ids = project_prop.get("objects", [])
+            if project_ids:
+                # IDs are strings, need to fetch the object to get name
+                first_project_id = project_ids[0]
+                if isinstance(first_project_id, str):
+                    project_object_id = first_project_id
+                    try:
+                        project_obj = self.get_object(first_project_id)
+                        project_name = project_obj.get("name")
+                    except Exception:
+                        pass  # Skip if can't fetch project
+                elif isinstance(first_project_id, dict):
+                    project_object_id = first_project_id.get("id")
+                    project_name = first_project_id.get("name")
+
+        # Extract done/status
+        done_prop = next((p for p in props if p.get("key") == "done"), None)
+        is_done = done_prop.get("checkbox", False) if done_prop else False
+
+        status_prop = next((p for p in props if p.get("key") == "status"), None)
+        if is_done:
+            status = "Done"
+        elif status_prop and status_prop.get("select"):
+            status = status_prop["select"].get("name", "To Do")
+        else:
+            status = "To Do"
+
+        # Extract toggl_track_id if exists (renamed from toggl_id)
+        toggl_track_prop = next(
+            (p for p in props if p.get("key") == "toggl_track_id"), None
+        )
+        toggl_track_id = toggl_track_prop.get("text") if toggl_track_prop else None
+
+        # Extract toggl_plan_id if exists
+        toggl_plan_prop = next(
+            (p for p in props if p.get("key") == "toggl_plan_id"), None
+        )
+        toggl_plan_id = toggl_plan_prop.get("text") if toggl_plan_prop else None
+
+        # Extract start_date if exists
+        start_date_prop = next((p for p in props if p.get("key") == "start_date"), None)
+        start_date = start_date_prop.get("date") if start_date_prop else None
+
+        # Extract end_date if exists
+        end_date_prop = next((p for p in props if p.get("key") == "end_date"), None)
+        end_date = end_date_prop.get("date") if end_date_prop else None
+
+        # Extract last_modified_date
+        modified_prop = next(
+            (p for p in props if p.get("key") == "last_modified_date"), None
+        )
+        last_modified = modified_prop.get("date") if modified_prop else None
+
+        return AnytypeTask(
+            id=o["id"],
+            name=o.get("name", ""),
+            description=o.get("snippet"),
+            status=status,
+            project=project_name,
+            project_object_id=project_object_id,
+            toggl_track_id=toggl_track_id,
+            toggl_plan_id=toggl_plan_id,
+            last_modified=last_modified,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
     def update_task(self, object_id: str, details: dict):
         """Update a task in the configured space."""
         self._patch(f"/v1/spaces/{self.space_id}/objects/{object_id}", details)
@@ -1,22 +1,54 @@
 # anytoggl/toggl_client.py
+from datetime import datetime
+from urllib.parse import urlencode
 import httpx
+from anytoggl.cache import CacheRule
 from anytoggl.http import RETRY
 from anytoggl.models import TogglTimeEntry
+from anytoggl.quota import QuotaBudget, quota_for
+from anytoggl.transport import build_client
+
+CACHE_RULES = [
+    CacheRule(
+        r"/me/projects/paginated$",
+        ttl=3600,
+        invalidated_by=(r"/workspaces/\d+/projects",),
+    ),
+]
 
 
 class TogglClient:
-    def __init__(self, token: str, workspace_id: int):
+    def __init__(
+        self,
+        api_token: str,
+        workspace_id: int,
+        quota_per_hour: int = 30,
+        transport: httpx.BaseTransport | None = None,
+        user_quota_per_hour: int = 30,
+    ):
         self.wid = workspace_id
-        self.client = httpx.Client(
-            base_url="https://api.track.toggl.com/api/v9",
-            auth=(token, "api_token"),
+        # Organization and user endpoints have separate hourly quotas
+        self.quota = {
+            "org": quota_for(api_token, "org", quota_per_hour),
+            "user": quota_for(api_token, "user", user_quota_per_hour),
+        }
+        self.client = build_client(
+            "toggl_track",
+            "https://api.track.toggl.com/api/v9",
+            transport=transport,
+            cache_rules=CACHE_RULES,
+            auth=(api_token, "api_token"),
             headers={"Content-Type": "application/json"},
-            timeout=10,
+            quota=self._quota_for,
         )
 
+    def _quota_for(self, request: httpx.Request) -> QuotaBudget:
+        path = request.url.path.removeprefix("/api/v9")
+        return self.quota["user" if path.startswith("/me") else "org"]
+
     @RETRY
-    def _get(self, url: str):
-        r = self.client.get(url)
+    def _get(self, url: str, headers: dict | None = None):
+        r = self.client.get(url, headers=headers)
         r.raise_for_status()
         return r
 
@@ -32,10 +64,37 @@ class TogglClient:
         r.raise_for_status()
         return r
 
-    def list_projects(self) -> dict[str, int]:
+    @RETRY
+    def _delete(self, url: str):
+        r = self.client.delete(url)
+        r.raise_for_status()
+        return r
+
+    def iter_projects(self, per_page: int = 200, revalidate: bool = False):
+        """Iterate over all projects of the workspace, one page at a time.
+
+        With ``revalidate``, pages are fetched from Toggl even while the HTTP
+        cache holds a fresh copy.
+        """
+        headers = {"Cache-Control": "no-cache"} if revalidate else None
+        start_project_id = 0
+        while True:
+            r = self._get(
+                "/me/projects/paginated"
+                f"?start_project_id={start_project_id}&per_page={per_page}",
+                headers=headers,
+            )
+            page = r.json() or []
+            for p in page:
+                if p.get("workspace_id", self.wid) == self.wid:
+                    yield p
+            if len(page) < per_page:
+                return
+            start_project_id = page[-1]["id"] + 1
+
+    def list_projects(self, revalidate: bool = False) -> dict[str, int]:
         """List all projects in the workspace."""
-        r = self._get(f"/workspaces/{self.wid}/projects")
-        return {p["name"]: p["id"] for p in r.json()}
+        return {p["name"]: p["id"] for p in self.iter_projects(revalidate=revalidate)}
 
     def create_project(self, name: str) -> int:
         """Create a new project in the workspace."""
@@ -45,12 +104,50 @@ class TogglClient:
         )
         return r.json()["id"]
 
-    def list_time_entries(self) -> list[TogglTimeEntry]:
-        """List recent time entries for the user."""
-        r = self._get("/me/time_entries")
+    def list_time_entries(
+        self,
+        since: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[TogglTimeEntry]:
+        """List recent time entries for the user.
+
+        With ``since``, only entries modified after that time are returned,
+        including deleted ones (marked by ``server_deleted_at``). With
+        ``start`` and ``end``, the entries started within that range.
+        """
+        url = "/me/time_entries"
+        if since is not None:
+            url += f"?since={int(since.timestamp())}"
+        elif start is not None and end is not None:
+            url += "?" + urlencode(
+                {"start_date": start.isoformat(), "end_date": end.isoformat()}
+            )
+        r = self._get(url)
         data = r.json() or []
         return [TogglTimeEntry(**t) for t in data]
 
+    def get_quota(self) -> list[dict]:
+        """Get the API quota Toggl reports for each organization of the user."""
+        r = self._get("/me/quota")
+        return r.json() or []
+
+    def get_current_time_entry(self) -> TogglTimeEntry | None:
+        """Get the running time entry, or None if no timer is running."""
+        r = self._get("/me/time_entries/current")
+        data = r.json()
+        return TogglTimeEntry(**data) if data else None
+
+    def get_time_entry(self, time_entry_id: int) -> TogglTimeEntry | None:
+        """Get a single time entry, or None if it no longer exists."""
+        try:
+            r = self._get(f"/me/time_entries/{time_entry_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 410):
+                return None
+            raise
+        return TogglTimeEntry(**r.json())
+
     def create_time_entry(self, payload: dict) -> TogglTimeEntry:
         """Create a new time entry in the workspace."""
         # Ensure workspace_id is set
@@ -62,9 +159,18 @@ class TogglClient:
         )
         return TogglTimeEntry(**r.json())
 
-    def update_time_entry(self, time_entry_id: int, payload: dict):
-        """Update an existing time entry."""
-        self._put(
+    def update_time_entry(self, time_entry_id: int, payload: dict) -> TogglTimeEntry:
+        """Update an existing time entry, returning it as stored by Toggl."""
+        r = self._put(
             f"/workspaces/{self.wid}/time_entries/{time_entry_id}",
             payload,
         )
+        return TogglTimeEntry(**r.json())
+
+    def delete_time_entry(self, time_entry_id: int):
+        """Delete a time entry; one that is already gone counts as deleted."""
+        try:
+            self._delete(f"/workspaces/{self.wid}/time_entries/{time_entry_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (404, 410):
+                raise
@@ -4,10 +4,16 @@ import httpx
 import duckdb
 from datetime import datetime, timedelta
 from pathlib import Path
+from anytoggl.cache import CacheRule
 from anytoggl.http import RETRY
 from anytoggl.models import TogglPlanTask
+from anytoggl.transport import build_client
 from loguru import logger
 
+CACHE_RULES = [
+    CacheRule(r"^/api/v5/\d+/projects$", ttl=3600),
+]
+
 
 class TogglPlanClient:
     """Client for interacting with Toggl Plan API v5 with automatic OAuth authentication and token caching."""
@@ -20,6 +26,7 @@ class TogglPlanClient:
         username: str,
         password: str,
         token_db_path: str | None = None,
+        transport: httpx.BaseTransport | None = None,
     ):
         """Initialize Toggl Plan client with OAuth credentials.
 
@@ -30,6 +37,7 @@ class TogglPlanClient:
             username: Toggl Plan user email
             password: Toggl Plan user password
             token_db_path: Optional path to token cache database (defaults to ~/.anytoggl/tokens.db)
+            transport: Optional HTTP transport, e.g. to share a connection pool
         """
         self.workspace_id = workspace_id
         self.client_id = client_id
@@ -48,10 +56,12 @@ class TogglPlanClient:
         self.token_db_path = token_db_path
         self._init_token_db()
 
-        self.client = httpx.Client(
-            base_url="https://api.plan.toggl.com/api/v5",
+        self.client = build_client(
+            "toggl_plan",
+            "https://api.plan.toggl.com/api/v5",
+            transport=transport,
+            cache_rules=CACHE_RULES,
             headers={"Content-Type": "application/json"},
-            timeout=10,
         )
 
         # Obtain access token on initialization
@@ -119,13 +129,7 @@ class TogglPlanClient:
             self.client.headers["Authorization"] = f"Bearer {self.access_token}"
 
             # Get user profile
-            profile_response = httpx.get(
-                "https://api.plan.toggl.com/api/v5/me",
-                headers=self.client.headers,
-                timeout=10,
-            )
-            profile_response.raise_for_status()
-            profile = profile_response.json()
+            profile = self._get("/me").json()
             self.user_id = profile["id"]
 
             logger.info(f"Authenticated with cached token (User ID: {self.user_id})")
@@ -138,8 +142,8 @@ class TogglPlanClient:
         credentials = f"{self.client_id}:{self.client_secret}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
 
-        response = httpx.post(
-            "https://api.plan.toggl.com/api/v5/authenticate/token",
+        response = self.client.post(
+            "/authenticate/token",
             headers={
                 "Authorization": f"Basic {encoded_credentials}",
                 "Content-Type": "application/x-www-form-urlencoded",
@@ -149,7 +153,6 @@ class TogglPlanClient:
                 "username": self.username,
                 "password": self.password,
             },
-            timeout=10,
         )
         response.raise_for_status()
 
@@ -167,13 +170,7 @@ class TogglPlanClient:
         self.client.headers["Authorization"] = f"Bearer {self.access_token}"
 
         # Get user profile to retrieve user_id (required for task creation)
-        profile_response = httpx.get(
-            "https://api.plan.toggl.com/api/v5/me",
-            headers=self.client.headers,
-            timeout=10,
-        )
-        profile_response.raise_for_status()
-        profile = profile_response.json()
+        profile = self._get("/me").json()
         self.user_id = profile["id"]
 
         logger.info(
@@ -231,6 +228,23 @@ class TogglPlanClient:
         data = r.json() or []
         return [TogglPlanTask(**task) for task in data]
 
+    def get_task(self, task_id: int) -> TogglPlanTask | None:
+        """Get a single task.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            TogglPlanTask object, or None if the task no longer exists
+        """
+        try:
+            r = self._get(f"/{self.workspace_id}/tasks/{task_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 410):
+                return None
+            raise
+        return TogglPlanTask(**r.json())
+
     def create_task(self, payload: dict) -> TogglPlanTask:
         """Create a new task in the workspace.
 
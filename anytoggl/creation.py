@@ -0,0 +1,47 @@
+# anytoggl/creation.py
+from anytoggl.models import AnytypeTask, TogglTimeEntry
+
+# Spec value creating entries for tasks of every status
+ALL = "*"
+
+
+class CreationPolicy:
+    """Decides which unlinked tasks get a Toggl time entry right away.
+
+    By default entries are only created when work starts, i.e. when a task
+    is "In Progress"; a tagged backlog costs no Toggl writes until then.
+    """
+
+    def __init__(self, statuses: list[str] | None = None):
+        """Initialize creation policy.
+
+        Args:
+            statuses: Statuses that get an entry immediately, None for all
+        """
+        self.statuses = None if statuses is None else frozenset(statuses)
+
+    @classmethod
+    def parse(cls, spec: str) -> "CreationPolicy":
+        """Build a policy from a comma-separated status list, or "*" for all."""
+        if spec.strip() == ALL:
+            return cls(None)
+        return cls([s.strip() for s in spec.split(",") if s.strip()])
+
+    def creates(self, status: str | None) -> bool:
+        """Whether unlinked tasks of a status get their time entry now."""
+        return self.statuses is None or status in self.statuses
+
+    def should_create(self, task: AnytypeTask) -> bool:
+        """Whether an unlinked task gets its time entry now."""
+        return self.creates(task.status)
+
+    def is_premature(self, task: AnytypeTask, entry: TogglTimeEntry) -> bool:
+        """Whether a linked entry is an empty one this policy would not create.
+
+        Zero-duration entries of tasks outside the policy were created for
+        tasks nobody tracked time against.
+        """
+        return entry.duration == 0 and not self.should_create(task)
+
+    def __str__(self) -> str:
+        return ALL if self.statuses is None else ", ".join(sorted(self.statuses))
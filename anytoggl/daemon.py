@@ -0,0 +1,123 @@
+# anytoggl/daemon.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from anytoggl.http import DeadlineExceeded, cycle_deadline
+from anytoggl.plan_sync_engine import PlanSyncEngine
+from anytoggl.quota import QuotaExceededError
+from anytoggl.sync_engine import SyncEngine
+from anytoggl.tenants import TenantConfig, build_tenant_engines
+from anytoggl.transport import close_transports, keep_alive_between
+
+
+class TenantState:
+    """Scheduling state of one tenant inside the daemon."""
+
+    def __init__(self, config: TenantConfig):
+        self.config = config
+        self.engine: SyncEngine | None = None
+        self.plan_engine: PlanSyncEngine | None = None
+        self.next_due = 0.0
+        self.running = False
+        self.failures = 0
+
+
+class TenantDaemon:
+    """Runs the sync cycles of many tenants inside one process.
+
+    Due tenants are dispatched oldest-deadline first onto a bounded worker
+    pool, with at most one cycle in flight per tenant, so a slow tenant holds
+    a single worker and never delays the others beyond their fair turn.
+    """
+
+    def __init__(self, tenants: list[TenantConfig], workers: int = 4):
+        """Initialize tenant daemon.
+
+        Args:
+            tenants: Tenant configurations to serve
+            workers: Maximum number of tenant cycles running concurrently
+        """
+        self.states = [TenantState(t) for t in tenants]
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="tenant"
+        )
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._in_flight = 0
+
+    def _run_tenant(self, state: TenantState):
+        name = state.config.name
+        started = time.monotonic()
+        budget = state.config.cycle_budget or state.config.interval
+        wait = state.config.interval
+        with logger.contextualize(tenant=name), cycle_deadline(budget):
+            try:
+                if state.engine is None and state.plan_engine is None:
+                    state.engine, state.plan_engine = build_tenant_engines(state.config)
+                if state.engine is not None:
+                    state.engine.run()
+                if state.plan_engine is not None:
+                    state.plan_engine.run()
+                state.failures = 0
+                logger.info(
+                    f"Tenant '{name}' cycle finished in {time.monotonic() - started:.1f}s"
+                )
+            except DeadlineExceeded as e:
+                # Slow, not broken: no backoff, the next cycle picks up the rest
+                logger.warning(f"Tenant '{name}' cycle cut off: {e}")
+            except QuotaExceededError as e:
+                # Throttled, not broken: wait for the quota, without backoff
+                logger.warning(f"Tenant '{name}' cycle cut off: {e}")
+                wait = max(wait, e.resets_in)
+            except Exception as e:
+                state.failures += 1
+                logger.error(f"Tenant '{name}' cycle failed: {e}")
+            finally:
+                with self._lock:
+                    # Back off repeated failures up to ten intervals
+                    backoff = min(2 ** max(state.failures - 1, 0), 10)
+                    state.next_due = time.monotonic() + wait * backoff
+                    state.running = False
+                    self._in_flight -= 1
+                self._wake.set()
+
+    def _dispatch_due(self) -> float:
+        """Start cycles for due tenants and return seconds until the next one."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [s for s in self.states if not s.running]
+            for state in sorted(idle, key=lambda s: s.next_due):
+                if state.next_due > now or self._in_flight >= self.workers:
+                    break
+                # An exhausted Toggl quota only defers the writes, inside the
+                # cycle; Anytype pulls and reads on other quotas still run
+                state.running = True
+                self._in_flight += 1
+                self._executor.submit(self._run_tenant, state)
+
+            if self._in_flight >= self.workers:
+                # Woken up as soon as a worker frees up
+                return 60.0
+            pending = [s.next_due for s in self.states if not s.running]
+        return max(0.0, min(pending) - now) if pending else 60.0
+
+    def run(self):
+        """Serve all tenants until stop() is called."""
+        logger.info(f"Serving {len(self.states)} tenants with {self.workers} workers")
+        if self.states:
+            keep_alive_between(max(s.config.interval for s in self.states))
+        try:
+            while not self._stop.is_set():
+                wait = self._dispatch_due()
+                self._wake.wait(timeout=wait)
+                self._wake.clear()
+        finally:
+            self._executor.shutdown(wait=True)
+            close_transports()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
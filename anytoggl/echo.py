@@ -0,0 +1,155 @@
+# anytoggl/echo.py
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import duckdb
+from loguru import logger
+from anytoggl import bulk
+from anytoggl.models import AnytypeTask, TogglTimeEntry
+
+# Origin of the content a write carried
+ANYTYPE = "anytype"
+TOGGL = "toggl"
+
+LOG_COLUMNS = {
+    "anytype_id": "TEXT",
+    "origin": "TEXT",
+    "anytype_hash": "TEXT",
+    "toggl_hash": "TEXT",
+    "toggl_at": "DOUBLE",
+}
+
+
+def _hash(values: list) -> str:
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()[:16]
+
+
+def anytype_fingerprint(task: AnytypeTask) -> str:
+    """Hash of the task fields a push sends to Toggl."""
+    return _hash([task.name, task.project])
+
+
+def toggl_fingerprint(entry: TogglTimeEntry) -> str:
+    """Hash of the entry fields a pull applies to Anytype."""
+    return _hash([entry.description, entry.duration < 0, entry.stop is not None])
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class WriteRecord:
+    """State of both sides right after the engine synced a task."""
+
+    origin: str
+    anytype_hash: str
+    toggl_hash: str
+    toggl_at: datetime
+
+
+class WriteLog:
+    """Remembers the engine's own writes so their echoes are not synced back.
+
+    Every write bumps the timestamp of the side it lands on: a pull into
+    Anytype makes the task look newer than its entry, a push to Toggl makes
+    the entry look newer than its task. A side that looks newer but still
+    carries the content the engine last synced is such an echo, not an edit.
+    With a ``db_path`` the log survives restarts: records are kept in memory
+    and written by ``flush``, once per cycle. Records lost to a crash
+    before the flush only cost one extra sync of their tasks.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        """Initialize write log.
+
+        Args:
+            db_path: Optional DuckDB file persisting the log
+        """
+        self.db_path = db_path
+        self.records: dict[str, WriteRecord] = {}
+        # Task IDs recorded since the last flush
+        self._unsaved: set[str] = set()
+        self._lock = threading.Lock()
+        if db_path:
+            self._load_db()
+
+    def _load_db(self):
+        """Create the log table and load the persisted records."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS write_log (
+                anytype_id TEXT PRIMARY KEY,
+                origin TEXT NOT NULL,
+                anytype_hash TEXT NOT NULL,
+                toggl_hash TEXT NOT NULL,
+                toggl_at DOUBLE NOT NULL
+            )
+        """)
+        rows = conn.execute("SELECT * FROM write_log").fetchall()
+        conn.close()
+        for anytype_id, origin, anytype_hash, toggl_hash, toggl_at in rows:
+            self.records[anytype_id] = WriteRecord(
+                origin,
+                anytype_hash,
+                toggl_hash,
+                datetime.fromtimestamp(toggl_at, timezone.utc),
+            )
+        logger.debug(f"Loaded {len(rows)} write records from {self.db_path}")
+
+    def record(
+        self, origin: str, task: AnytypeTask, entry: TogglTimeEntry
+    ) -> WriteRecord:
+        """Remember the state both sides were left in by a write.
+
+        Args:
+            origin: Side the written content came from (ANYTYPE or TOGGL)
+            task: Anytype task as it is after the write
+            entry: Toggl entry as it is after the write
+
+        Returns:
+            The stored record
+        """
+        record = WriteRecord(
+            origin, anytype_fingerprint(task), toggl_fingerprint(entry), entry.at
+        )
+        with self._lock:
+            self.records[task.id] = record
+            if self.db_path:
+                self._unsaved.add(task.id)
+        return record
+
+    def flush(self):
+        """Persist the records made since the last flush, in one statement."""
+        with self._lock:
+            if not self._unsaved:
+                return
+            rows = [
+                (
+                    task_id,
+                    self.records[task_id].origin,
+                    self.records[task_id].anytype_hash,
+                    self.records[task_id].toggl_hash,
+                    _aware(self.records[task_id].toggl_at).timestamp(),
+                )
+                for task_id in self._unsaved
+            ]
+            conn = duckdb.connect(self.db_path)
+            bulk.upsert(conn, "write_log", LOG_COLUMNS, rows)
+            conn.close()
+            self._unsaved.clear()
+
+    def is_echo(self, task: AnytypeTask, entry: TogglTimeEntry) -> bool:
+        """Whether the newer side only reflects the engine's last write."""
+        record = self.records.get(task.id)
+        if record is None or not task.last_modified:
+            return False
+        if _aware(task.last_modified) > _aware(entry.at):
+            return anytype_fingerprint(task) == record.anytype_hash
+        if _aware(entry.at) > _aware(task.last_modified):
+            if _aware(entry.at) <= _aware(record.toggl_at):
+                return True
+            return toggl_fingerprint(entry) == record.toggl_hash
+        return False
@@ -0,0 +1,199 @@
+# anytoggl/entry_index.py
+import threading
+from datetime import datetime, timedelta, timezone
+import duckdb
+from loguru import logger
+from anytoggl import bulk
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.models import TogglTimeEntry
+
+
+class EntryIndex:
+    """Local copy of the user's Toggl Track time entries, kept by delta fetches.
+
+    The first refresh lists recent entries; later ones only ask Toggl for
+    entries modified since the high-water mark (the newest ``at`` fetched)
+    and merge them in, dropping entries Toggl reports as deleted. Entries
+    pushed by webhooks or single-task syncs are merged without moving the
+    mark, so the next delta still covers everything edited meanwhile.
+
+    Every ``full_refresh_after`` seconds the recent entries are listed
+    again and replace the index, which drops entries that aged out of the
+    listing or whose deletion no delta reported. With a ``db_path`` the
+    index and its mark survive restarts; only the rows a merge changed are
+    written.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        overlap: float = 60,
+        full_refresh_after: float = 7 * 86400,
+    ):
+        """Initialize entry index.
+
+        Args:
+            db_path: Optional DuckDB file persisting the index
+            overlap: Seconds subtracted from the mark to absorb clock skew
+            full_refresh_after: Seconds after a full listing at which the
+                next refresh lists all recent entries again
+        """
+        self.db_path = db_path
+        self.overlap = overlap
+        self.full_refresh_after = full_refresh_after
+        self.entries: dict[int, TogglTimeEntry] = {}
+        self.high_water: datetime | None = None
+        # When the last full listing was fetched
+        self.last_full: datetime | None = None
+        # Whether the last refresh replaced the index with a full listing
+        self.last_refresh_full = False
+        self._lock = threading.Lock()
+        if db_path:
+            self._load_db()
+
+    def _load_db(self):
+        """Create the index tables and load the persisted entries."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entry_index (
+                id BIGINT PRIMARY KEY,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entry_index_state (
+                id INTEGER PRIMARY KEY,
+                high_water DOUBLE NOT NULL
+            )
+        """)
+        conn.execute(
+            "ALTER TABLE entry_index_state ADD COLUMN IF NOT EXISTS last_full DOUBLE"
+        )
+        rows = conn.execute("SELECT data FROM entry_index").fetchall()
+        state = conn.execute(
+            "SELECT high_water, last_full FROM entry_index_state WHERE id = 1"
+        ).fetchone()
+        conn.close()
+
+        self.entries = {}
+        for (data,) in rows:
+            entry = TogglTimeEntry.model_validate_json(data)
+            self.entries[entry.id] = entry
+        if state:
+            self.high_water = datetime.fromtimestamp(state[0], timezone.utc)
+            if state[1] is not None:
+                self.last_full = datetime.fromtimestamp(state[1], timezone.utc)
+        logger.debug(f"Loaded {len(rows)} indexed time entries from {self.db_path}")
+
+    def _save(self, changed: list[TogglTimeEntry], deleted: list[int]):
+        if not self.db_path:
+            return
+        conn = duckdb.connect(self.db_path)
+        bulk.delete(conn, "entry_index", "id", "BIGINT", deleted)
+        bulk.upsert(
+            conn,
+            "entry_index",
+            {"id": "BIGINT", "data": "TEXT"},
+            [(e.id, e.model_dump_json()) for e in changed],
+        )
+        if self.high_water and self.last_full:
+            conn.execute(
+                "INSERT OR REPLACE INTO entry_index_state "
+                "(id, high_water, last_full) VALUES (1, ?, ?)",
+                [self.high_water.timestamp(), self.last_full.timestamp()],
+            )
+        conn.close()
+
+    def _needs_full_refresh(self) -> bool:
+        # Counted from the last full listing, not from the last fetch: a
+        # daemon fetches every cycle, and only a listing prunes the index
+        if self.high_water is None or self.last_full is None:
+            return True
+        age = datetime.now(timezone.utc) - self.last_full
+        return age.total_seconds() > self.full_refresh_after
+
+    def merge(
+        self,
+        entries: list[TogglTimeEntry],
+        full: bool = False,
+        fetched_at: datetime | None = None,
+    ) -> tuple[list[TogglTimeEntry], list[int]]:
+        """Apply fetched or pushed entries to the index.
+
+        Args:
+            entries: Entries from Toggl, deleted ones carry ``server_deleted_at``
+            full: Whether ``entries`` is a complete listing replacing the index
+            fetched_at: When the fetch returning ``entries`` started; only
+                fetches advance the high-water mark, pushed entries leave it
+
+        Returns:
+            Tuple of (changed entries, deleted entry IDs); entries a full
+            listing drops from the index are not reported as deleted
+        """
+        changed = [e for e in entries if e.server_deleted_at is None]
+        deleted = [e.id for e in entries if e.server_deleted_at is not None]
+        with self._lock:
+            stored, dropped = changed, deleted
+            if full:
+                listed = {e.id for e in changed}
+                stored = [e for e in changed if self.entries.get(e.id) != e]
+                dropped = [i for i in self.entries if i not in listed]
+                self.entries = {}
+            for entry in changed:
+                self.entries[entry.id] = entry
+            for entry_id in deleted:
+                self.entries.pop(entry_id, None)
+            marked = False
+            if fetched_at is not None:
+                # An empty first listing still marks where the next delta starts
+                newest = max((e.at for e in entries), default=fetched_at)
+                if self.high_water is None or newest > self.high_water:
+                    self.high_water = newest
+                    marked = True
+                if full:
+                    self.last_full = fetched_at
+                    marked = True
+            if stored or dropped or marked:
+                self._save(stored, dropped)
+        return changed, deleted
+
+    def remove(self, entry_ids: list[int]):
+        """Drop entries known to be deleted, e.g. from a webhook."""
+        with self._lock:
+            for entry_id in entry_ids:
+                self.entries.pop(entry_id, None)
+            self._save([], entry_ids)
+
+    def _is_news(self, entry: TogglTimeEntry) -> bool:
+        known = self.entries.get(entry.id)
+        if entry.server_deleted_at is not None:
+            return known is not None
+        return known is None or known.at != entry.at
+
+    def refresh(self, toggl: TogglClient) -> tuple[list[TogglTimeEntry], list[int]]:
+        """Bring the index up to date with one Toggl request.
+
+        Returns:
+            Tuple of (changed entries, deleted entry IDs)
+        """
+        self.last_refresh_full = self._needs_full_refresh()
+        fetched_at = datetime.now(timezone.utc)
+        if self.last_refresh_full:
+            entries = toggl.list_time_entries()
+            logger.debug(f"Full time entry listing: {len(entries)} entries")
+            return self.merge(entries, full=True, fetched_at=fetched_at)
+
+        since = self.high_water - timedelta(seconds=self.overlap)
+        entries = toggl.list_time_entries(since=since)
+        # The overlap re-sends entries already applied, skip them
+        changed, deleted = self.merge(
+            [e for e in entries if self._is_news(e)], fetched_at=fetched_at
+        )
+        if changed or deleted:
+            logger.debug(f"Delta fetch: {len(changed)} changed, {len(deleted)} deleted")
+        return changed, deleted
+
+    def by_id(self) -> dict[str, TogglTimeEntry]:
+        """Entries keyed by their ID as stored on Anytype tasks."""
+        with self._lock:
+            return {str(e.id): e for e in self.entries.values()}
@@ -1,10 +1,306 @@
 # anytoggl/http.py
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import httpx
-from tenacity import retry, retry_if_exception_type, wait_exponential, stop_after_attempt
+from loguru import logger
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+from tenacity.stop import stop_base
+from tenacity.wait import wait_base
+
+# Statuses worth retrying; every other 4xx is a permanent failure
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+MAX_ATTEMPTS = 5
+MAX_WAIT = 30
+RETRY_DEADLINE = 60
+
+# Multiplier for retry sleeps and breaker cooldowns, < 1 only in soak runs
+_time_scale = 1.0
+
+
+def set_time_scale(scale: float):
+    """Speed up (scale < 1) every retry sleep and circuit breaker cooldown."""
+    global _time_scale
+    _time_scale = scale
+
+
+def _sleep(seconds: float):
+    time.sleep(seconds * _time_scale)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of sending a request once the cycle deadline has passed.
+
+    Not a transport error: it is neither retried nor counted against the
+    host's circuit breaker.
+    """
+
+
+# time.monotonic() value by which the current sync cycle must be done
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "cycle_deadline", default=None
+)
+
+
+@contextmanager
+def cycle_deadline(seconds: float | None):
+    """Bound every API call made inside the block to ``seconds`` in total.
+
+    Request timeouts and retry sleeps are cut to the time left, and calls
+    attempted after the deadline raise DeadlineExceeded. A nested deadline
+    never extends the enclosing one; None leaves it unchanged.
+    """
+    deadline = _deadline.get()
+    if seconds is not None:
+        ends = time.monotonic() + seconds
+        deadline = ends if deadline is None else min(deadline, ends)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> float | None:
+    """Seconds until the cycle deadline, None outside of cycle_deadline()."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def deadline_passed() -> bool:
+    left = time_left()
+    return left is not None and left <= 0
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether a failed request may succeed if sent again."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in TRANSIENT_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After or Toggl quota headers."""
+    value = response.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                when = None
+            if when is not None:
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    if response.headers.get("X-Toggl-Quota-Remaining") == "0":
+        try:
+            return max(0.0, float(response.headers["X-Toggl-Quota-Resets-In"]))
+        except (KeyError, ValueError):
+            return None
+    return None
+
+
+class wait_retry_after(wait_base):
+    """Wait as long as a 429/503 response asks, otherwise defer to a fallback."""
+
+    def __init__(self, fallback: wait_base, jitter: float = 1.0):
+        self.fallback = fallback
+        self.jitter = jitter
+
+    def __call__(self, retry_state) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in (
+            429,
+            503,
+        ):
+            delay = retry_after(exc.response)
+            if delay is not None:
+                return delay + random.uniform(0, self.jitter)
+        return self.fallback(retry_state)
+
+
+class stop_at_deadline(stop_base):
+    """Stop retrying when the next sleep would outlast the cycle deadline."""
+
+    def __call__(self, retry_state) -> bool:
+        left = time_left()
+        return left is not None and retry_state.upcoming_sleep * _time_scale >= left
+
+
+def _log_retry(retry_state):
+    reason = str(retry_state.outcome.exception()).splitlines()[0]
+    logger.warning(
+        f"Retrying {retry_state.fn.__name__} in {retry_state.upcoming_sleep:.1f}s "
+        f"(attempt {retry_state.attempt_number}): {reason}"
+    )
+
 
 RETRY = retry(
-    retry=retry_if_exception_type(httpx.HTTPError),
-    wait=wait_exponential(multiplier=1, min=1, max=30),
-    stop=stop_after_attempt(5),
+    retry=retry_if_exception(is_transient),
+    wait=wait_retry_after(wait_random_exponential(multiplier=1, max=MAX_WAIT)),
+    # Give up early rather than sleep past the call or cycle deadline
+    stop=stop_after_attempt(MAX_ATTEMPTS)
+    | stop_before_delay(RETRY_DEADLINE)
+    | stop_at_deadline(),
+    before_sleep=_log_retry,
+    sleep=_sleep,
     reraise=True,
 )
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one host.
+
+    After ``threshold`` consecutive transport errors or 5xx responses the
+    circuit opens and requests fail immediately for ``cooldown`` seconds.
+    The first request after the cooldown is let through as a probe; its
+    outcome closes the circuit again or restarts the cooldown.
+    """
+
+    def __init__(self, host: str, threshold: int = 5, cooldown: float = 30.0):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            cooldown = self.cooldown * _time_scale
+            remaining = self.opened_at + cooldown - time.monotonic()
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    f"Circuit open for {self.host} (retry in {max(remaining, 0):.0f}s)"
+                )
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit closed for {self.host}")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning(
+                        f"Circuit opened for {self.host} after {self.failures} failures"
+                    )
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Let the next request probe again after one that proved nothing."""
+        with self._lock:
+            self._probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(host: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for a host."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """Transport wrapper that trips a per-host circuit breaker."""
+
+    def __init__(
+        self, transport: httpx.BaseTransport | None = None, owned: bool = True
+    ):
+        self.transport = transport or httpx.HTTPTransport()
+        # Shared pools are closed by their owner, not by each client
+        self.owned = owned
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = breaker_for(request.url.netloc.decode())
+        breaker.before_request()
+        try:
+            response = self.transport.handle_request(request)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Says nothing about the host (e.g. DeadlineExceeded), but must
+            # not leave a half-open circuit waiting for a probe forever
+            breaker.release_probe()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def close(self):
+        if self.owned:
+            self.transport.close()
+
+
+class DeadlineTransport(httpx.BaseTransport):
+    """Transport wrapper fitting each request into the cycle deadline.
+
+    Every timeout of the request is cut to the time left, so one slow call
+    cannot overrun the cycle; a timeout caused by that cut surfaces as
+    DeadlineExceeded rather than as a failure of the host.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        left = time_left()
+        if left is None:
+            return self.transport.handle_request(request)
+        if left <= 0:
+            raise DeadlineExceeded(
+                f"Cycle deadline passed before {request.method} {request.url.path}"
+            )
+        timeout = request.extensions.get("timeout", {})
+        request.extensions["timeout"] = {
+            name: left if value is None else min(value, left)
+            for name, value in timeout.items()
+        }
+        try:
+            return self.transport.handle_request(request)
+        except httpx.TimeoutException as e:
+            if deadline_passed():
+                raise DeadlineExceeded(
+                    f"Cycle deadline passed during {request.method} {request.url.path}"
+                ) from e
+            raise
+
+    def close(self):
+        self.transport.close()
@@ -10,6 +10,7 @@ class AnytypeTask(BaseModel):
     description: Optional[str] = None
     status: str
     project: Optional[str] = None
+    project_object_id: Optional[str] = None  # Anytype ID of the linked project
     toggl_track_id: Optional[str] = None  # For Track sync (renamed from toggl_id)
     toggl_plan_id: Optional[str] = None  # For Plan sync
     last_modified: Optional[datetime] = None
@@ -27,6 +28,7 @@ class TogglTimeEntry(BaseModel):
     stop: Optional[datetime] = None
     duration: int  # negative = running timer
     at: datetime  # last updated timestamp
+    server_deleted_at: Optional[datetime] = None  # only in `since` listings
 
 
 class TogglPlanTask(BaseModel):
@@ -34,6 +36,8 @@ class TogglPlanTask(BaseModel):
     name: Optional[str] = None  # Can be None in API responses
     start_date: datetime  # ISO 8601 format
     end_date: datetime  # ISO 8601 format
+    start_time: Optional[str] = None  # Daily time window start (HH:MM)
+    end_time: Optional[str] = None  # Daily time window end (HH:MM)
     user_id: Optional[int] = None
     project_id: Optional[int] = None
     notes: Optional[str] = None  # Contains description and #anytype_id marker
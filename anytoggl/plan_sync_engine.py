@@ -3,7 +3,12 @@ import datetime
 from loguru import logger
 from anytoggl.clients.anytype import AnytypeClient
 from anytoggl.clients.toggl_plan import TogglPlanClient
+from anytoggl.http import deadline_passed
+from anytoggl.models import AnytypeTask, TogglPlanTask
+from anytoggl.priority import COSMETIC, CREATE, IDLE, RECENT, TIMER, OperationQueue
+from anytoggl.profiling import phase
 from anytoggl.scheduler import TaskScheduler
+from anytoggl.tiers import SideState, TaskTiers
 
 
 class PlanSyncEngine:
@@ -16,6 +21,7 @@ class PlanSyncEngine:
         scheduler: TaskScheduler,
         default_project_name: str = "Anytype Sync",
         default_estimated_minutes: int = 60,
+        tiers: TaskTiers | None = None,
     ):
         """Initialize Plan sync engine.
 
@@ -25,6 +31,7 @@ class PlanSyncEngine:
             scheduler: Task scheduler for auto-scheduling
             default_project_name: Default project name for tasks
             default_estimated_minutes: Default time estimate in minutes
+            tiers: Cadence of reconciliation per task tier (hot/warm/cold)
         """
         self.anytype = anytype
         self.toggl_plan = toggl_plan
@@ -33,6 +40,8 @@ class PlanSyncEngine:
         self.default_estimated_minutes = default_estimated_minutes
         self.default_project_id = None
         self.project_status_maps = {}  # project_id -> {type/name: status_id}
+        self.queue = OperationQueue()  # most visible writes first
+        self.tiers = tiers or TaskTiers()  # settled tasks are checked less often
 
     def _cache_project_statuses(self, project: dict):
         """Cache status IDs for a project.
@@ -230,187 +239,324 @@ class PlanSyncEngine:
             return match.group(1)
         return None
 
+    def _side(
+        self,
+        task: AnytypeTask,
+        plan_by_id: dict[str, TogglPlanTask],
+        plan_by_anytype_id: dict[str, TogglPlanTask],
+    ) -> SideState:
+        plan_task = plan_by_id.get(task.toggl_plan_id) if task.toggl_plan_id else None
+        plan_task = plan_task or plan_by_anytype_id.get(task.id)
+        # Plan has no running timers
+        return False, plan_task.updated_at if plan_task else None
+
+    def _settle(
+        self,
+        task: AnytypeTask,
+        plan_by_id: dict[str, TogglPlanTask],
+        plan_by_anytype_id: dict[str, TogglPlanTask],
+    ):
+        self.tiers.settle(task, self._side(task, plan_by_id, plan_by_anytype_id)[1])
+
+    def _index_plan_tasks(
+        self, plan_tasks: list[TogglPlanTask]
+    ) -> tuple[dict[str, TogglPlanTask], dict[str, TogglPlanTask]]:
+        """Index Plan tasks by their ID and by the anytype_id in their notes.
+
+        Returns:
+            Tuple of (tasks by Plan ID, tasks by Anytype ID)
+        """
+        plan_by_id = {str(task.id): task for task in plan_tasks}
+        plan_by_anytype_id = {}
+        for task in plan_tasks:
+            anytype_id = self._extract_anytype_id(getattr(task, "notes", None))
+            if anytype_id:
+                plan_by_anytype_id[anytype_id] = task
+        return plan_by_id, plan_by_anytype_id
+
     def run(self):
         """Run one-way sync from Anytype to Toggl Plan."""
         logger.info("Starting Toggl Plan sync...")
 
         # Ensure default project exists
-        self._ensure_default_project()
+        with phase("plan.ensure_default_project"):
+            self._ensure_default_project()
 
         # Cache for project name -> ID mappings
         projects_cache = {}
 
         # Fetch all Anytype tasks tagged with "Toggl"
-        anytype_tasks = self.anytype.search_tasks()
+        with phase("anytype.search_tasks"):
+            anytype_tasks = self.anytype.search_tasks()
         logger.info(f"Found {len(anytype_tasks)} Anytype tasks tagged with 'Toggl'")
 
         # Fetch all existing Toggl Plan tasks
-        plan_tasks = self.toggl_plan.list_tasks()
+        with phase("plan.list_tasks"):
+            plan_tasks = self.toggl_plan.list_tasks()
         logger.info(f"Found {len(plan_tasks)} existing Toggl Plan tasks")
 
         # Run scheduling algorithm to assign times to unscheduled tasks
-        scheduled_tasks = self.scheduler.schedule_tasks(anytype_tasks, plan_tasks)
-
-        # Index Plan tasks by ID for quick lookup
-        plan_by_id = {str(task.id): task for task in plan_tasks}
+        with phase("schedule"):
+            scheduled_tasks = self.scheduler.schedule_tasks(anytype_tasks, plan_tasks)
 
-        # Also index by anytype_id extracted from notes
-        plan_by_anytype_id = {}
-        for task in plan_tasks:
-            # Try to extract anytype_id from notes
-            anytype_id = self._extract_anytype_id(getattr(task, "notes", None))
-            if anytype_id:
-                plan_by_anytype_id[anytype_id] = task
+        plan_by_id, plan_by_anytype_id = self._index_plan_tasks(plan_tasks)
 
         # Track sync statistics
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-
-        for task in scheduled_tasks:
-            # Skip tasks without scheduling (couldn't be scheduled)
-            if not task.start_date or not task.end_date:
-                logger.warning(
-                    f"Skipping task '{task.name}' - no start/end date available"
+        counts = {"created": 0, "updated": 0, "skipped": 0}
+
+        # Scheduled first: time windows depend on every task, due or not
+        scheduled_tasks = self.tiers.select(
+            scheduled_tasks,
+            lambda t: self._side(t, plan_by_id, plan_by_anytype_id),
+        )
+
+        priorities = {
+            task.id: self._priority(task, plan_by_id, plan_by_anytype_id)
+            for task in scheduled_tasks
+        }
+        operations = [(task.id, priorities[task.id], task) for task in scheduled_tasks]
+
+        unfinished = 0
+        with phase("reconcile"):
+            for task in self.queue.order(operations):
+                if deadline_passed():
+                    # Keeps its place in the queue for the next cycle
+                    unfinished += 1
+                    continue
+                in_sync = priorities[task.id] == IDLE
+                outcome = self._sync_task(
+                    task, plan_by_id, plan_by_anytype_id, projects_cache
                 )
-                skipped_count += 1
-                continue
-
-            # Get scheduled time window (from scheduler)
-            start_time = getattr(task, "start_time", None)
-            end_time = getattr(task, "end_time", None)
-
-            if not start_time or not end_time:
-                logger.warning(f"Skipping task '{task.name}' - no time window assigned")
-                skipped_count += 1
-                continue
-
-            # Check if task exists in Toggl Plan (by toggl_plan_id or anytype_id)
-            plan_task = None
-            if task.toggl_plan_id:
-                plan_task = plan_by_id.get(task.toggl_plan_id)
-            if not plan_task:
-                # Try to find by anytype_id in notes
-                plan_task = plan_by_anytype_id.get(task.id)
-                if plan_task:
-                    logger.info(
-                        f"Matched task '{task.name}' via notes (ID: {plan_task.id}). Healing link..."
-                    )
-                    try:
-                        self.anytype.update_task(
-                            task.id, {"toggl_plan_id": str(plan_task.id)}
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to heal link for '{task.name}': {e}")
-
-            # Create in Toggl Plan if doesn't exist
-            if not plan_task:
-                try:
-                    # Get project ID for this task (Anytype project or default)
-                    project_id = self._get_project_id(task, projects_cache)
-                    status_id = self._get_status_id(project_id, task.status)
-
-                    # Build notes with anytype_id marker
-                    notes = self._build_notes(task.description, task.id)
-
-                    payload = {
-                        "name": task.name,
-                        "start_date": task.start_date.strftime("%Y-%m-%d"),
-                        "end_date": task.end_date.strftime("%Y-%m-%d"),
-                        "start_time": start_time,  # Use scheduled time
-                        "end_time": end_time,  # Use scheduled time
-                        "user_id": self.toggl_plan.user_id,  # Required field
-                        "project_id": project_id,  # Anytype project or default
-                        "notes": notes,  # Description + anytype_id marker
-                        "estimated_minutes": self.default_estimated_minutes,
-                    }
-
-                    if status_id:
-                        payload["plan_status_id"] = status_id
-                    else:
-                        # Fallback for projects without custom statuses
-                        payload["status"] = self._map_status_string(task.status)
-
-                    # Create task in Toggl Plan
-                    created_plan_task = self.toggl_plan.create_task(payload)
-
-                    # Save Plan task ID back to Anytype
-                    self.anytype.update_task(
-                        task.id, {"toggl_plan_id": str(created_plan_task.id)}
-                    )
+                counts[outcome] += 1
+                # Skipped tasks (including failed writes) keep aging
+                if outcome != "skipped":
+                    self.queue.done(task.id)
+                if outcome != "skipped" or in_sync:
+                    self._settle(task, plan_by_id, plan_by_anytype_id)
+
+        if unfinished:
+            logger.warning(
+                f"Cycle deadline reached, {unfinished} tasks left for the next cycle"
+            )
+        logger.info(
+            f"Sync complete: {counts['created']} created, {counts['updated']} updated, {counts['skipped']} skipped"
+        )
 
-                    logger.info(
-                        f"Created Toggl Plan task '{task.name}' (ID: {created_plan_task.id}, Time: {start_time}-{end_time})"
-                    )
-                    created_count += 1
+    def _priority(
+        self,
+        task: AnytypeTask,
+        plan_by_id: dict[str, TogglPlanTask],
+        plan_by_anytype_id: dict[str, TogglPlanTask],
+    ) -> int:
+        """Rank the write a task needs.
 
-                except Exception as e:
-                    logger.error(f"Failed to create Toggl Plan task '{task.name}': {e}")
-                    skipped_count += 1
+        Args:
+            task: Scheduled Anytype task
+            plan_by_id: Known Plan tasks by ID
+            plan_by_anytype_id: Known Plan tasks by anytype_id marker in notes
+
+        Returns:
+            Priority level from anytoggl.priority
+        """
+        plan_task = None
+        if task.toggl_plan_id:
+            plan_task = plan_by_id.get(task.toggl_plan_id)
+        plan_task = plan_task or plan_by_anytype_id.get(task.id)
+
+        if plan_task is None:
+            # A task started in Anytype should show up on the board first
+            return TIMER if task.status == "In Progress" else CREATE
+
+        anytype_ts = task.last_modified
+        if not anytype_ts or not plan_task.updated_at:
+            return IDLE
+        plan_ts = plan_task.updated_at
+        if anytype_ts.tzinfo is None:
+            anytype_ts = anytype_ts.replace(tzinfo=datetime.timezone.utc)
+        if plan_ts.tzinfo is None:
+            plan_ts = plan_ts.replace(tzinfo=datetime.timezone.utc)
+        if anytype_ts <= plan_ts:
+            return IDLE
+        return RECENT if self.queue.is_recent(anytype_ts) else COSMETIC
+
+    def sync_task(self, anytype_id: str):
+        """Sync a single Anytype task to Toggl Plan without a full scan.
+
+        Args:
+            anytype_id: ID of the Anytype task
+        """
+        task = self.anytype.get_task(anytype_id)
+        if task is None:
+            logger.warning(f"Anytype object {anytype_id} is not a task tagged 'Toggl'")
+            return
 
-                continue
+        plan_task = None
+        if task.toggl_plan_id:
+            plan_task = self.toggl_plan.get_task(int(task.toggl_plan_id))
 
-            # Update flow - compare timestamps
-            anytype_ts = task.last_modified
-            plan_ts = plan_task.updated_at
+        if plan_task is not None:
+            plan_tasks = [plan_task]
+            # Keep the time window already assigned in Plan
+            task.start_time = task.start_time or plan_task.start_time
+            task.end_time = task.end_time or plan_task.end_time
+        else:
+            # Link missing or broken: fall back to the notes marker to avoid duplicates
+            plan_tasks = self.toggl_plan.list_tasks()
 
-            # Skip if no valid timestamp comparison available
-            if not anytype_ts or not plan_ts:
-                logger.debug(
-                    f"Skipping '{task.name}' - no timestamp comparison available"
-                )
-                skipped_count += 1
-                continue
+        plan_by_id, plan_by_anytype_id = self._index_plan_tasks(plan_tasks)
+
+        [scheduled] = self.scheduler.schedule_tasks([task], plan_tasks)
+        outcome = self._sync_task(scheduled, plan_by_id, plan_by_anytype_id, {})
+        logger.info(f"Synced '{task.name}' with Toggl Plan ({outcome})")
 
-            # Ensure both are timezone aware
-            if anytype_ts.tzinfo is None:
-                anytype_ts = anytype_ts.replace(tzinfo=datetime.timezone.utc)
-            if plan_ts.tzinfo is None:
-                plan_ts = plan_ts.replace(tzinfo=datetime.timezone.utc)
+    def _sync_task(
+        self,
+        task: AnytypeTask,
+        plan_by_id: dict[str, TogglPlanTask],
+        plan_by_anytype_id: dict[str, TogglPlanTask],
+        projects_cache: dict[str, int],
+    ) -> str:
+        """Create or update the Toggl Plan task of one scheduled Anytype task.
+
+        Args:
+            task: Scheduled Anytype task
+            plan_by_id: Known Plan tasks by ID
+            plan_by_anytype_id: Known Plan tasks by anytype_id marker in notes
+            projects_cache: Cache of project name -> ID mappings
 
-            # Anytype newer → push to Toggl Plan
-            if anytype_ts > plan_ts:
+        Returns:
+            Outcome: "created", "updated" or "skipped"
+        """
+        # Skip tasks without scheduling (couldn't be scheduled)
+        if not task.start_date or not task.end_date:
+            logger.warning(f"Skipping task '{task.name}' - no start/end date available")
+            return "skipped"
+
+        # Get scheduled time window (from scheduler)
+        start_time = getattr(task, "start_time", None)
+        end_time = getattr(task, "end_time", None)
+
+        if not start_time or not end_time:
+            logger.warning(f"Skipping task '{task.name}' - no time window assigned")
+            return "skipped"
+
+        # Check if task exists in Toggl Plan (by toggl_plan_id or anytype_id)
+        plan_task = None
+        if task.toggl_plan_id:
+            plan_task = plan_by_id.get(task.toggl_plan_id)
+        if not plan_task:
+            # Try to find by anytype_id in notes
+            plan_task = plan_by_anytype_id.get(task.id)
+            if plan_task:
+                logger.info(
+                    f"Matched task '{task.name}' via notes (ID: {plan_task.id}). Healing link..."
+                )
                 try:
-                    # Retrieve project_id to lookup status mapping
-                    # Task might have different project in Plan than expected, but we prioritize current Anytype project
-                    project_id = self._get_project_id(task, projects_cache)
-                    status_id = self._get_status_id(project_id, task.status)
-
-                    # Build notes with anytype_id marker (preserve or add)
-                    notes = self._build_notes(task.description, task.id)
-
-                    payload = {
-                        "name": task.name,
-                        "start_date": task.start_date.strftime("%Y-%m-%d"),
-                        "end_date": task.end_date.strftime("%Y-%m-%d"),
-                        "start_time": start_time,  # Use scheduled time
-                        "end_time": end_time,  # Use scheduled time
-                        "notes": notes,
-                        "estimated_minutes": self.default_estimated_minutes,
-                    }
-
-                    if status_id:
-                        payload["plan_status_id"] = status_id
-                    else:
-                        # Fallback for projects without custom statuses
-                        payload["status"] = self._map_status_string(task.status)
-
-                    self.toggl_plan.update_task(plan_task.id, payload)
-
-                    logger.info(
-                        f"Updated Toggl Plan task '{task.name}' (Time: {start_time}-{end_time})"
+                    self.anytype.update_task(
+                        task.id, {"toggl_plan_id": str(plan_task.id)}
                     )
-                    updated_count += 1
-
                 except Exception as e:
-                    logger.error(f"Failed to update Toggl Plan task '{task.name}': {e}")
-                    skipped_count += 1
+                    logger.error(f"Failed to heal link for '{task.name}': {e}")
+
+        # Create in Toggl Plan if doesn't exist
+        if not plan_task:
+            try:
+                # Get project ID for this task (Anytype project or default)
+                project_id = self._get_project_id(task, projects_cache)
+                status_id = self._get_status_id(project_id, task.status)
+
+                # Build notes with anytype_id marker
+                notes = self._build_notes(task.description, task.id)
+
+                payload = {
+                    "name": task.name,
+                    "start_date": task.start_date.strftime("%Y-%m-%d"),
+                    "end_date": task.end_date.strftime("%Y-%m-%d"),
+                    "start_time": start_time,  # Use scheduled time
+                    "end_time": end_time,  # Use scheduled time
+                    "user_id": self.toggl_plan.user_id,  # Required field
+                    "project_id": project_id,  # Anytype project or default
+                    "notes": notes,  # Description + anytype_id marker
+                    "estimated_minutes": self.default_estimated_minutes,
+                }
+
+                if status_id:
+                    payload["plan_status_id"] = status_id
+                else:
+                    # Fallback for projects without custom statuses
+                    payload["status"] = self._map_status_string(task.status)
+
+                # Create task in Toggl Plan
+                created_plan_task = self.toggl_plan.create_task(payload)
+
+                # Save Plan task ID back to Anytype
+                self.anytype.update_task(
+                    task.id, {"toggl_plan_id": str(created_plan_task.id)}
+                )
 
-            else:
-                # Plan is newer or same - skip (one-way sync)
-                logger.debug(f"Skipping '{task.name}' - Toggl Plan is newer or same")
-                skipped_count += 1
+                logger.info(
+                    f"Created Toggl Plan task '{task.name}' (ID: {created_plan_task.id}, Time: {start_time}-{end_time})"
+                )
+                return "created"
+
+            except Exception as e:
+                logger.error(f"Failed to create Toggl Plan task '{task.name}': {e}")
+                return "skipped"
+
+        # Update flow - compare timestamps
+        anytype_ts = task.last_modified
+        plan_ts = plan_task.updated_at
+
+        # Skip if no valid timestamp comparison available
+        if not anytype_ts or not plan_ts:
+            logger.debug(f"Skipping '{task.name}' - no timestamp comparison available")
+            return "skipped"
+
+        # Ensure both are timezone aware
+        if anytype_ts.tzinfo is None:
+            anytype_ts = anytype_ts.replace(tzinfo=datetime.timezone.utc)
+        if plan_ts.tzinfo is None:
+            plan_ts = plan_ts.replace(tzinfo=datetime.timezone.utc)
+
+        # Anytype newer → push to Toggl Plan
+        if anytype_ts > plan_ts:
+            try:
+                # Retrieve project_id to lookup status mapping
+                # Task might have different project in Plan than expected, but we prioritize current Anytype project
+                project_id = self._get_project_id(task, projects_cache)
+                status_id = self._get_status_id(project_id, task.status)
+
+                # Build notes with anytype_id marker (preserve or add)
+                notes = self._build_notes(task.description, task.id)
+
+                payload = {
+                    "name": task.name,
+                    "start_date": task.start_date.strftime("%Y-%m-%d"),
+                    "end_date": task.end_date.strftime("%Y-%m-%d"),
+                    "start_time": start_time,  # Use scheduled time
+                    "end_time": end_time,  # Use scheduled time
+                    "notes": notes,
+                    "estimated_minutes": self.default_estimated_minutes,
+                }
+
+                if status_id:
+                    payload["plan_status_id"] = status_id
+                else:
+                    # Fallback for projects without custom statuses
+                    payload["status"] = self._map_status_string(task.status)
+
+                self.toggl_plan.update_task(plan_task.id, payload)
 
-        logger.info(
-            f"Sync complete: {created_count} created, {updated_count} updated, {skipped_count} skipped"
-        )
+                logger.info(
+                    f"Updated Toggl Plan task '{task.name}' (Time: {start_time}-{end_time})"
+                )
+                return "updated"
+
+            except Exception as e:
+                logger.error(f"Failed to update Toggl Plan task '{task.name}': {e}")
+                return "skipped"
+
+        else:
+            # Plan is newer or same - skip (one-way sync)
+            logger.debug(f"Skipping '{task.name}' - Toggl Plan is newer or same")
+            return "skipped"
@@ -0,0 +1,79 @@
+# anytoggl/priority.py
+import time
+from datetime import datetime, timezone
+from typing import TypeVar
+
+# Lower values are served first
+TIMER = 0  # running timer started or stopped
+RECENT = 1  # task modified within the recent window
+CREATE = 2  # first-time create of a remote object
+COSMETIC = 3  # older name/description/project changes
+IDLE = 4  # nothing to write, kept for bookkeeping only
+
+T = TypeVar("T")
+
+
+class OperationQueue:
+    """Orders per-task sync operations so scarce quota goes to what users notice.
+
+    Operations that could not run (e.g. the quota ran out) keep their
+    original enqueue time across cycles; each ``aging`` seconds of waiting
+    promotes them one priority level, so nothing waits forever.
+    """
+
+    def __init__(self, aging: float = 900, recent: float = 3600):
+        """Initialize operation queue.
+
+        Args:
+            aging: Seconds of waiting that promote an operation one level
+            recent: Seconds within which a modified task counts as recent
+        """
+        self.aging = aging
+        self.recent = recent
+        self._waiting_since: dict[str, float] = {}
+
+    def order(
+        self, operations: list[tuple[str, int, T]], complete: bool = True
+    ) -> list[T]:
+        """Sort pending operations by aged priority.
+
+        Args:
+            operations: (task key, priority, item) for each pending operation
+            complete: Whether ``operations`` lists every pending operation
+
+        Returns:
+            Items in the order they should be applied
+        """
+        now = time.monotonic()
+        waiting = {key: self._waiting_since.get(key, now) for key, _, _ in operations}
+        if complete:
+            # Forget operations that are no longer pending
+            self._waiting_since = waiting
+        else:
+            self._waiting_since.update(waiting)
+
+        def rank(operation: tuple[str, int, T]) -> float:
+            key, priority, _ = operation
+            return priority - (now - self._waiting_since[key]) / self.aging
+
+        return [item for _, _, item in sorted(operations, key=rank)]
+
+    def is_recent(self, modified: datetime | None) -> bool:
+        """Whether a task modified at ``modified`` counts as recently edited."""
+        if modified is None:
+            return False
+        if modified.tzinfo is None:
+            modified = modified.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - modified
+        return age.total_seconds() <= self.recent
+
+    def done(self, key: str):
+        """Mark the operation of a task as applied."""
+        self._waiting_since.pop(key, None)
+
+    def is_pending(self, key: str) -> bool:
+        """Whether a task has an operation that was not applied yet."""
+        return key in self._waiting_since
+
+    def pending(self) -> int:
+        return len(self._waiting_since)
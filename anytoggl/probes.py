@@ -0,0 +1,217 @@
+# anytoggl/probes.py
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+import httpx
+from anytoggl.creation import CreationPolicy
+from anytoggl.transport import PROFILES
+
+# Requests of one Track cycle on the /me (user) quota: the time entry listing
+TRACK_READS_PER_CYCLE = 1
+# Project listings are cached for an hour, then revalidated once
+TRACK_READS_PER_HOUR = 1
+# Requests of one Plan cycle: the task listing
+PLAN_READS_PER_CYCLE = 1
+
+
+@dataclass
+class ProbeResult:
+    """Latency samples of one dependency, in milliseconds."""
+
+    name: str
+    url: str
+    connect_ms: list[float] = field(default_factory=list)
+    tls_ms: list[float] = field(default_factory=list)
+    request_ms: list[float] = field(default_factory=list)
+    status: int | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 500
+
+    def summary(self) -> str:
+        """One line with the median of each phase."""
+        if self.error:
+            return f"{self.name}: {self.error}"
+        parts = [
+            f"{label} {statistics.median(values):.0f}ms"
+            for label, values in (
+                ("connect", self.connect_ms),
+                ("tls", self.tls_ms),
+                ("request", self.request_ms),
+            )
+            if values
+        ]
+        samples = len(self.request_ms)
+        return (
+            f"{self.name}: {', '.join(parts)} (HTTP {self.status}, {samples} samples)"
+        )
+
+
+def _phases(marks: dict[str, float]) -> dict[str, float]:
+    """Turn httpcore trace events into phase durations in milliseconds."""
+
+    def span(started: str, completed: str) -> float | None:
+        if started in marks and completed in marks:
+            return (marks[completed] - marks[started]) * 1000
+        return None
+
+    phases = {
+        "connect": span(
+            "connection.connect_tcp.started", "connection.connect_tcp.complete"
+        ),
+        "tls": span("connection.start_tls.started", "connection.start_tls.complete"),
+    }
+    for protocol in ("http11", "http2"):
+        request = span(
+            f"{protocol}.send_request_headers.started",
+            f"{protocol}.receive_response_headers.complete",
+        )
+        if request is not None:
+            phases["request"] = request
+    return {k: v for k, v in phases.items() if v is not None}
+
+
+def probe(
+    name: str,
+    profile: str,
+    url: str,
+    samples: int = 3,
+    headers: dict | None = None,
+) -> ProbeResult:
+    """Measure connect, TLS and request latency of one endpoint.
+
+    Each sample opens a fresh connection outside the shared pools, so it
+    pays the handshakes a cold daemon would. Probes of Toggl hosts are sent
+    without credentials and spend no API quota.
+
+    Args:
+        name: Dependency name for the report
+        profile: Name of the endpoint profile in PROFILES (timeouts)
+        url: Cheap URL on the dependency's host
+        samples: Number of requests to send
+        headers: Optional request headers, e.g. local API auth
+
+    Returns:
+        Latency samples, the last status, or the error that stopped probing
+    """
+    result = ProbeResult(name, url)
+    for _ in range(samples):
+        marks: dict[str, float] = {}
+
+        def trace(event: str, info: dict):
+            marks[event] = time.perf_counter()
+
+        try:
+            with httpx.Client(timeout=PROFILES[profile].timeout) as client:
+                response = client.get(url, headers=headers, extensions={"trace": trace})
+        except httpx.HTTPError as e:
+            result.error = str(e) or type(e).__name__
+            break
+        result.status = response.status_code
+        phases = _phases(marks)
+        if "connect" in phases:
+            result.connect_ms.append(phases["connect"])
+        if "tls" in phases:
+            result.tls_ms.append(phases["tls"])
+        if "request" in phases:
+            result.request_ms.append(phases["request"])
+    return result
+
+
+@dataclass(frozen=True)
+class CycleCost:
+    """Toggl requests a sync spends, from cached task counts."""
+
+    interval: int
+    reads_per_cycle: int
+    reads_per_hour_fixed: int
+    read_limit: int | None
+    pending_writes: int
+    write_limit: int | None
+    deferred_writes: int = 0  # creates waiting until work starts
+
+    @property
+    def reads_per_hour(self) -> int:
+        cycles = math.ceil(3600 / self.interval)
+        return cycles * self.reads_per_cycle + self.reads_per_hour_fixed
+
+    def min_interval(self) -> int | None:
+        """Shortest interval keeping reads within the limit."""
+        if self.read_limit is None:
+            return None
+        usable = self.read_limit - self.reads_per_hour_fixed
+        if usable <= 0:
+            return None
+        return math.ceil(3600 * self.reads_per_cycle / usable)
+
+    def warnings(self) -> list[str]:
+        """Configurations that will run into the hourly limits."""
+        warnings = []
+        if self.read_limit is not None and self.reads_per_hour > self.read_limit:
+            minimum = self.min_interval()
+            hint = f"; use --interval {minimum} or more" if minimum else ""
+            warnings.append(
+                f"--interval {self.interval} needs ~{self.reads_per_hour} requests/hour, "
+                f"above the limit of {self.read_limit}{hint}"
+            )
+        if self.write_limit is not None and self.pending_writes > self.write_limit:
+            hours = math.ceil(self.pending_writes / self.write_limit)
+            warnings.append(
+                f"{self.pending_writes} pending creates exceed the limit of "
+                f"{self.write_limit}/hour and will take ~{hours} hours"
+            )
+        return warnings
+
+
+def track_cycle_cost(
+    interval: int,
+    unlinked: dict[str | None, int],
+    creation: CreationPolicy,
+    user_limit: int = 30,
+    org_limit: int = 30,
+) -> CycleCost:
+    """Estimate the Toggl Track cost of syncing every ``interval`` seconds.
+
+    Reads go to the /me endpoints (user quota), creates and updates to the
+    workspace endpoints (org quota). Unlinked tasks the creation policy
+    covers are the known pending creates; the others wait until work starts
+    on them. Updates depend on edits and are not predicted.
+
+    Args:
+        interval: Seconds between cycles
+        unlinked: Cached number of tasks without a Toggl entry, per status
+        creation: Policy deciding which unlinked tasks get an entry now
+        user_limit: Hourly limit of the user quota
+        org_limit: Hourly limit of the org quota
+
+    Returns:
+        Estimated cost
+    """
+    pending = sum(n for status, n in unlinked.items() if creation.creates(status))
+    return CycleCost(
+        interval=interval,
+        reads_per_cycle=TRACK_READS_PER_CYCLE,
+        reads_per_hour_fixed=TRACK_READS_PER_HOUR,
+        read_limit=user_limit,
+        pending_writes=pending,
+        write_limit=org_limit,
+        deferred_writes=sum(unlinked.values()) - pending,
+    )
+
+
+def plan_cycle_cost(interval: int) -> CycleCost:
+    """Estimate the Toggl Plan requests of syncing every ``interval`` seconds.
+
+    Toggl Plan publishes no hourly limit, so nothing is flagged.
+    """
+    return CycleCost(
+        interval=interval,
+        reads_per_cycle=PLAN_READS_PER_CYCLE,
+        reads_per_hour_fixed=0,
+        read_limit=None,
+        pending_writes=0,
+        write_limit=None,
+    )
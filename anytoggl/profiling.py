@@ -0,0 +1,144 @@
+# anytoggl/profiling.py
+import contextvars
+import cProfile
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import httpx
+from loguru import logger
+from anytoggl.cache import CACHE_STATUS_HEADER
+from anytoggl.transport import add_http_listener, remove_http_listener
+
+_phase: contextvars.ContextVar[str] = contextvars.ContextVar("phase", default="-")
+
+
+@contextmanager
+def phase(name: str):
+    """Label the work done inside the block with an engine phase name."""
+    token = _phase.set(name)
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+
+
+def current_phase() -> str:
+    return _phase.get()
+
+
+class CycleProfiler:
+    """Captures profiling artifacts for one sync cycle.
+
+    Each cycle writes, under ``directory`` and sharing one file prefix:
+
+    * ``.prof``: cProfile stats (open with ``snakeviz`` or ``pstats``)
+    * ``.mem.txt``: top tracemalloc allocations
+    * ``.collapsed``: sampled stacks in collapsed format (``flamegraph.pl``,
+      speedscope)
+    * ``.http.log``: API calls slower than ``slow_http_ms``, by engine phase
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        slow_http_ms: float = 500,
+        sample_interval: float = 0.005,
+        name: str = "cycle",
+    ):
+        """Initialize cycle profiler.
+
+        Args:
+            directory: Directory receiving the profiling artifacts
+            slow_http_ms: Latency threshold for the HTTP call log
+            sample_interval: Seconds between stack samples
+            name: File name prefix, e.g. the engine name
+        """
+        self.directory = Path(directory)
+        self.slow_http_ms = slow_http_ms
+        self.sample_interval = sample_interval
+        self.name = name
+        self._profile = cProfile.Profile()
+        self._stacks: Counter[str] = Counter()
+        self._slow_calls: list[str] = []
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started_tracemalloc = False
+        self._started = 0.0
+
+    def _sample(self, thread_id: int):
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                stack.append(f"{module}:{frame.f_code.co_qualname}")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def _on_http(
+        self, request: httpx.Request, response: httpx.Response | None, elapsed: float
+    ):
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.slow_http_ms:
+            return
+        status = response.status_code if response is not None else "error"
+        cache = response.headers.get(CACHE_STATUS_HEADER, "-") if response else "-"
+        self._slow_calls.append(
+            f"{elapsed_ms:8.1f}ms  {current_phase():<28} {request.method:<6} "
+            f"{status} cache={cache} {request.url}"
+        )
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        add_http_listener(self._on_http)
+        self._sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(),),
+            name="profile-sampler",
+            daemon=True,
+        )
+        self._sampler.start()
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+        remove_http_listener(self._on_http)
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        prefix = self.directory / (
+            f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        )
+        self._profile.dump_stats(f"{prefix}.prof")
+
+        top = snapshot.statistics("lineno")[:50]
+        Path(f"{prefix}.mem.txt").write_text("\n".join(str(s) for s in top) + "\n")
+
+        Path(f"{prefix}.collapsed").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self._stacks.items())
+        )
+
+        Path(f"{prefix}.http.log").write_text(
+            "".join(f"{line}\n" for line in self._slow_calls)
+        )
+
+        logger.info(
+            f"Profiled cycle in {elapsed:.2f}s "
+            f"({len(self._slow_calls)} slow HTTP calls) → {prefix}.*"
+        )
+        return False
@@ -0,0 +1,77 @@
+# anytoggl/project_index.py
+import time
+from loguru import logger
+from anytoggl.clients.toggl import TogglClient
+
+
+class ProjectIndex:
+    """Name → ID index of Toggl Track projects, kept across sync cycles.
+
+    The index is loaded on first use and refreshed once its TTL expires.
+    Names missing from a fresh index trigger at most one reload per
+    ``miss_refresh`` seconds, so a burst of unknown names costs one listing.
+    Reloads bypass the HTTP cache, whose copy is no newer than the index.
+    """
+
+    def __init__(
+        self, toggl: TogglClient, ttl: float = 3600, miss_refresh: float = 300
+    ):
+        """Initialize project index.
+
+        Args:
+            toggl: Toggl Track API client
+            ttl: Seconds before the index is reloaded
+            miss_refresh: Minimum seconds between reloads caused by unknown names
+        """
+        self.toggl = toggl
+        self.ttl = ttl
+        self.miss_refresh = miss_refresh
+        self._ids: dict[str, int] = {}
+        self._loaded_at: float | None = None
+        # Only the first load may be answered from the HTTP cache
+        self._revalidate = False
+
+    def _load(self):
+        self._ids = self.toggl.list_projects(revalidate=self._revalidate)
+        self._revalidate = True
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded {len(self._ids)} Toggl Track projects")
+
+    def _age(self) -> float:
+        if self._loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self._loaded_at
+
+    def known(self) -> dict[str, int]:
+        """Projects loaded or created so far, without any API call."""
+        return dict(self._ids)
+
+    def invalidate(self):
+        """Force a reload on the next lookup."""
+        self._loaded_at = None
+
+    def resolve(self, name: str, create: bool = True) -> int | None:
+        """Get the ID of a project, creating it in Toggl if allowed.
+
+        Args:
+            name: Project name
+            create: Whether to create the project when it does not exist
+
+        Returns:
+            Project ID, or None if unknown and creation is not allowed
+        """
+        if self._age() >= self.ttl:
+            self._load()
+
+        project_id = self._ids.get(name)
+        if project_id is None and self._age() >= self.miss_refresh:
+            # Someone may have created it in Toggl since the last load
+            self._load()
+            project_id = self._ids.get(name)
+
+        if project_id is None and create:
+            project_id = self.toggl.create_project(name)
+            self._ids[name] = project_id
+            logger.info(f"Created Toggl Track project '{name}' (ID: {project_id})")
+
+        return project_id
@@ -0,0 +1,171 @@
+# anytoggl/quota.py
+import hashlib
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+import httpx
+
+QUOTA_REMAINING_HEADER = "X-Toggl-Quota-Remaining"
+QUOTA_RESETS_IN_HEADER = "X-Toggl-Quota-Resets-In"
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a request would exceed the hourly budget of its token."""
+
+    def __init__(self, scope: str, resets_in: float):
+        super().__init__(f"Toggl {scope} quota exhausted (resets in {resets_in:.0f}s)")
+        self.scope = scope
+        self.resets_in = resets_in
+
+
+class QuotaBudget:
+    """Sliding-window request budget for one Toggl token and quota scope.
+
+    The local count is authoritative until the server reports its own view
+    through the ``X-Toggl-Quota-*`` headers, after which the lower of both
+    values is used.
+    """
+
+    def __init__(self, scope: str, limit: int = 30, window: float = 3600.0):
+        """Initialize quota budget.
+
+        Args:
+            scope: Quota scope name ("org" or "user")
+            limit: Requests allowed per window
+            window: Window length in seconds
+        """
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self._calls: deque[float] = deque()
+        self._server_remaining: int | None = None
+        self._server_reset_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._calls and self._calls[0] <= now - self.window:
+            self._calls.popleft()
+
+    def _remaining(self, now: float) -> int:
+        self._prune(now)
+        local = self.limit - len(self._calls)
+        if self._server_remaining is not None and now < self._server_reset_at:
+            return max(0, min(local, self._server_remaining))
+        return max(0, local)
+
+    def remaining(self) -> int:
+        """Number of requests still available in the current window."""
+        with self._lock:
+            return self._remaining(time.monotonic())
+
+    def _resets_in(self, now: float) -> float:
+        if self._remaining(now) > 0:
+            return 0.0
+        waits = [self._calls[0] + self.window - now] if self._calls else []
+        if self._server_remaining is not None and now < self._server_reset_at:
+            waits.append(self._server_reset_at - now)
+        return max(0.0, min(waits)) if waits else 0.0
+
+    def resets_in(self) -> float:
+        """Seconds until at least one request becomes available again."""
+        with self._lock:
+            return self._resets_in(time.monotonic())
+
+    def check(self):
+        """Raise QuotaExceededError if no request is left in the window."""
+        with self._lock:
+            now = time.monotonic()
+            if self._remaining(now) <= 0:
+                raise QuotaExceededError(self.scope, self._resets_in(now))
+
+    def spend(self):
+        """Record one request sent to the server."""
+        with self._lock:
+            self._calls.append(time.monotonic())
+            if self._server_remaining is not None:
+                self._server_remaining -= 1
+
+    def acquire(self):
+        """Spend one request, raising QuotaExceededError if none is left."""
+        with self._lock:
+            now = time.monotonic()
+            if self._remaining(now) <= 0:
+                raise QuotaExceededError(self.scope, self._resets_in(now))
+            self._calls.append(now)
+            if self._server_remaining is not None:
+                self._server_remaining -= 1
+
+    def observe(self, headers: httpx.Headers):
+        """Resynchronize with the quota headers of a Toggl response."""
+        remaining = headers.get(QUOTA_REMAINING_HEADER)
+        resets_in = headers.get(QUOTA_RESETS_IN_HEADER)
+        if remaining is None or resets_in is None:
+            return
+        try:
+            remaining_value = int(remaining)
+            resets_value = float(resets_in)
+        except ValueError:
+            return
+        with self._lock:
+            self._server_remaining = remaining_value
+            self._server_reset_at = time.monotonic() + resets_value
+
+
+class QuotaTransport(httpx.BaseTransport):
+    """Charges the requests that go out to Toggl to the budget of their scope.
+
+    Sits below the HTTP cache and the circuit breaker, so cache hits and
+    calls failed fast never touch the budget. A 304 only revalidates a
+    cached response and is not charged either.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        budget_for: Callable[[httpx.Request], QuotaBudget],
+    ):
+        """Initialize quota transport.
+
+        Args:
+            transport: Transport sending the requests
+            budget_for: Budget a request is charged to
+        """
+        self.transport = transport
+        self.budget_for = budget_for
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        budget = self.budget_for(request)
+        budget.check()
+        response = self.transport.handle_request(request)
+        if response.status_code != 304:
+            budget.spend()
+        budget.observe(response.headers)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+_budgets: dict[tuple[str, str], QuotaBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def quota_for(token: str, scope: str, limit: int = 30) -> QuotaBudget:
+    """Get the process-wide budget for a token, isolated from other tokens.
+
+    Args:
+        token: Toggl API token the budget belongs to
+        scope: Quota scope name ("org" or "user")
+        limit: Requests allowed per hour, used when the budget is first created
+
+    Returns:
+        Shared QuotaBudget for this token and scope
+    """
+    key = (hashlib.sha256(token.encode()).hexdigest(), scope)
+    with _budgets_lock:
+        budget = _budgets.get(key)
+        if budget is None:
+            budget = QuotaBudget(scope, limit=limit)
+            _budgets[key] = budget
+        return budget
@@ -0,0 +1,303 @@
+# anytoggl/rollups.py
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import duckdb
+from loguru import logger
+from anytoggl import bulk
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.models import AnytypeTask, TogglTimeEntry
+
+# Anytype number property receiving the tracked minutes of tasks and projects
+ROLLUP_PROPERTY = "tracked_minutes"
+
+ENTRY_COLUMNS = {
+    "id": "BIGINT",
+    "seconds": "BIGINT",
+    "description": "TEXT",
+    "start": "DOUBLE",
+}
+
+# Entry ID → (owning task ID or None, seconds, description, start)
+Contribution = tuple[str | None, int, str | None, datetime]
+
+
+class TimeRollups:
+    """Tracked time per Anytype task and project, maintained from entry deltas.
+
+    An entry counts for the task linked to it, or else for the only task
+    named like its description (Toggl's "continue" copies the description).
+    Running entries count once they stop. Every entry remembers what it
+    contributed, so a changed or deleted entry only moves its own delta,
+    and only entries whose link or task name changed are re-attributed.
+
+    Totals cover every entry ever seen: the entries of the first listing,
+    everything fetched since, and whatever ``backfill`` added. Entries are
+    kept when a later listing no longer reaches back to them; a listing
+    only drops missing entries that started within the time it covers.
+
+    Objects whose total changed are marked dirty; ``due_writes`` returns
+    those whose minutes differ from the value last written to Anytype.
+    With a ``db_path`` the entries and the written values survive restarts.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        """Initialize tracked-time rollups.
+
+        Args:
+            db_path: Optional DuckDB file persisting entries and written values
+        """
+        self.db_path = db_path
+        self.seeded = False
+        self._entries: dict[int, Contribution] = {}
+        self._by_description: dict[str, set[int]] = defaultdict(set)
+        self._links: dict[int, str] = {}  # entry ID → linked task ID
+        self._names: dict[str, str | None] = {}  # name → task ID, None if shared
+        self._projects: dict[str, str | None] = {}  # task ID → project object ID
+        self.task_seconds: dict[str, int] = defaultdict(int)
+        self.project_seconds: dict[str, int] = defaultdict(int)
+        self.dirty: set[str] = set()
+        self.written: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            self._load_db()
+
+    def _load_db(self):
+        """Create the rollup tables and load the entries and written values."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollups (
+                object_id TEXT PRIMARY KEY,
+                minutes INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_entries (
+                id BIGINT PRIMARY KEY,
+                seconds BIGINT NOT NULL,
+                description TEXT,
+                start DOUBLE NOT NULL
+            )
+        """)
+        rows = conn.execute("SELECT * FROM rollups").fetchall()
+        entries = conn.execute("SELECT * FROM rollup_entries").fetchall()
+        conn.close()
+        self.written = dict(rows)
+        # Owners are attributed once update_tasks brings in links and names
+        for entry_id, seconds, description, start in entries:
+            self._entries[entry_id] = (
+                None,
+                seconds,
+                description,
+                datetime.fromtimestamp(start, timezone.utc),
+            )
+            if description:
+                self._by_description[description].add(entry_id)
+        logger.debug(
+            f"Loaded {len(entries)} rolled-up entries and {len(rows)} written "
+            f"rollups from {self.db_path}"
+        )
+
+    def _save_entries(self, entry_ids: set[int]):
+        if not self.db_path or not entry_ids:
+            return
+        kept = [
+            (i, c[1], c[2], c[3].timestamp())
+            for i in entry_ids
+            if (c := self._entries.get(i)) is not None
+        ]
+        dropped = [i for i in entry_ids if i not in self._entries]
+        conn = duckdb.connect(self.db_path)
+        bulk.delete(conn, "rollup_entries", "id", "BIGINT", dropped)
+        bulk.upsert(conn, "rollup_entries", ENTRY_COLUMNS, kept)
+        conn.close()
+
+    def _move(self, task_id: str | None, seconds: int):
+        """Add (or with negative ``seconds`` remove) time to a task and its project."""
+        if task_id is None or not seconds:
+            return
+        self.task_seconds[task_id] += seconds
+        self.dirty.add(task_id)
+        project = self._projects.get(task_id)
+        if project:
+            self.project_seconds[project] += seconds
+            self.dirty.add(project)
+
+    def _owner(self, entry_id: int, description: str | None) -> str | None:
+        task_id = self._links.get(entry_id)
+        if task_id is None and description:
+            task_id = self._names.get(description)
+        return task_id
+
+    def _drop_entry(self, entry_id: int):
+        old = self._entries.pop(entry_id, None)
+        if old is not None:
+            self._move(old[0], -old[1])
+            if old[2]:
+                self._by_description[old[2]].discard(entry_id)
+
+    def _set_entry(
+        self, entry_id: int, seconds: int, description: str | None, start: datetime
+    ):
+        self._drop_entry(entry_id)
+        owner = self._owner(entry_id, description)
+        self._entries[entry_id] = (owner, seconds, description, start)
+        if description:
+            self._by_description[description].add(entry_id)
+        self._move(owner, seconds)
+
+    def _reattribute(self, entry_ids: set[int]):
+        for entry_id in entry_ids:
+            if entry_id in self._entries:
+                _, seconds, description, start = self._entries[entry_id]
+                self._set_entry(entry_id, seconds, description, start)
+
+    def update_tasks(self, tasks: list[AnytypeTask]):
+        """Take in the links, names and projects of this cycle's tasks.
+
+        Only entries whose link or task name changed are re-attributed, and
+        only tasks that moved project move their total.
+        """
+        links = {
+            int(t.toggl_track_id): t.id
+            for t in tasks
+            if t.toggl_track_id and t.toggl_track_id.isdigit()
+        }
+        names: dict[str, str | None] = {}
+        for task in tasks:
+            names[task.name] = None if task.name in names else task.id
+        projects = {t.id: t.project_object_id for t in tasks}
+
+        with self._lock:
+            moved = [
+                task_id
+                for task_id, project in projects.items()
+                if self._projects.get(task_id) != project
+            ]
+            for task_id in moved:
+                seconds = self.task_seconds.get(task_id, 0)
+                self._move(task_id, -seconds)
+                self._projects[task_id] = projects[task_id]
+                self._move(task_id, seconds)
+
+            affected = {
+                entry_id
+                for entry_id in links.keys() | self._links.keys()
+                if links.get(entry_id) != self._links.get(entry_id)
+            }
+            for name in names.keys() | self._names.keys():
+                if names.get(name) != self._names.get(name):
+                    affected |= self._by_description.get(name, set())
+            self._links = links
+            self._names = names
+            self._reattribute(affected)
+
+    def apply(
+        self,
+        changed: list[TogglTimeEntry],
+        deleted: list[int],
+        covers_from: datetime | None = None,
+        covers_until: datetime | None = None,
+    ):
+        """Apply entry deltas, or a listing covering a span of time.
+
+        Args:
+            changed: New or changed entries
+            deleted: IDs of deleted entries
+            covers_from: Start of the span ``changed`` lists completely;
+                known entries started within it but not listed are dropped
+            covers_until: End of that span, open-ended if None
+        """
+        with self._lock:
+            touched = set(deleted)
+            if covers_from is not None:
+                listed = {e.id for e in changed}
+                for entry_id, (_, _, _, start) in list(self._entries.items()):
+                    in_span = start >= covers_from and (
+                        covers_until is None or start < covers_until
+                    )
+                    if in_span and entry_id not in listed:
+                        self._drop_entry(entry_id)
+                        touched.add(entry_id)
+            for entry in changed:
+                # A running timer counts once it stops
+                seconds = entry.duration if entry.duration >= 0 else 0
+                known = self._entries.get(entry.id)
+                if known and known[1:] == (seconds, entry.description, entry.start):
+                    continue
+                self._set_entry(entry.id, seconds, entry.description, entry.start)
+                touched.add(entry.id)
+            for entry_id in deleted:
+                self._drop_entry(entry_id)
+            self._save_entries(touched)
+
+    def seed(self, entries: list[TogglTimeEntry]):
+        """Take in every entry of the index once per process.
+
+        Entries are only added or updated: the index may hold old entries
+        edited recently, so it does not list any span of time completely.
+        """
+        self.apply(entries, [])
+        self.seeded = True
+
+    def apply_listing(self, entries: list[TogglTimeEntry]):
+        """Apply a full listing of recent entries, complete from its oldest start on."""
+        covers_from = min((e.start for e in entries), default=None)
+        self.apply(entries, [], covers_from)
+        self.seeded = True
+
+    def backfill(self, toggl: TogglClient, days: int, chunk_days: int = 30) -> int:
+        """Add the entries of the last ``days`` days, one request per chunk.
+
+        Older history is not in the listings the sync fetches; this pulls
+        it once by date range. Each chunk replaces what is known of its span.
+
+        Returns:
+            Number of entries listed
+        """
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=days)
+        listed = 0
+        while start < now:
+            end = min(start + timedelta(days=chunk_days), now)
+            entries = toggl.list_time_entries(start=start, end=end)
+            self.apply(entries, [], start, end)
+            listed += len(entries)
+            logger.info(f"Backfilled {len(entries)} entries from {start:%Y-%m-%d}")
+            start = end
+        return listed
+
+    def minutes(self, object_id: str) -> int:
+        seconds = self.task_seconds.get(object_id)
+        if seconds is None:
+            seconds = self.project_seconds.get(object_id, 0)
+        return round(seconds / 60)
+
+    def due_writes(self) -> dict[str, int]:
+        """Minutes to write per object, for objects whose value changed."""
+        with self._lock:
+            due = {}
+            for object_id in list(self.dirty):
+                minutes = self.minutes(object_id)
+                if minutes == self.written.get(object_id, 0):
+                    self.dirty.discard(object_id)
+                else:
+                    due[object_id] = minutes
+            return due
+
+    def mark_written(self, values: dict[str, int]):
+        """Remember the minutes Anytype now stores, per object ID."""
+        if not values:
+            return
+        with self._lock:
+            self.written.update(values)
+            self.dirty.difference_update(values)
+            if self.db_path:
+                conn = duckdb.connect(self.db_path)
+                bulk.upsert(
+                    conn,
+                    "rollups",
+                    {"object_id": "TEXT", "minutes": "INTEGER"},
+                    list(values.items()),
+                )
+                conn.close()
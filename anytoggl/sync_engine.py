@@ -1,83 +1,483 @@
 # anytoggl/sync_engine.py
 from datetime import datetime, timezone
+from loguru import logger
+from anytoggl.checkpoint import SyncCheckpoint
 from anytoggl.clients.anytype import AnytypeClient
 from anytoggl.clients.toggl import TogglClient
+from anytoggl.creation import CreationPolicy
+from anytoggl.echo import ANYTYPE, TOGGL, WriteLog
+from anytoggl.entry_index import EntryIndex
+from anytoggl.http import CircuitOpenError, DeadlineExceeded, deadline_passed
+from anytoggl.models import AnytypeTask, TogglTimeEntry
+from anytoggl.priority import COSMETIC, CREATE, RECENT, TIMER, OperationQueue
+from anytoggl.profiling import phase
+from anytoggl.project_index import ProjectIndex
+from anytoggl.quota import QuotaExceededError
+from anytoggl.rollups import ROLLUP_PROPERTY, TimeRollups
+from anytoggl.tiers import SideState, TaskTiers
+from anytoggl.warehouse import EntryWarehouse
 
 
 class SyncEngine:
-    def __init__(self, anytype: AnytypeClient, toggl: TogglClient):
+    def __init__(
+        self,
+        anytype: AnytypeClient,
+        toggl: TogglClient,
+        warehouse: EntryWarehouse | None = None,
+        entries: EntryIndex | None = None,
+        writes: WriteLog | None = None,
+        creation: CreationPolicy | None = None,
+        checkpoint: SyncCheckpoint | None = None,
+        tiers: TaskTiers | None = None,
+        rollups: TimeRollups | None = None,
+        rollup_batch: int = 50,
+    ):
         self.anytype = anytype
         self.toggl = toggl
+        # Toggl entries kept across cycles, refreshed with delta fetches
+        self.entries = entries or EntryIndex()
+        # Spends the Toggl quota on the most visible writes first
+        self.queue = OperationQueue()
+        # Optional local copy of everything fetched, for quota-free reports
+        self.warehouse = warehouse
+        # Kept across cycles, projects are only resolved when a write needs them
+        self.projects = ProjectIndex(toggl)
+        # Own writes, so their timestamp bumps are not synced back
+        self.writes = writes or WriteLog()
+        # Unlinked tasks only get an entry once work starts on them
+        self.creation = creation or CreationPolicy(["In Progress"])
+        # Pending write-backs and failed tasks, carried over to later cycles
+        self.checkpoint = checkpoint or SyncCheckpoint()
+        # Active tasks are reconciled every cycle, settled ones less often
+        self.tiers = tiers or TaskTiers()
+        # Tracked time per task and project, written back when it changes
+        self.rollups = rollups or TimeRollups()
+        self.rollup_batch = rollup_batch
+        # Toggl entry ID → linked task ID, from the latest task listing
+        self._links: dict[str, str] | None = None
+
+    def _project_id(self, task: AnytypeTask) -> int | None:
+        if not task.project:
+            return None
+        return self.projects.resolve(task.project)
 
     def run(self):
-        any_tasks = self.anytype.search_tasks()
-        toggl_entries = self.toggl.list_time_entries()
-        projects = self.toggl.list_projects()
+        try:
+            self._run()
+        finally:
+            # The write log is persisted once per cycle, even a cut-short one
+            self.writes.flush()
+
+    def _run(self):
+        with phase("anytype.search_tasks"):
+            any_tasks = self.anytype.search_tasks()
+        self._index_links(any_tasks)
+        with phase("toggl.list_time_entries"):
+            changed, deleted = self.entries.refresh(self.toggl)
 
         # Index Toggl entries by ID for quick lookup
-        toggl_by_id = {str(e.id): e for e in toggl_entries}
-
-        for task in any_tasks:
-            # Resolve project
-            project_id = None
-            if task.project:
-                project_id = projects.get(task.project)
-                if project_id is None:
-                    project_id = self.toggl.create_project(task.project)
-                    projects[task.project] = project_id
-
-            # Create in Toggl if no toggl_track_id exists
-            if not task.toggl_track_id:
-                # Create a time entry for this task
-                # Use current time as start, duration=-1 for running timer if "In Progress"
-                now = datetime.now(timezone.utc).isoformat()
-                is_running = task.status == "In Progress"
-
-                payload = {
-                    "description": task.name,
-                    "start": now,
-                    "duration": -1
-                    if is_running
-                    else 0,  # -1 = running, 0 = stopped immediately
-                }
-                if project_id:
-                    payload["project_id"] = project_id
-
-                toggl_entry = self.toggl.create_time_entry(payload)
-                self.anytype.update_task(
-                    task.id, {"toggl_track_id": str(toggl_entry.id)}
+        toggl_by_id = self.entries.by_id()
+
+        with phase("rollups"):
+            self.rollups.update_tasks(any_tasks)
+            if self.entries.last_refresh_full:
+                self.rollups.apply_listing(changed)
+            elif not self.rollups.seeded:
+                self.rollups.seed(list(toggl_by_id.values()))
+            else:
+                self.rollups.apply(changed, deleted)
+
+        with phase("reconcile"):
+            self._apply(any_tasks, toggl_by_id)
+
+        with phase("rollups"):
+            self._write_rollups(any_tasks, toggl_by_id)
+
+        if self.warehouse:
+            with phase("warehouse"):
+                self.warehouse.record_tasks(any_tasks)
+                self.warehouse.record_entries(changed)
+                self.warehouse.delete_entries(deleted)
+                self.warehouse.record_projects(self.projects.known())
+
+    def _priority(
+        self, task: AnytypeTask, toggl_by_id: dict[str, TogglTimeEntry]
+    ) -> int | None:
+        """Rank the write a task needs, or None if it is in sync."""
+        if not task.toggl_track_id:
+            if not self.creation.should_create(task):
+                return None
+            # Creating an "In Progress" task starts a timer
+            return TIMER if task.status == "In Progress" else CREATE
+
+        toggl_entry = toggl_by_id.get(task.toggl_track_id)
+        if not toggl_entry or not task.last_modified or not toggl_entry.at:
+            return None
+        if self.writes.is_echo(task, toggl_entry):
+            return None
+        if task.last_modified > toggl_entry.at:
+            return RECENT if self.queue.is_recent(task.last_modified) else COSMETIC
+        if toggl_entry.at > task.last_modified:
+            running = toggl_entry.duration < 0
+            if running != (task.status == "In Progress"):
+                return TIMER
+            return RECENT
+        return None
+
+    def _side(
+        self, task: AnytypeTask, toggl_by_id: dict[str, TogglTimeEntry]
+    ) -> SideState:
+        entry = toggl_by_id.get(task.toggl_track_id) if task.toggl_track_id else None
+        if entry is None:
+            return False, None
+        return entry.duration < 0, entry.at
+
+    def _apply(
+        self,
+        tasks: list[AnytypeTask],
+        toggl_by_id: dict[str, TogglTimeEntry],
+        complete: bool = True,
+    ):
+        """Sync tasks in priority order, deferring writes once the quota runs out.
+
+        A task that fails is logged and put in the retry set with its own
+        backoff; the other tasks of the cycle still go through. Once the
+        cycle deadline passes, the remaining tasks keep their place in the
+        queue for the next cycle. A complete cycle only reconciles the tasks
+        due in their tier.
+
+        Args:
+            tasks: Tasks to reconcile
+            toggl_by_id: Known Toggl entries by ID
+            complete: Whether ``tasks`` holds every task, not just a pushed subset
+        """
+        if complete:
+            tasks = self.tiers.select(tasks, lambda t: self._side(t, toggl_by_id))
+        operations = []
+        for task in tasks:
+            priority = self._priority(task, toggl_by_id)
+            if priority is not None:
+                operations.append((task.id, priority, task))
+        pending = {task_id for task_id, _, _ in operations}
+        for task in tasks:
+            if task.id not in pending:
+                self.tiers.settle(task, self._side(task, toggl_by_id)[1])
+
+        deferred, failed, backing_off, unfinished = 0, 0, 0, 0
+        for task in self.queue.order(operations, complete):
+            if deadline_passed():
+                unfinished += 1
+                continue
+            if not self.checkpoint.is_due(task.id):
+                backing_off += 1
+                continue
+            try:
+                self._sync_task(task, toggl_by_id)
+            except (QuotaExceededError, CircuitOpenError):
+                # Keeps its place and ages; Anytype-only pulls still go through
+                deferred += 1
+                continue
+            except DeadlineExceeded:
+                unfinished += 1
+                continue
+            except Exception as e:
+                delay = self.checkpoint.failed(task.id)
+                failed += 1
+                error = str(e).splitlines()[0]
+                logger.error(
+                    f"Sync of '{task.name}' failed, retrying in {delay:.0f}s: {error}"
                 )
                 continue
+            self.checkpoint.succeeded(task.id)
+            self.tiers.settle(task, self._side(task, toggl_by_id)[1])
+            self.queue.done(task.id)
+        if deferred:
+            logger.warning(f"Toggl quota exhausted, deferred {deferred} writes")
+        if unfinished:
+            logger.warning(
+                f"Cycle deadline reached, {unfinished} writes left for the next cycle"
+            )
+        if failed or backing_off:
+            logger.warning(
+                f"{failed} tasks failed this cycle, {backing_off} still backing off"
+            )
 
-            # Update flow - check if entry exists in Toggl
-            toggl_entry = toggl_by_id.get(task.toggl_track_id)
-            if not toggl_entry:
-                continue
+    def sync_task(self, anytype_id: str):
+        """Reconcile a single Anytype task with its Toggl entry.
 
-            # Compare timestamps for sync direction
-            at_ts = task.last_modified
-            tg_ts = toggl_entry.at
+        Fetches only the task and its linked entry instead of doing a full scan.
+        """
+        task = self.anytype.get_task(anytype_id)
+        if task is None:
+            logger.warning(f"Anytype object {anytype_id} is not a task tagged 'Toggl'")
+            return
 
-            # Skip if no valid timestamp comparison available
-            if not at_ts or not tg_ts:
-                continue
+        toggl_by_id = {}
+        if task.toggl_track_id:
+            entry = self.toggl.get_time_entry(int(task.toggl_track_id))
+            if entry is None:
+                logger.warning(
+                    f"Toggl entry {task.toggl_track_id} of '{task.name}' not found"
+                )
+                return
+            toggl_by_id[task.toggl_track_id] = entry
+            self._roll_up(*self.entries.merge([entry]))
+
+        try:
+            self._sync_task(task, toggl_by_id)
+        finally:
+            self.writes.flush()
+        logger.info(f"Synced '{task.name}' with Toggl Track")
+
+    def _index_links(self, tasks: list[AnytypeTask]):
+        self._links = {t.toggl_track_id: t.id for t in tasks if t.toggl_track_id}
+
+    def sync_entries(self, entries: list[TogglTimeEntry]):
+        """Reconcile only the tasks linked to the given Toggl entries.
 
-            # Anytype newer → push to Toggl
-            if at_ts > tg_ts:
-                payload = {"description": task.name}
-                if project_id:
-                    payload["project_id"] = project_id
-                self.toggl.update_time_entry(toggl_entry.id, payload)
-
-            # Toggl newer → pull to Anytype
-            elif tg_ts > at_ts:
-                updates = {}
-                if toggl_entry.description:
-                    updates["name"] = toggl_entry.description
-                # If entry is running (negative duration), set to In Progress
-                if toggl_entry.duration < 0:
-                    updates["status"] = "In Progress"
-                elif toggl_entry.stop:
-                    updates["status"] = "Done"
-                if updates:
-                    self.anytype.update_task(task.id, updates)
+        Used for pushed changes (e.g. webhooks), where the entries are already
+        known and no Toggl read is needed. Linked tasks are found through the
+        links of the latest task listing and fetched one by one; entries
+        linked since then are picked up by the next full cycle.
+        """
+        self._roll_up(*self.entries.merge(entries))
+        toggl_by_id = {str(e.id): e for e in entries}
+        if self._links is None:
+            self._index_links(self.anytype.search_tasks())
+        linked = []
+        for entry_id in toggl_by_id:
+            task_id = self._links.get(entry_id)
+            task = self.anytype.get_task(task_id) if task_id else None
+            # The link may have changed since the listing
+            if task is not None and task.toggl_track_id == entry_id:
+                linked.append(task)
+        try:
+            self._apply(linked, toggl_by_id, complete=False)
+        finally:
+            self.writes.flush()
+        if self.warehouse:
+            self.warehouse.record_entries(entries)
+
+    def migrate_premature_entries(
+        self, delete: bool = False, dry_run: bool = False
+    ) -> tuple[int, int]:
+        """Unlink zero-duration entries the creation policy would not create.
+
+        Their tasks go back to unlinked and get a fresh entry once work
+        starts. Unlinking only writes to Anytype; ``delete`` also removes
+        the entries from Toggl at one request each, stopping when the quota
+        runs out (run again later to continue).
+
+        Linked entries missing from the index (older than its first listing,
+        as the first sync's entries usually are) are fetched one by one, on
+        the user quota; those left unchecked when it runs out are reported.
+
+        Args:
+            delete: Also delete the entries in Toggl
+            dry_run: Only count what would be migrated
+
+        Returns:
+            Tuple of (tasks unlinked, entries deleted)
+        """
+        tasks = self.anytype.search_tasks()
+        self.entries.refresh(self.toggl)
+        toggl_by_id = self.entries.by_id()
+        unknown = [
+            task
+            for task in tasks
+            if task.toggl_track_id
+            and task.toggl_track_id.isdigit()
+            and task.toggl_track_id not in toggl_by_id
+            and not self.creation.should_create(task)
+        ]
+        for checked, task in enumerate(unknown):
+            try:
+                entry = self.toggl.get_time_entry(int(task.toggl_track_id))
+            except QuotaExceededError as e:
+                logger.warning(
+                    f"{len(unknown) - checked} linked entries older than the index "
+                    f"left unchecked, run again later: {e}"
+                )
+                break
+            if entry is not None:
+                toggl_by_id[task.toggl_track_id] = entry
+        premature = [
+            (task, toggl_by_id[task.toggl_track_id])
+            for task in tasks
+            if task.toggl_track_id in toggl_by_id
+            and self.creation.is_premature(task, toggl_by_id[task.toggl_track_id])
+        ]
+        logger.info(
+            f"{len(premature)} empty entries outside the creation policy "
+            f"({self.creation})"
+        )
+        if dry_run:
+            return len(premature), 0
+
+        unlinked, deleted = 0, []
+        for task, entry in premature:
+            if delete:
+                try:
+                    self.toggl.delete_time_entry(entry.id)
+                except QuotaExceededError as e:
+                    logger.warning(f"Stopping migration: {e}")
+                    break
+                deleted.append(entry.id)
+            self.anytype.update_task(task.id, {"toggl_track_id": ""})
+            unlinked += 1
+        if deleted:
+            self.delete_entries(deleted)
+        return unlinked, len(deleted)
+
+    def delete_entries(self, entry_ids: list[int]):
+        """Forget Toggl entries reported as deleted, e.g. by a webhook."""
+        self.entries.remove(entry_ids)
+        self._roll_up([], entry_ids)
+        if self.warehouse:
+            self.warehouse.delete_entries(entry_ids)
+
+    def _roll_up(self, changed: list[TogglTimeEntry], deleted: list[int]):
+        """Apply pushed entry changes to the rollups, written on the next cycle."""
+        # Until a full cycle seeds them, the rollups are built from the index then
+        if self.rollups.seeded:
+            self.rollups.apply(changed, deleted)
+
+    def _write_rollups(
+        self, tasks: list[AnytypeTask], toggl_by_id: dict[str, TogglTimeEntry]
+    ):
+        """Write changed tracked-time rollups to Anytype, one PATCH per object.
+
+        At most ``rollup_batch`` objects are written per cycle; the rest stay
+        dirty for the next one. Tasks with a pending sync are written once
+        they are in sync, so the bump of their timestamp is a known echo.
+        """
+        due = self.rollups.due_writes()
+        if not due:
+            return
+        by_id = {t.id: t for t in tasks}
+        # Stored in one batch once the loop ends, however it ends
+        written: dict[str, int] = {}
+        try:
+            for object_id, minutes in due.items():
+                if len(written) >= self.rollup_batch or deadline_passed():
+                    break
+                task = by_id.get(object_id)
+                if task is not None and self.queue.is_pending(task.id):
+                    continue
+                try:
+                    self.anytype.update_task(object_id, {ROLLUP_PROPERTY: minutes})
+                except DeadlineExceeded:
+                    break
+                except Exception as e:
+                    error = str(e).splitlines()[0]
+                    logger.error(f"Writing tracked time of {object_id} failed: {error}")
+                    continue
+                written[object_id] = minutes
+                entry = toggl_by_id.get(task.toggl_track_id) if task else None
+                if entry is not None and task.id not in self.writes.records:
+                    # In sync: without a record the bump would be pushed to Toggl
+                    self.writes.record(TOGGL, task, entry)
+        finally:
+            self.rollups.mark_written(written)
+        left = len(due) - len(written)
+        logger.info(
+            f"Wrote tracked time of {len(written)} objects"
+            + (f", {left} left for the next cycle" if left else "")
+        )
+
+    def _pending_entry(
+        self, task: AnytypeTask, toggl_by_id: dict[str, TogglTimeEntry]
+    ) -> TogglTimeEntry | None:
+        """Entry created for a task by an earlier attempt, if it still exists."""
+        entry_id = self.checkpoint.pending_link(task.id)
+        if entry_id is None:
+            return None
+        entry = toggl_by_id.get(str(entry_id)) or self.toggl.get_time_entry(entry_id)
+        if entry is None:
+            self.checkpoint.link_done(task.id)
+            return None
+        logger.info(f"Linking '{task.name}' to entry {entry_id} created earlier")
+        return entry
+
+    def _create_entry(self, task: AnytypeTask) -> TogglTimeEntry:
+        """Create the time entry of a task and checkpoint it as pending link."""
+        # Use current time as start, duration=-1 for running timer if "In Progress"
+        now = datetime.now(timezone.utc).isoformat()
+        is_running = task.status == "In Progress"
+
+        payload = {
+            "description": task.name,
+            "start": now,
+            "duration": -1
+            if is_running
+            else 0,  # -1 = running, 0 = stopped immediately
+        }
+        project_id = self._project_id(task)
+        if project_id:
+            payload["project_id"] = project_id
+
+        toggl_entry = self.toggl.create_time_entry(payload)
+        # Checkpoint first: a failed write-back must not cause a duplicate
+        self.checkpoint.link_pending(task.id, toggl_entry.id)
+        return toggl_entry
+
+    def _sync_task(self, task: AnytypeTask, toggl_by_id: dict[str, TogglTimeEntry]):
+        # Create in Toggl if no toggl_track_id exists
+        if not task.toggl_track_id:
+            if not self.creation.should_create(task):
+                logger.debug(f"Deferring entry of '{task.name}' ({task.status})")
+                return
+            # An earlier attempt may have created the entry already
+            toggl_entry = self._pending_entry(task, toggl_by_id)
+            if toggl_entry is None:
+                toggl_entry = self._create_entry(task)
+            self.anytype.update_task(task.id, {"toggl_track_id": str(toggl_entry.id)})
+            self.checkpoint.link_done(task.id)
+            if self._links is not None:
+                self._links[str(toggl_entry.id)] = task.id
+            self.writes.record(ANYTYPE, task, toggl_entry)
+            return
+
+        # Update flow - check if entry exists in Toggl
+        toggl_entry = toggl_by_id.get(task.toggl_track_id)
+        if not toggl_entry:
+            return
+
+        # Compare timestamps for sync direction
+        at_ts = task.last_modified
+        tg_ts = toggl_entry.at
+
+        # Skip if no valid timestamp comparison available
+        if not at_ts or not tg_ts:
+            return
+
+        # A side bumped by our own last write looks newer but has nothing new
+        if self.writes.is_echo(task, toggl_entry):
+            logger.debug(f"Skipping echo of our last write to '{task.name}'")
+            return
+
+        # Anytype newer → push to Toggl
+        if at_ts > tg_ts:
+            payload = {"description": task.name}
+            project_id = self._project_id(task)
+            if project_id:
+                payload["project_id"] = project_id
+            updated = self.toggl.update_time_entry(toggl_entry.id, payload)
+            self.writes.record(ANYTYPE, task, updated)
+
+        # Toggl newer → pull to Anytype
+        elif tg_ts > at_ts:
+            updates = {}
+            if toggl_entry.description:
+                updates["name"] = toggl_entry.description
+            # If entry is running (negative duration), set to In Progress
+            if toggl_entry.duration < 0:
+                updates["status"] = "In Progress"
+            elif toggl_entry.stop:
+                updates["status"] = "Done"
+            if updates:
+                self.anytype.update_task(task.id, updates)
+                pulled = task.model_copy(
+                    update={"name": updates.get("name", task.name)}
+                )
+                self.writes.record(TOGGL, pulled, toggl_entry)
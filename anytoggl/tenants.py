@@ -0,0 +1,184 @@
+# anytoggl/tenants.py
+import re
+import tomllib
+from pathlib import Path
+from pydantic import BaseModel
+from anytoggl.checkpoint import SyncCheckpoint
+from anytoggl.clients.anytype import AnytypeClient
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.clients.toggl_plan import TogglPlanClient
+from anytoggl.creation import CreationPolicy
+from anytoggl.echo import WriteLog
+from anytoggl.entry_index import EntryIndex
+from anytoggl.plan_sync_engine import PlanSyncEngine
+from anytoggl.rollups import TimeRollups
+from anytoggl.scheduler import TaskScheduler
+from anytoggl.sync_engine import SyncEngine
+from anytoggl.tiers import TaskTiers
+from anytoggl.warehouse import EntryWarehouse
+
+
+# Tenant names become part of file names (warehouse-<name>.db, ...)
+TENANT_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class TenantConfig(BaseModel):
+    """One Anytype space paired with a Track and/or Plan workspace."""
+
+    name: str
+    interval: int = 300
+    # Seconds a cycle may take before it is cut off (0: the interval)
+    cycle_budget: int = 0
+    anytype_api_url: str = "http://localhost:31009"
+    anytype_token: str
+    anytype_space_id: str
+
+    # Toggl Track (optional)
+    toggl_api_token: str | None = None
+    toggl_workspace_id: int | None = None
+    toggl_quota_per_hour: int = 30
+    # Hourly quota of the /me endpoints (time entries, current timer)
+    toggl_user_quota_per_hour: int = 30
+    # Statuses whose tasks get a time entry right away ("*" for all)
+    toggl_create_statuses: str = "In Progress"
+
+    # Cycles between checks of unchanged warm (not done) and cold (done) tasks
+    tier_warm_every: int = 4
+    tier_cold_every: int = 24
+
+    # Toggl Plan (optional)
+    toggl_plan_workspace_id: int | None = None
+    toggl_plan_client_id: str | None = None
+    toggl_plan_client_secret: str | None = None
+    toggl_plan_username: str | None = None
+    toggl_plan_password: str | None = None
+    toggl_plan_default_project: str = "anytoggl"
+    toggl_plan_default_minutes: int = 60
+
+    # Scheduling (Plan only)
+    schedule_start_hour: int = 8
+    schedule_end_hour: int = 20
+    default_task_duration_hours: int = 1
+
+    @property
+    def has_track(self) -> bool:
+        return bool(self.toggl_api_token and self.toggl_workspace_id)
+
+    @property
+    def has_plan(self) -> bool:
+        return bool(
+            self.toggl_plan_workspace_id
+            and self.toggl_plan_client_id
+            and self.toggl_plan_client_secret
+            and self.toggl_plan_username
+            and self.toggl_plan_password
+        )
+
+
+def load_tenants(path: str | Path) -> list[TenantConfig]:
+    """Load tenant configuration from a TOML file.
+
+    The file holds an optional ``[defaults]`` table merged into every
+    ``[[tenant]]`` entry, so shared settings are written once.
+
+    Args:
+        path: Path to the tenants TOML file
+
+    Returns:
+        List of validated tenant configurations
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    defaults = data.get("defaults", {})
+    tenants = [TenantConfig(**{**defaults, **t}) for t in data.get("tenant", [])]
+
+    names = set()
+    for tenant in tenants:
+        if not TENANT_NAME.fullmatch(tenant.name):
+            raise ValueError(
+                f"Invalid tenant name '{tenant.name}', use letters, digits, _ and -"
+            )
+        if tenant.name in names:
+            raise ValueError(f"Duplicate tenant name '{tenant.name}'")
+        names.add(tenant.name)
+        if not tenant.has_track and not tenant.has_plan:
+            raise ValueError(
+                f"Tenant '{tenant.name}' configures neither Toggl Track nor Toggl Plan"
+            )
+    return tenants
+
+
+def build_tenant_engines(
+    tenant: TenantConfig,
+) -> tuple[SyncEngine | None, PlanSyncEngine | None]:
+    """Build the sync engines of a tenant.
+
+    Clients of all tenants share the process-wide connection pool of each
+    host (see anytoggl.transport).
+
+    Args:
+        tenant: Tenant configuration
+
+    Returns:
+        Tuple of (Track engine, Plan engine); either is None if not configured
+    """
+    anytype = AnytypeClient(
+        base_url=tenant.anytype_api_url,
+        token=tenant.anytype_token,
+        space_id=tenant.anytype_space_id,
+    )
+    # Token caches and warehouses are kept per tenant
+    cache_dir = Path.home() / ".anytoggl"
+    cache_dir.mkdir(exist_ok=True)
+
+    def tiers() -> TaskTiers:
+        return TaskTiers(tenant.tier_warm_every, tenant.tier_cold_every)
+
+    engine = None
+    if tenant.has_track:
+        toggl = TogglClient(
+            api_token=tenant.toggl_api_token,
+            workspace_id=tenant.toggl_workspace_id,
+            quota_per_hour=tenant.toggl_quota_per_hour,
+            user_quota_per_hour=tenant.toggl_user_quota_per_hour,
+        )
+        warehouse = EntryWarehouse(str(cache_dir / f"warehouse-{tenant.name}.db"))
+        entries_db = str(cache_dir / f"entries-{tenant.name}.db")
+        engine = SyncEngine(
+            anytype,
+            toggl,
+            warehouse,
+            EntryIndex(entries_db),
+            writes=WriteLog(entries_db),
+            creation=CreationPolicy.parse(tenant.toggl_create_statuses),
+            checkpoint=SyncCheckpoint(entries_db),
+            rollups=TimeRollups(entries_db),
+            tiers=tiers(),
+        )
+
+    plan_engine = None
+    if tenant.has_plan:
+        toggl_plan = TogglPlanClient(
+            workspace_id=tenant.toggl_plan_workspace_id,
+            client_id=tenant.toggl_plan_client_id,
+            client_secret=tenant.toggl_plan_client_secret,
+            username=tenant.toggl_plan_username,
+            password=tenant.toggl_plan_password,
+            token_db_path=str(cache_dir / f"tokens-{tenant.name}.db"),
+        )
+        scheduler = TaskScheduler(
+            start_hour=tenant.schedule_start_hour,
+            end_hour=tenant.schedule_end_hour,
+            default_duration_hours=tenant.default_task_duration_hours,
+        )
+        plan_engine = PlanSyncEngine(
+            anytype,
+            toggl_plan,
+            scheduler,
+            default_project_name=tenant.toggl_plan_default_project,
+            default_estimated_minutes=tenant.toggl_plan_default_minutes,
+            tiers=tiers(),
+        )
+
+    return engine, plan_engine
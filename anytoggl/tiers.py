@@ -0,0 +1,113 @@
+# anytoggl/tiers.py
+import zlib
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from anytoggl.models import AnytypeTask
+
+HOT = "hot"
+WARM = "warm"
+COLD = "cold"
+
+# Per task: whether its timer runs, and when its Toggl side last changed
+SideState = tuple[bool, datetime | None]
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class TaskTiers:
+    """Reconciles active tasks every cycle and settled ones on a longer cadence.
+
+    * hot: a running timer, status "In Progress", or an edit within
+      ``hot_window`` on either side; reconciled every cycle
+    * warm: not done, or edited within ``warm_window``; every ``warm_every``
+      cycles
+    * cold: done and untouched for longer; every ``cold_every`` cycles
+
+    Tiers are recomputed every cycle, and a task whose timestamps moved
+    since it was last reconciled is due right away whatever its tier, so
+    edits are never held back. The cadences are a safety net for changes
+    that do not move a timestamp. Cold tasks are spread over the cycles
+    rather than all checked in the same one.
+    """
+
+    def __init__(
+        self,
+        warm_every: int = 4,
+        cold_every: int = 24,
+        hot_window: timedelta = timedelta(hours=1),
+        warm_window: timedelta = timedelta(days=7),
+    ):
+        """Initialize task tiers.
+
+        Args:
+            warm_every: Cycles between two reconciliations of a warm task
+            cold_every: Cycles between two reconciliations of a cold task
+            hot_window: Edits more recent than this make a task hot
+            warm_window: Done tasks edited more recently than this stay warm
+        """
+        self.every = {HOT: 1, WARM: max(warm_every, 1), COLD: max(cold_every, 1)}
+        self.hot_window = hot_window
+        self.warm_window = warm_window
+        self.cycle = 0
+        # task ID → (task last_modified, Toggl side timestamp) when last settled
+        self.settled: dict[str, tuple[datetime | None, datetime | None]] = {}
+
+    def tier(
+        self, task: AnytypeTask, running: bool = False, other_at: datetime | None = None
+    ) -> str:
+        """Temperature of a task given the state of its Toggl side."""
+        if running or task.status == "In Progress":
+            return HOT
+        now = datetime.now(timezone.utc)
+        stamps = [s for s in (_aware(task.last_modified), _aware(other_at)) if s]
+        last_edit = max(stamps, default=None)
+        if last_edit and now - last_edit < self.hot_window:
+            return HOT
+        if task.status != "Done" or (last_edit and now - last_edit < self.warm_window):
+            return WARM
+        return COLD
+
+    def _changed(self, task: AnytypeTask, other_at: datetime | None) -> bool:
+        return self.settled.get(task.id) != (task.last_modified, other_at)
+
+    def _on_cadence(self, anytype_id: str, tier: str) -> bool:
+        every = self.every[tier]
+        # Stable per-task offset spreads a tier over its cadence
+        return (self.cycle + zlib.crc32(anytype_id.encode())) % every == 0
+
+    def select(
+        self, tasks: list[AnytypeTask], side: Callable[[AnytypeTask], SideState]
+    ) -> list[AnytypeTask]:
+        """Start a cycle and pick the tasks due in it.
+
+        Args:
+            tasks: Every task of the cycle
+            side: Returns (timer running, Toggl side timestamp) of a task
+
+        Returns:
+            Tasks to reconcile this cycle, in their original order
+        """
+        self.cycle += 1
+        due = []
+        tiers: Counter[str] = Counter()
+        for task in tasks:
+            running, other_at = side(task)
+            tier = self.tier(task, running, other_at)
+            tiers[tier] += 1
+            if self._changed(task, other_at) or self._on_cadence(task.id, tier):
+                due.append(task)
+        logger.debug(
+            f"Tiers: {tiers[HOT]} hot, {tiers[WARM]} warm, {tiers[COLD]} cold; "
+            f"{len(due)} of {len(tasks)} tasks due"
+        )
+        return due
+
+    def settle(self, task: AnytypeTask, other_at: datetime | None):
+        """Record that a task was found or brought in sync this cycle."""
+        self.settled[task.id] = (task.last_modified, other_at)
@@ -0,0 +1,110 @@
+# anytoggl/timer_watch.py
+import threading
+from loguru import logger
+from anytoggl.clients.anytype import AnytypeClient
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.models import AnytypeTask
+from anytoggl.quota import QuotaBudget
+
+
+class TimerWatcher:
+    """Mirrors timer starts and stops in Toggl Track onto Anytype task status.
+
+    Only ``GET /me/time_entries/current`` is polled. Polls count against the
+    Toggl user quota the full sync reads from as well, so the watcher paces
+    itself with its own budget carved out of that quota: it stops polling
+    while only ``reserve_per_hour`` user requests are left for the sync.
+    """
+
+    def __init__(
+        self,
+        anytype: AnytypeClient,
+        toggl: TogglClient,
+        interval: float = 60,
+        quota_per_hour: int = 60,
+        reserve_per_hour: int = 0,
+    ):
+        """Initialize timer watcher.
+
+        Args:
+            anytype: Anytype API client
+            toggl: Toggl Track API client
+            interval: Seconds between polls
+            quota_per_hour: Requests per hour the watcher may spend
+            reserve_per_hour: User quota requests per hour left to the full sync
+        """
+        self.anytype = anytype
+        self.toggl = toggl
+        self.user_quota = toggl.quota["user"]
+        self.reserve = reserve_per_hour
+        limit = max(0, min(quota_per_hour, self.user_quota.limit - reserve_per_hour))
+        if limit == 0:
+            logger.warning(
+                f"No Toggl user quota left for the timer watcher "
+                f"({reserve_per_hour}/h reserved for the full sync)"
+            )
+        self.quota = QuotaBudget("timer", limit=limit)
+        # Never poll faster than the budget allows
+        self.interval = max(interval, 3600 / max(limit, 1))
+        self.running_id: int | None = None
+        self._tasks: dict[str, AnytypeTask] = {}
+        self._stop = threading.Event()
+
+    def _task_for(self, entry_id: int) -> AnytypeTask | None:
+        """Find the task linked to an entry, reloading the local index on a miss."""
+        task = self._tasks.get(str(entry_id))
+        if task is None:
+            # Anytype is local, reloading costs no Toggl quota
+            self._tasks = {
+                t.toggl_track_id: t
+                for t in self.anytype.search_tasks()
+                if t.toggl_track_id
+            }
+            task = self._tasks.get(str(entry_id))
+        return task
+
+    def _set_status(self, entry_id: int, status: str):
+        task = self._task_for(entry_id)
+        if task is None or task.status == status:
+            return
+        self.anytype.update_task(task.id, {"status": status})
+        task.status = status
+        logger.info(f"Timer update: '{task.name}' → {status}")
+
+    def poll(self):
+        """Check the running timer once and reflect any change."""
+        if self.quota.remaining() <= 0 or self.user_quota.remaining() <= self.reserve:
+            logger.debug("Timer watcher budget exhausted, skipping poll")
+            return
+        self.quota.spend()
+
+        current = self.toggl.get_current_time_entry()
+        current_id = current.id if current else None
+        if current_id == self.running_id:
+            return
+
+        # Same mapping as the full sync: stopped → Done, running → In Progress
+        if self.running_id is not None:
+            self._set_status(self.running_id, "Done")
+        if current_id is not None:
+            self._set_status(current_id, "In Progress")
+        self.running_id = current_id
+
+    def run(self):
+        """Poll until stop() is called."""
+        logger.info(f"Watching the running Toggl timer every {self.interval:.0f}s")
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Timer watch failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Run the watcher in a background thread."""
+        thread = threading.Thread(target=self.run, name="timer-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
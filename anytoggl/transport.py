@@ -0,0 +1,199 @@
+# anytoggl/transport.py
+import importlib.util
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+import httpx
+from loguru import logger
+from anytoggl.cache import CacheRule, CachingTransport
+from anytoggl.cassette import cassette_transport
+from anytoggl.http import CircuitBreakerTransport, DeadlineTransport
+from anytoggl.quota import QuotaBudget, QuotaTransport
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class EndpointProfile:
+    """Connection settings for one family of API endpoints."""
+
+    connect_timeout: float
+    read_timeout: float
+    write_timeout: float = 10.0
+    pool_timeout: float = 10.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+PROFILES = {
+    # Local desktop API: fail fast when it is not running, searches can be slow
+    "anytype": EndpointProfile(connect_timeout=2, read_timeout=30),
+    "toggl_track": EndpointProfile(connect_timeout=5, read_timeout=15, http2=True),
+    "toggl_plan": EndpointProfile(connect_timeout=5, read_timeout=15, http2=True),
+}
+
+# Seconds an idle connection outlives the pause between two cycles
+KEEPALIVE_MARGIN = 60.0
+
+_transports: dict[tuple[str, str], httpx.HTTPTransport] = {}
+_keepalive_floor = 0.0
+_http_listeners: list = []
+_transports_lock = threading.Lock()
+
+
+def keep_alive_between(interval: float):
+    """Keep idle pooled connections open across a pause of ``interval`` seconds.
+
+    The profiles' expiry is the minimum; pools created afterwards keep idle
+    connections for at least ``interval`` plus KEEPALIVE_MARGIN. The server
+    may still close them sooner, in which case the next cycle reconnects.
+
+    Args:
+        interval: Seconds between the start of two cycles
+    """
+    global _keepalive_floor
+    with _transports_lock:
+        _keepalive_floor = max(_keepalive_floor, interval + KEEPALIVE_MARGIN)
+
+
+def shared_transport(base_url: str, profile: str) -> httpx.HTTPTransport:
+    """Get the process-wide connection pool for a host.
+
+    Pools outlive clients and engines, so every client talking to the same
+    host reuses their connections. Idle connections expire after the
+    profile's ``keepalive_expiry``, raised by ``keep_alive_between`` to span
+    the pause between cycles.
+
+    Args:
+        base_url: Any URL on the target host
+        profile: Name of the endpoint profile in PROFILES
+
+    Returns:
+        Shared HTTP transport for this host and profile
+    """
+    parts = urlsplit(base_url)
+    key = (f"{parts.scheme}://{parts.netloc}", profile)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            settings = PROFILES[profile]
+            http2 = settings.http2 and HTTP2_AVAILABLE and parts.scheme == "https"
+            if settings.http2 and not http2:
+                logger.debug(f"HTTP/2 unavailable for {key[0]}, using HTTP/1.1")
+            limits = settings.limits
+            if _keepalive_floor > settings.keepalive_expiry:
+                limits = httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=_keepalive_floor,
+                )
+            transport = httpx.HTTPTransport(limits=limits, http2=http2)
+            _transports[key] = transport
+        return transport
+
+
+def add_http_listener(listener):
+    """Register ``listener(request, response, elapsed)`` for every API call.
+
+    ``response`` is None when the call raised; ``elapsed`` is in seconds.
+    """
+    _http_listeners.append(listener)
+
+
+def remove_http_listener(listener):
+    _http_listeners.remove(listener)
+
+
+class ObservedTransport(httpx.BaseTransport):
+    """Outermost transport layer reporting each call to the HTTP listeners."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not _http_listeners:
+            return self.transport.handle_request(request)
+
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.transport.handle_request(request)
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            for listener in list(_http_listeners):
+                listener(request, response, elapsed)
+
+    def close(self):
+        self.transport.close()
+
+
+def build_client(
+    profile: str,
+    base_url: str,
+    transport: httpx.BaseTransport | None = None,
+    cache_rules: list[CacheRule] | None = None,
+    quota: Callable[[httpx.Request], QuotaBudget] | None = None,
+    **kwargs,
+) -> httpx.Client:
+    """Build an API client on a shared, tuned transport.
+
+    Compression is negotiated by httpx, which advertises every content
+    encoding it can decode in ``Accept-Encoding``.
+
+    Args:
+        profile: Name of the endpoint profile in PROFILES
+        base_url: Base URL of the API
+        transport: Optional transport overriding the shared pool
+        cache_rules: Optional HTTP cache policies for slowly changing GETs
+        quota: Optional budget each request reaching the API is charged to
+        **kwargs: Extra httpx.Client arguments (auth, headers, event_hooks)
+
+    Returns:
+        Configured httpx.Client
+    """
+    owned = transport is not None
+    if transport is None:
+        transport = shared_transport(base_url, profile)
+    transport = DeadlineTransport(cassette_transport(transport))
+    if quota is not None:
+        transport = QuotaTransport(transport, quota)
+    transport = CircuitBreakerTransport(transport, owned=owned)
+    if cache_rules:
+        transport = CachingTransport(transport, cache_rules)
+    return httpx.Client(
+        base_url=base_url,
+        timeout=PROFILES[profile].timeout,
+        transport=ObservedTransport(transport),
+        **kwargs,
+    )
+
+
+def close_transports():
+    """Close every shared connection pool."""
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
@@ -0,0 +1,237 @@
+# anytoggl/trigger.py
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from loguru import logger
+
+# A sync request is a short list of IDs; larger bodies are refused unread
+MAX_BODY = 64 * 1024
+
+
+@dataclass
+class SyncRequest:
+    """One trigger call: every task (``ids`` is None) or only the given ones."""
+
+    ids: list[str] | None
+    done: threading.Event = field(default_factory=threading.Event)
+    result: dict = field(default_factory=dict)
+
+
+class TriggerServer:
+    """Local HTTP API asking a polling loop to sync right now.
+
+    ``POST /sync`` with ``{}`` syncs everything, ``{"ids": [...]}`` only the
+    given Anytype tasks. Requests arriving within ``debounce`` seconds of
+    each other are coalesced into one cycle (never delayed more than
+    ``max_delay``); a full sync in the batch covers every ID request. The
+    call answers with the result of the cycle that served it, unless the
+    body says ``"wait": false``; a cycle cut short by its deadline or the
+    quota is not ``ok``. ``GET /last`` returns the latest result.
+
+    Only JSON bodies are accepted, so web pages cannot trigger syncs
+    through the browser without a CORS preflight.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8788,
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        reply_timeout: float = 300.0,
+    ):
+        """Initialize trigger server.
+
+        Args:
+            host: Interface to listen on (keep it on loopback)
+            port: Port to listen on
+            debounce: Quiet seconds that close a burst of requests
+            max_delay: Longest a request waits for its burst to close
+            reply_timeout: Longest a waiting caller is kept for the result
+        """
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.reply_timeout = reply_timeout
+        self.requests: queue.Queue[SyncRequest] = queue.Queue()
+        self.last_result: dict = {}
+        self.cycles = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/last":
+                    self._reply(404, {"error": "not found"})
+                    return
+                self._reply(200, server.last_result)
+
+            def do_POST(self):
+                if self.path != "/sync":
+                    self._reply(404, {"error": "not found"})
+                    return
+                # Only the exact media type forces a CORS preflight;
+                # "text/plain; x=json" is a simple request any page can send
+                content_type = self.headers.get("Content-Type", "")
+                media_type = content_type.split(";")[0].strip().lower()
+                if media_type != "application/json":
+                    self._reply(415, {"error": "expected application/json"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._reply(400, {"error": "invalid Content-Length"})
+                    return
+                if length > MAX_BODY:
+                    self._reply(413, {"error": "body too large"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    ids = body.get("ids")
+                    # An empty list is a mistake, never a request for everything
+                    if ids is not None and not (
+                        isinstance(ids, list)
+                        and ids
+                        and all(isinstance(i, str) for i in ids)
+                    ):
+                        raise ValueError("ids must be a non-empty list of strings")
+                except (ValueError, AttributeError, TypeError):
+                    self._reply(400, {"error": "invalid request"})
+                    return
+
+                request = server.submit(ids)
+                if not body.get("wait", True):
+                    self._reply(202, {"queued": True})
+                    return
+                if not request.done.wait(server.reply_timeout):
+                    self._reply(504, {"error": "sync still running"})
+                    return
+                self._reply(200 if request.result.get("ok") else 500, request.result)
+
+            def _reply(self, status: int, data: dict):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Trigger {self.address_string()} {format % args}")
+
+        return Handler
+
+    def submit(self, ids: list[str] | None) -> SyncRequest:
+        """Queue a sync request, as the HTTP handler does."""
+        request = SyncRequest(ids)
+        self.requests.put(request)
+        return request
+
+    def start(self):
+        threading.Thread(
+            target=self.httpd.serve_forever, name="sync-trigger", daemon=True
+        ).start()
+        host, port = self.httpd.server_address[:2]
+        logger.info(f"Listening for sync triggers on http://{host}:{port}/sync")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _burst(self, first: SyncRequest) -> list[SyncRequest]:
+        """Collect the requests following ``first`` until the burst goes quiet."""
+        batch = [first]
+        closes_at = time.monotonic() + self.max_delay
+        while True:
+            wait = min(self.debounce, closes_at - time.monotonic())
+            if wait <= 0:
+                return batch
+            try:
+                batch.append(self.requests.get(timeout=wait))
+            except queue.Empty:
+                return batch
+
+    def serve_until(
+        self,
+        deadline: float,
+        run_all: Callable[[], str | None],
+        run_ids: Callable[[str], None],
+    ):
+        """Serve triggered cycles until the monotonic ``deadline``.
+
+        Args:
+            deadline: time.monotonic() value of the next scheduled poll
+            run_all: Runs one full sync cycle, returning why it was cut
+                short or None
+            run_ids: Syncs one Anytype task
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                first = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                return
+            self._serve(self._burst(first), run_all, run_ids)
+
+    def _serve(
+        self,
+        batch: list[SyncRequest],
+        run_all: Callable[[], str | None],
+        run_ids: Callable[[str], None],
+    ):
+        self.cycles += 1
+        started = time.perf_counter()
+        full = any(request.ids is None for request in batch)
+        ids = [] if full else list(dict.fromkeys(i for r in batch for i in r.ids))
+        errors = {}
+        if full:
+            logger.info(f"Triggered full sync ({len(batch)} requests)")
+            try:
+                cut_short = run_all()
+            except Exception as e:
+                errors["*"] = str(e).splitlines()[0]
+            else:
+                if cut_short:
+                    errors["*"] = cut_short
+        else:
+            logger.info(f"Triggered sync of {len(ids)} tasks ({len(batch)} requests)")
+            for anytype_id in ids:
+                try:
+                    run_ids(anytype_id)
+                except Exception as e:
+                    errors[anytype_id] = str(e).splitlines()[0]
+        for anytype_id, error in errors.items():
+            logger.error(f"Triggered sync of {anytype_id} failed: {error}")
+
+        self.last_result = {
+            "cycle": self.cycles,
+            "ok": not errors,
+            "scope": "all" if full else ids,
+            "requests": len(batch),
+            "seconds": round(time.perf_counter() - started, 3),
+            "errors": errors,
+        }
+        for request in batch:
+            request.result = self.last_result
+            request.done.set()
+
+
+def send_trigger(
+    url: str, ids: list[str] | None = None, wait: bool = True
+) -> httpx.Response:
+    """Ask a running `run`/`plan-run` loop to sync now."""
+    body = {"wait": wait}
+    if ids:
+        body["ids"] = ids
+    return httpx.post(f"{url.rstrip('/')}/sync", json=body, timeout=None)
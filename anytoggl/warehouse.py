@@ -0,0 +1,236 @@
+# anytoggl/warehouse.py
+from datetime import datetime, timezone
+from pathlib import Path
+import duckdb
+from loguru import logger
+from anytoggl import bulk
+from anytoggl.models import AnytypeTask, TogglTimeEntry
+
+# Hours of an entry; running timers count up to now
+HOURS = """
+    CASE WHEN e.duration < 0
+        THEN epoch(CAST(? AS TIMESTAMP) - e.start)
+        ELSE e.duration
+    END / 3600.0
+"""
+
+GROUPINGS = {
+    "project": ["coalesce(p.name, t.project, '(no project)')"],
+    "week": ["CAST(date_trunc('week', e.start) AS DATE)"],
+    "status": ["coalesce(t.status, '(unlinked)')"],
+    "project-week": [
+        "coalesce(p.name, t.project, '(no project)')",
+        "CAST(date_trunc('week', e.start) AS DATE)",
+    ],
+    "task": ["coalesce(t.name, e.description, '(no description)')"],
+}
+
+# Columns of the bulk-written tables, in row order
+ENTRY_COLUMNS = {
+    "id": "BIGINT",
+    "description": "TEXT",
+    "project_id": "BIGINT",
+    "start": "TIMESTAMP",
+    "stop": "TIMESTAMP",
+    "duration": "BIGINT",
+    "updated_at": "TIMESTAMP",
+}
+TASK_COLUMNS = {
+    "anytype_id": "TEXT",
+    "name": "TEXT",
+    "status": "TEXT",
+    "project": "TEXT",
+    "toggl_track_id": "TEXT",
+}
+PROJECT_COLUMNS = {"id": "BIGINT", "name": "TEXT"}
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    """Store timestamps as naive UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class EntryWarehouse:
+    """Local DuckDB copy of every time entry, task and project the sync sees.
+
+    Filled from data the engine already fetched, so reports never spend
+    Toggl API quota. Tasks and projects are only written when they differ
+    from the stored row, each table in one bulk statement.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        """Initialize warehouse.
+
+        Args:
+            db_path: Optional path to the database (defaults to ~/.anytoggl/warehouse.db)
+        """
+        if db_path is None:
+            cache_dir = Path.home() / ".anytoggl"
+            cache_dir.mkdir(exist_ok=True)
+            db_path = str(cache_dir / "warehouse.db")
+
+        self.db_path = db_path
+        # Stored rows of tasks and projects, to write only what changed
+        self._tasks: dict[str, tuple] = {}
+        self._projects: dict[int, str] = {}
+        self._init_db()
+
+    def _init_db(self):
+        """Create the warehouse tables and load the stored tasks and projects."""
+        conn = duckdb.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS time_entries (
+                id BIGINT PRIMARY KEY,
+                description TEXT,
+                project_id BIGINT,
+                start TIMESTAMP NOT NULL,
+                stop TIMESTAMP,
+                duration BIGINT NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                anytype_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                status TEXT,
+                project TEXT,
+                toggl_track_id TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS projects (
+                id BIGINT PRIMARY KEY,
+                name TEXT NOT NULL
+            )
+        """)
+        for row in conn.execute("SELECT * FROM tasks").fetchall():
+            self._tasks[row[0]] = row[1:]
+        self._projects = dict(conn.execute("SELECT * FROM projects").fetchall())
+        conn.close()
+
+    def record_entries(self, entries: list[TogglTimeEntry]):
+        """Insert or refresh time entries."""
+        if not entries:
+            return
+        conn = duckdb.connect(self.db_path)
+        bulk.upsert(
+            conn,
+            "time_entries",
+            ENTRY_COLUMNS,
+            [
+                (
+                    e.id,
+                    e.description,
+                    e.project_id,
+                    _utc(e.start),
+                    _utc(e.stop),
+                    e.duration,
+                    _utc(e.at),
+                )
+                for e in entries
+            ],
+        )
+        conn.close()
+
+    def delete_entries(self, entry_ids: list[int]):
+        """Forget time entries deleted in Toggl."""
+        if not entry_ids:
+            return
+        conn = duckdb.connect(self.db_path)
+        bulk.delete(conn, "time_entries", "id", "BIGINT", entry_ids)
+        conn.close()
+
+    def record_tasks(self, tasks: list[AnytypeTask]):
+        """Insert or refresh the Anytype tasks that changed since last written."""
+        rows = {
+            t.id: (t.name, t.status, t.project, t.toggl_track_id)
+            for t in tasks
+            if self._tasks.get(t.id) != (t.name, t.status, t.project, t.toggl_track_id)
+        }
+        if not rows:
+            return
+        conn = duckdb.connect(self.db_path)
+        bulk.upsert(
+            conn,
+            "tasks",
+            TASK_COLUMNS,
+            [(task_id, *row) for task_id, row in rows.items()],
+        )
+        conn.close()
+        self._tasks.update(rows)
+
+    def record_projects(self, projects: dict[str, int]):
+        """Insert or refresh the Toggl project names that changed."""
+        rows = {
+            project_id: name
+            for name, project_id in projects.items()
+            if self._projects.get(project_id) != name
+        }
+        if not rows:
+            return
+        conn = duckdb.connect(self.db_path)
+        bulk.upsert(conn, "projects", PROJECT_COLUMNS, list(rows.items()))
+        conn.close()
+        self._projects.update(rows)
+
+    def task_counts(self) -> tuple[int, int]:
+        """Number of known tasks, and of those not linked to a time entry yet."""
+        conn = duckdb.connect(self.db_path, read_only=True)
+        total, unlinked = conn.execute("""
+            SELECT count(*), count(*) FILTER (WHERE coalesce(toggl_track_id, '') = '')
+            FROM tasks
+        """).fetchone()
+        conn.close()
+        return total, unlinked
+
+    def unlinked_by_status(self) -> dict[str | None, int]:
+        """Number of tasks not linked to a time entry yet, per status."""
+        conn = duckdb.connect(self.db_path, read_only=True)
+        rows = conn.execute("""
+            SELECT status, count(*) FROM tasks
+            WHERE coalesce(toggl_track_id, '') = ''
+            GROUP BY status
+        """).fetchall()
+        conn.close()
+        return dict(rows)
+
+    def report(
+        self, by: str = "project", since: datetime | None = None
+    ) -> tuple[list[str], list[tuple]]:
+        """Aggregate tracked hours.
+
+        Args:
+            by: Grouping, one of GROUPINGS
+            since: Only count entries started at or after this time
+
+        Returns:
+            Column names and result rows
+        """
+        if by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping '{by}', use one of {list(GROUPINGS)}")
+        keys = GROUPINGS[by]
+        columns = by.split("-") + ["entries", "hours"]
+        group = ", ".join(str(i + 1) for i in range(len(keys)))
+
+        conn = duckdb.connect(self.db_path, read_only=True)
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(keys)}, count(*), round(sum({HOURS}), 2)
+            FROM time_entries e
+            LEFT JOIN tasks t ON t.toggl_track_id = CAST(e.id AS TEXT)
+            LEFT JOIN projects p ON p.id = e.project_id
+            WHERE ? IS NULL OR e.start >= ?
+            GROUP BY {group}
+            ORDER BY {group}
+        """,
+            [_utc(datetime.now(timezone.utc)), _utc(since), _utc(since)],
+        ).fetchall()
+        conn.close()
+
+        logger.debug(f"Report by {by}: {len(rows)} rows")
+        return columns, rows
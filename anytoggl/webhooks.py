@@ -0,0 +1,218 @@
+# anytoggl/webhooks.py
+import hashlib
+import hmac
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from loguru import logger
+from pydantic import ValidationError
+from anytoggl.models import TogglTimeEntry
+from anytoggl.sync_engine import SyncEngine
+
+SIGNATURE_HEADER = "X-Webhook-Signature-256"
+# Toggl events are a few KiB; larger bodies are refused unread
+MAX_BODY = 1024 * 1024
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Compute the Toggl webhook signature header value for a body."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    """Check a webhook signature in constant time."""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+class WebhookServer:
+    """Receives Toggl Track webhook events and syncs the affected entries.
+
+    Events are verified and queued by the HTTP handler threads; a single
+    worker applies them in batches and falls back to a full sync every
+    ``safety_interval`` seconds to catch anything a webhook missed.
+    """
+
+    def __init__(
+        self,
+        engine: SyncEngine,
+        secret: str,
+        host: str = "127.0.0.1",
+        port: int = 8787,
+        safety_interval: int = 3600,
+    ):
+        """Initialize webhook server.
+
+        Args:
+            engine: Toggl Track sync engine
+            secret: Webhook subscription secret used to sign events
+            host: Interface to listen on
+            port: Port to listen on
+            safety_interval: Seconds between full safety-net syncs
+        """
+        self.engine = engine
+        self.secret = secret
+        self.safety_interval = safety_interval
+        self.events: queue.Queue[tuple[str, TogglTimeEntry | int]] = queue.Queue()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._stop = threading.Event()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._reply(400, {"error": "invalid Content-Length"})
+                    return
+                if length > MAX_BODY:
+                    self._reply(413, {"error": "body too large"})
+                    return
+                body = self.rfile.read(length)
+                if not verify_signature(
+                    body, self.headers.get(SIGNATURE_HEADER), server.secret
+                ):
+                    logger.warning("Rejected webhook with invalid signature")
+                    self._reply(401, {"error": "invalid signature"})
+                    return
+                try:
+                    event = json.loads(body)
+                except ValueError:
+                    event = None
+                if not isinstance(event, dict):
+                    self._reply(400, {"error": "invalid JSON"})
+                    return
+                self._reply(200, server.handle_event(event))
+
+            def _reply(self, status: int, data: dict):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Webhook {self.address_string()} {format % args}")
+
+        return Handler
+
+    def handle_event(self, event: dict) -> dict:
+        """Queue a verified event and return the response body."""
+        # Subscription validation echoes the code back
+        if event.get("payload") == "ping":
+            return {"validation_code": event.get("validation_code")}
+
+        metadata = event.get("metadata", {})
+        if metadata.get("model") != "time_entry":
+            return {}
+
+        action = metadata.get("action", "")
+        payload = event.get("payload")
+        if not isinstance(payload, dict):
+            logger.warning("Ignoring time entry event without a payload")
+            return {}
+        if action == "deleted":
+            entry_id = payload.get("id")
+            if not isinstance(entry_id, int):
+                logger.warning("Ignoring deleted time entry event without an ID")
+                return {}
+            self.events.put((action, entry_id))
+            return {}
+        try:
+            self.events.put((action, TogglTimeEntry(**payload)))
+        except ValidationError as e:
+            logger.warning(f"Ignoring malformed time entry event: {e}")
+        return {}
+
+    def _drain(self, first) -> list:
+        events = [first]
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _work(self):
+        next_full_sync = time.monotonic() + self.safety_interval
+        while not self._stop.is_set():
+            try:
+                first = self.events.get(
+                    timeout=max(0.0, next_full_sync - time.monotonic())
+                )
+            except queue.Empty:
+                first = None
+
+            try:
+                if first is None:
+                    logger.info("Running safety-net full sync")
+                    self.engine.run()
+                    next_full_sync = time.monotonic() + self.safety_interval
+                    continue
+
+                # Latest event per entry wins
+                entries, deleted = {}, set()
+                for action, item in self._drain(first):
+                    if action == "deleted":
+                        logger.info(f"Time entry {item} deleted in Toggl")
+                        entries.pop(item, None)
+                        deleted.add(item)
+                    else:
+                        entries[item.id] = item
+                        deleted.discard(item.id)
+                if deleted:
+                    self.engine.delete_entries(list(deleted))
+                if entries:
+                    self.engine.sync_entries(list(entries.values()))
+            except Exception as e:
+                logger.error(f"Webhook sync failed: {e}")
+
+    def serve_forever(self):
+        worker = threading.Thread(target=self._work, name="webhook-worker", daemon=True)
+        worker.start()
+        host, port = self.httpd.server_address[:2]
+        logger.info(f"Listening for Toggl webhooks on http://{host}:{port}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._stop.set()
+            self.httpd.server_close()
+
+    def shutdown(self):
+        self._stop.set()
+        self.httpd.shutdown()
+
+
+def build_event(entry: dict, action: str = "updated") -> dict:
+    """Build a Toggl-shaped webhook event for a time entry."""
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "event_id": int(time.time() * 1000),
+        "created_at": now,
+        "metadata": {"action": action, "model": "time_entry"},
+        "payload": entry,
+        "timestamp": now,
+    }
+
+
+def send_event(url: str, secret: str, event: dict) -> httpx.Response:
+    """Sign and deliver an event to a webhook receiver, for local testing."""
+    body = json.dumps(event).encode()
+    return httpx.post(
+        url,
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign(body, secret),
+        },
+    )
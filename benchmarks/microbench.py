@@ -0,0 +1,372 @@
+# benchmarks/microbench.py
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+import httpx
+import typer
+from loguru import logger
+from anytoggl.clients.anytype import AnytypeClient
+from anytoggl.clients.toggl_plan import TogglPlanClient
+from anytoggl.entry_index import EntryIndex
+from anytoggl.models import AnytypeTask, TogglPlanTask, TogglTimeEntry
+from anytoggl.plan_sync_engine import PlanSyncEngine
+from anytoggl.scheduler import TaskScheduler
+from benchmarks.soak import (
+    PLAN_WORKSPACE_ID,
+    SPACE_ID,
+    CountingTransport,
+    StandInApis,
+)
+
+SIZES = (1_000, 10_000, 100_000)
+
+# Fixed reference time, so fixtures are identical from run to run
+EPOCH = datetime(2025, 1, 6, 8, 0, tzinfo=timezone.utc)
+STATUSES = ("To Do", "In Progress", "Done")
+
+
+def anytype_objects(n: int) -> list[dict]:
+    """Search results as the Anytype API returns them, mostly tagged 'Toggl'."""
+    objects = []
+    for i in range(n):
+        modified = (EPOCH + timedelta(minutes=i)).isoformat()
+        properties = [
+            {"key": "tag", "multi_select": [{"name": "Toggl"}, {"name": "work"}]},
+            {"key": "done", "checkbox": i % 3 == 2},
+            {"key": "status", "select": {"name": STATUSES[i % 3]}},
+            {"key": "linked_projects", "objects": [{"name": f"Project {i % 50}"}]},
+            {"key": "toggl_track_id", "text": str(100_000 + i)},
+            {"key": "last_modified_date", "date": modified},
+        ]
+        if i % 10 == 0:
+            # Untagged tasks are parsed and dropped
+            properties[0] = {"key": "tag", "multi_select": [{"name": "home"}]}
+        objects.append(
+            {
+                "id": f"task-{i}",
+                "name": f"Task {i}",
+                "snippet": f"Description of task {i}",
+                "properties": properties,
+            }
+        )
+    return objects
+
+
+def time_entry_payloads(n: int) -> list[dict]:
+    """Time entries as the Toggl Track API returns them."""
+    payloads = []
+    for i in range(n):
+        start = EPOCH + timedelta(minutes=i)
+        payloads.append(
+            {
+                "id": 100_000 + i,
+                "description": f"Task {i}",
+                "project_id": 1_000 + i % 50,
+                "start": start.isoformat(),
+                "stop": (start + timedelta(minutes=30)).isoformat(),
+                "duration": 1800,
+                "at": (start + timedelta(minutes=31)).isoformat(),
+            }
+        )
+    return payloads
+
+
+def plan_task_payloads(n: int) -> list[dict]:
+    """Tasks as the Toggl Plan API returns them, notes carrying the marker."""
+    payloads = []
+    for i in range(n):
+        day = (EPOCH + timedelta(days=i // 12)).date().isoformat()
+        payloads.append(
+            {
+                "id": 200_000 + i,
+                "name": f"Task {i}",
+                "start_date": day,
+                "end_date": day,
+                "start_time": f"{8 + i % 12:02d}:00",
+                "end_time": f"{9 + i % 12:02d}:00",
+                "project_id": 1_000 + i % 50,
+                # A few tasks were created in Plan and have no marker
+                "notes": None
+                if i % 20 == 0
+                else f"Description of task {i}\n\n#anytype_id:task-{i}",
+                "status": "open",
+                "updated_at": (EPOCH + timedelta(minutes=i)).isoformat(),
+            }
+        )
+    return payloads
+
+
+def anytype_tasks(n: int) -> list[AnytypeTask]:
+    """Parsed tasks, half of them without dates for the scheduler to fill."""
+    tasks = []
+    for i in range(n):
+        day = EPOCH + timedelta(days=i // 12)
+        tasks.append(
+            AnytypeTask(
+                id=f"task-{i}",
+                name=f"Task {i}",
+                status=STATUSES[i % 3],
+                last_modified=EPOCH + timedelta(minutes=i),
+                start_date=day if i % 2 else None,
+                end_date=day if i % 2 else None,
+            )
+        )
+    return tasks
+
+
+def _search_client(n: int) -> AnytypeClient:
+    body = json.dumps({"data": anytype_objects(n)}).encode()
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, content=body, headers={"Content-Type": "application/json"}
+        )
+
+    return AnytypeClient(
+        "http://anytype.bench", "bench", "bench", httpx.MockTransport(respond)
+    )
+
+
+def _plan_engine() -> PlanSyncEngine:
+    # Only pure-Python helpers are benchmarked; the stand-ins answer the
+    # authentication the Plan client does on construction
+    transport = CountingTransport(StandInApis(0))
+    token_db = os.path.join(tempfile.mkdtemp(prefix="anytoggl-bench-"), "t.db")
+    toggl_plan = TogglPlanClient(
+        PLAN_WORKSPACE_ID,
+        "bench",
+        "bench",
+        "bench",
+        "bench",
+        token_db_path=token_db,
+        transport=transport,
+    )
+    anytype = AnytypeClient("http://anytype.bench", "bench", SPACE_ID, transport)
+    return PlanSyncEngine(anytype, toggl_plan, TaskScheduler())
+
+
+def _index_entries(entries: list[TogglTimeEntry]) -> dict[str, TogglTimeEntry]:
+    index = EntryIndex()
+    index.merge(entries, full=True)
+    return index.by_id()
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A CPU hot path timed on a synthetic fixture of a given size."""
+
+    name: str
+    fixture: Callable[[int], Any]  # builds the input for n items
+    run: Callable[[Any], object]  # the timed call
+    fresh: bool = False  # rebuild the fixture every round (run mutates it)
+
+
+BENCHMARKS = [
+    Benchmark(
+        "anytype.search_tasks",
+        _search_client,
+        lambda client: client.search_tasks(),
+    ),
+    Benchmark(
+        "models.time_entry",
+        time_entry_payloads,
+        lambda payloads: [TogglTimeEntry(**p) for p in payloads],
+    ),
+    Benchmark(
+        "models.plan_task",
+        plan_task_payloads,
+        lambda payloads: [TogglPlanTask(**p) for p in payloads],
+    ),
+    Benchmark(
+        "plan.extract_anytype_id",
+        lambda n: (_plan_engine(), [p["notes"] for p in plan_task_payloads(n)]),
+        lambda fixture: [fixture[0]._extract_anytype_id(notes) for notes in fixture[1]],
+    ),
+    Benchmark(
+        "scheduler.schedule_tasks",
+        anytype_tasks,
+        lambda tasks: TaskScheduler().schedule_tasks(tasks, []),
+        fresh=True,
+    ),
+    Benchmark(
+        "track.index_entries",
+        lambda n: [TogglTimeEntry(**p) for p in time_entry_payloads(n)],
+        _index_entries,
+    ),
+    Benchmark(
+        "plan.index_tasks",
+        lambda n: (_plan_engine(), [TogglPlanTask(**p) for p in plan_task_payloads(n)]),
+        lambda fixture: fixture[0]._index_plan_tasks(fixture[1]),
+    ),
+]
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    size: int
+    best: float  # seconds
+    median: float  # seconds
+    rounds: int
+
+    @property
+    def per_item_us(self) -> float:
+        return self.best / self.size * 1e6
+
+
+def measure(
+    benchmark: Benchmark, size: int, rounds: int = 3, min_round: float = 0.05
+) -> BenchResult:
+    """Time ``rounds`` runs of a benchmark, after one untimed warm-up run.
+
+    Runs faster than ``min_round`` seconds are repeated within a round and
+    averaged, so small sizes are not lost in timer noise. Logging is
+    disabled while timing, so per-task log lines (the scheduler logs every
+    task it places) measure the code rather than the terminal.
+    """
+    fixture = benchmark.fixture(size)
+    timings = []
+    logger.disable("anytoggl")
+    try:
+        started = time.perf_counter()
+        benchmark.run(fixture)
+        warmup = time.perf_counter() - started
+        # Runs mutating their fixture need a fresh one each time
+        repeat = 1 if benchmark.fresh else max(1, math.ceil(min_round / warmup))
+        for _ in range(rounds):
+            if benchmark.fresh:
+                fixture = benchmark.fixture(size)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                benchmark.run(fixture)
+            timings.append((time.perf_counter() - started) / repeat)
+    finally:
+        logger.enable("anytoggl")
+    return BenchResult(
+        benchmark.name, size, min(timings), statistics.median(timings), rounds
+    )
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = SIZES,
+    rounds: int = 3,
+    only: str | None = None,
+    on_result: Callable[[BenchResult], None] | None = None,
+) -> list[BenchResult]:
+    """Run every benchmark (or those whose name contains ``only``) at each size.
+
+    Args:
+        sizes: Fixture sizes in items
+        rounds: Timed runs per benchmark and size
+        only: Optional substring selecting benchmarks by name
+        on_result: Called with each result as soon as it is measured
+
+    Returns:
+        One BenchResult per benchmark and size
+    """
+    results = []
+    for benchmark in BENCHMARKS:
+        if only and only not in benchmark.name:
+            continue
+        for size in sizes:
+            result = measure(benchmark, size, rounds)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def save_baseline(results: list[BenchResult], path: str | Path):
+    """Store results as the baseline later runs are compared with.
+
+    Results of benchmarks or sizes not run this time are kept.
+    """
+    path = Path(path)
+    data = load_baseline(path)
+    for result in results:
+        data[f"{result.name}@{result.size}"] = asdict(result)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "machine": f"{platform.node()} {platform.machine()}",
+                "python": platform.python_version(),
+                "saved_at": datetime.now(timezone.utc).isoformat(),
+                "results": data,
+            },
+            indent=2,
+        )
+    )
+
+
+def load_baseline(path: str | Path) -> dict[str, dict]:
+    """Baseline results keyed by "name@size", empty if there is none yet."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("results", {})
+
+
+def compare(result: BenchResult, baseline: dict[str, dict]) -> float | None:
+    """Best time relative to the baseline (1.25 = 25% slower), None if new."""
+    reference = baseline.get(f"{result.name}@{result.size}")
+    if not reference or not reference["best"]:
+        return None
+    return result.best / reference["best"]
+
+
+def main(
+    sizes: str = "1000,10000,100000",
+    rounds: int = 3,
+    only: str | None = None,
+    baseline: str = str(Path.home() / ".anytoggl" / "microbench.json"),
+    save: bool = False,
+    tolerance: float = 0.2,
+):
+    """Time the CPU hot paths on synthetic data, compared with a saved baseline"""
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    reference = load_baseline(baseline)
+    regressions = []
+
+    def report(result):
+        ratio = compare(result, reference)
+        if ratio is None:
+            versus = "(no baseline)"
+        else:
+            slower = ratio > 1 + tolerance
+            versus = f"{'✗' if slower else '✓'} {ratio:.2f}x baseline"
+            if slower:
+                regressions.append(result)
+        print(
+            f"{result.name:<26} {result.size:>7} {result.best * 1000:>10.1f} ms "
+            f"{result.median * 1000:>10.1f} ms {result.per_item_us:>8.2f} µs/item  {versus}"
+        )
+
+    print(
+        f"{'benchmark':<26} {'items':>7} {'best':>13} {'median':>13} {'per item':>13}"
+    )
+    size_list = tuple(int(size) for size in sizes.split(","))
+    results = run_benchmarks(size_list, rounds, only, on_result=report)
+    if save:
+        save_baseline(results, baseline)
+        print(f"Saved {len(results)} results as baseline in {baseline}")
+    elif regressions:
+        print(
+            f"{len(regressions)} benchmarks more than {tolerance:.0%} slower than baseline"
+        )
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,615 @@
+# benchmarks/soak.py
+import json
+import os
+import random
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import httpx
+import typer
+from loguru import logger
+from anytoggl.clients.anytype import AnytypeClient
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.clients.toggl_plan import TogglPlanClient
+from anytoggl.http import set_time_scale
+from anytoggl.plan_sync_engine import PlanSyncEngine
+from anytoggl.quota import quota_for
+from anytoggl.scheduler import TaskScheduler
+from anytoggl.sync_engine import SyncEngine
+from anytoggl.transport import close_transports
+
+SPACE_ID = "soak-space"
+WORKSPACE_ID = 1
+PLAN_WORKSPACE_ID = 2
+
+
+@dataclass
+class FaultPlan:
+    """Probabilities of each injected fault, per request."""
+
+    rate_limited: float = 0.02  # 429 with Retry-After
+    server_error: float = 0.02  # 502/503
+    timeout: float = 0.005  # response held past the client read timeout
+    slow: float = 0.05  # response delayed by ``slow_seconds``
+    slow_seconds: float = 0.05
+    timeout_seconds: float = 0.5
+
+    def pick(self, rng: random.Random) -> str | None:
+        roll = rng.random()
+        for kind in ("rate_limited", "server_error", "timeout", "slow"):
+            probability = getattr(self, kind)
+            if roll < probability:
+                return kind
+            roll -= probability
+        return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StandInApis:
+    """In-memory Anytype, Toggl Track and Toggl Plan APIs for soak runs.
+
+    Only the endpoints the sync engines call are implemented, with enough
+    behavior (IDs, ``at``/``updated_at`` stamps, ``since`` deltas, paging)
+    for the engines to reach a steady state.
+    """
+
+    def __init__(self, tasks: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.next_id = 1000
+        today = datetime.now(timezone.utc).date().isoformat()
+        self.tasks = {
+            f"task-{i}": {
+                "name": f"Soak task {i}",
+                "status": self.rng.choice(["To Do", "In Progress", "Done"]),
+                "toggl_track_id": None,
+                "toggl_plan_id": None,
+                "project": None,
+                "tracked_minutes": None,
+                "last_modified": _now(),
+                "start_date": today,
+                "end_date": today,
+            }
+            for i in range(tasks)
+        }
+        self.projects: dict[str, str] = {}  # Anytype project object ID → name
+        self.entries: dict[int, dict] = {}
+        self.track_projects: list[dict] = []
+        self.plan_projects: list[dict] = []
+        self.plan_tasks: dict[int, dict] = {}
+
+    def _id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def add_project(self, name: str) -> str:
+        """Create an Anytype project object, returning its ID."""
+        with self.lock:
+            project_id = f"project-{self._id()}"
+            self.projects[project_id] = name
+            return project_id
+
+    def edit_task(self, task_id: str, **changes):
+        """Edit an Anytype task the way a user would, bumping its timestamp."""
+        with self.lock:
+            self.tasks[task_id].update(changes)
+            self.tasks[task_id]["last_modified"] = _now()
+
+    def stop_timer(self, seconds: int) -> int | None:
+        """Stop the first running entry after ``seconds``, as a user would in Toggl."""
+        with self.lock:
+            entry = next((e for e in self.entries.values() if e["duration"] < 0), None)
+            if entry is None:
+                return None
+            start = datetime.fromisoformat(entry["start"])
+            entry["stop"] = (start + timedelta(seconds=seconds)).isoformat()
+            entry["duration"] = seconds
+            entry["at"] = _now()
+            return entry["id"]
+
+    def churn(self, fraction: float):
+        """Simulate user edits on both sides between cycles."""
+        with self.lock:
+            for task_id in self.rng.sample(
+                sorted(self.tasks), int(len(self.tasks) * fraction)
+            ):
+                task = self.tasks[task_id]
+                task["name"] = (
+                    f"{task['name'].split(' #')[0]} #{self.rng.randint(0, 99)}"
+                )
+                task["last_modified"] = _now()
+            linked = sorted(self.entries)
+            for entry_id in self.rng.sample(linked, int(len(linked) * fraction)):
+                entry = self.entries[entry_id]
+                entry["description"] = f"{entry['description']}."
+                entry["at"] = _now()
+
+    # Anytype
+
+    def _anytype_object(self, object_id: str) -> dict:
+        task = self.tasks[object_id]
+        properties = [
+            {"key": "tag", "multi_select": [{"name": "Toggl"}]},
+            {"key": "status", "select": {"name": task["status"]}},
+            {"key": "last_modified_date", "date": task["last_modified"]},
+            {"key": "start_date", "date": task["start_date"]},
+            {"key": "end_date", "date": task["end_date"]},
+        ]
+        for key in ("toggl_track_id", "toggl_plan_id"):
+            if task[key]:
+                properties.append({"key": key, "text": task[key]})
+        if task["project"]:
+            # Linked objects come as IDs, like in the real API
+            properties.append({"key": "linked_projects", "objects": [task["project"]]})
+        return {"id": object_id, "name": task["name"], "properties": properties}
+
+    def anytype(self, method: str, path: str, body: dict) -> tuple[int, object]:
+        if method == "POST" and path.endswith("/search"):
+            return 200, {"data": [self._anytype_object(i) for i in self.tasks]}
+        match = re.fullmatch(r"/v1/spaces/[^/]+/objects/([^/]+)", path)
+        if match and match.group(1) in self.projects:
+            project_id = match.group(1)
+            return 200, {
+                "object": {"id": project_id, "name": self.projects[project_id]}
+            }
+        if match and match.group(1) in self.tasks:
+            object_id = match.group(1)
+            if method == "PATCH":
+                task = self.tasks[object_id]
+                task.update({k: v for k, v in body.items() if k in task})
+                task["last_modified"] = _now()
+            return 200, {"object": self._anytype_object(object_id)}
+        return 404, {"error": "not found"}
+
+    # Toggl Track
+
+    def track(
+        self, method: str, path: str, query: dict, body: dict
+    ) -> tuple[int, object]:
+        if path == "/me/time_entries" and method == "GET":
+            since = query.get("since")
+            if since:
+                cutoff = datetime.fromtimestamp(int(since[0]), timezone.utc)
+                return 200, [
+                    e
+                    for e in self.entries.values()
+                    if datetime.fromisoformat(e["at"]) >= cutoff
+                ]
+            return 200, list(self.entries.values())
+        if path == "/me/time_entries/current":
+            running = [e for e in self.entries.values() if e["duration"] < 0]
+            return 200, running[0] if running else None
+        if path == "/me/projects/paginated":
+            start = int(query.get("start_project_id", ["0"])[0])
+            per_page = int(query.get("per_page", ["200"])[0])
+            page = [p for p in self.track_projects if p["id"] >= start]
+            return 200, page[:per_page]
+        if re.fullmatch(r"/workspaces/\d+/projects", path) and method == "POST":
+            project = {"id": self._id(), "name": body["name"], "workspace_id": 1}
+            self.track_projects.append(project)
+            return 200, project
+        if re.fullmatch(r"/workspaces/\d+/time_entries", path) and method == "POST":
+            entry = {
+                "id": self._id(),
+                "description": body.get("description"),
+                "project_id": body.get("project_id"),
+                "start": body["start"],
+                "stop": None if body.get("duration", 0) < 0 else body["start"],
+                "duration": body.get("duration", 0),
+                "at": _now(),
+            }
+            self.entries[entry["id"]] = entry
+            return 200, entry
+        match = re.fullmatch(r"(?:/workspaces/\d+|/me)/time_entries/(\d+)", path)
+        if match and int(match.group(1)) in self.entries:
+            entry = self.entries[int(match.group(1))]
+            if method == "DELETE":
+                del self.entries[entry["id"]]
+                return 200, None
+            if method == "PUT":
+                entry.update(body)
+                entry["at"] = _now()
+            return 200, entry
+        return 404, {"error": "not found"}
+
+    # Toggl Plan
+
+    def plan(self, method: str, path: str, body: dict) -> tuple[int, object]:
+        if path == "/authenticate/token":
+            return 200, {
+                "access_token": "soak",
+                "refresh_token": "soak",
+                "expires_in": 86400,
+            }
+        if path == "/me":
+            return 200, {"id": 7}
+        if re.fullmatch(r"/\d+/projects", path):
+            if method == "POST":
+                project = {
+                    "id": self._id(),
+                    "name": body["name"],
+                    "statuses": [
+                        {"id": 1, "type": "todo", "name": "To-do"},
+                        {"id": 2, "type": "in_progress", "name": "In progress"},
+                        {"id": 3, "type": "done", "name": "Done"},
+                    ],
+                }
+                self.plan_projects.append(project)
+                return 200, project
+            return 200, self.plan_projects
+        if re.fullmatch(r"/\d+/tasks", path):
+            if method == "POST":
+                task = {**body, "id": self._id(), "updated_at": _now()}
+                self.plan_tasks[task["id"]] = task
+                return 200, task
+            return 200, list(self.plan_tasks.values())
+        match = re.fullmatch(r"/\d+/tasks/(\d+)", path)
+        if match and int(match.group(1)) in self.plan_tasks:
+            task = self.plan_tasks[int(match.group(1))]
+            if method == "PUT":
+                task.update(body)
+                task["updated_at"] = _now()
+            return 200, task
+        return 404, {"error": "not found"}
+
+    def handle(
+        self, method: str, path: str, query: dict, body: dict
+    ) -> tuple[int, object]:
+        with self.lock:
+            if path.startswith("/v1/"):
+                return self.anytype(method, path, body)
+            if path.startswith("/api/v9"):
+                return self.track(method, path.removeprefix("/api/v9"), query, body)
+            if path.startswith("/api/v5"):
+                return self.plan(method, path.removeprefix("/api/v5"), body)
+            return 404, {"error": "not found"}
+
+
+@dataclass
+class SoakStats:
+    cycle_seconds: list[float] = field(default_factory=list)
+    failed_cycles: int = 0
+    rss_samples: list[tuple[int, int]] = field(default_factory=list)
+    requests: int = 0
+    faults: dict[str, int] = field(default_factory=dict)
+    log_records: dict[str, int] = field(default_factory=dict)
+
+
+class StandInServer:
+    """Serves StandInApis on a loopback port, injecting faults."""
+
+    def __init__(self, apis: StandInApis, faults: FaultPlan, stats: SoakStats):
+        self.apis = apis
+        self.faults = faults
+        self.stats = stats
+        self.rng = random.Random(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+
+    def _fault(self) -> str | None:
+        with self._lock:
+            self.stats.requests += 1
+            fault = self.faults.pick(self.rng)
+            if fault:
+                self.stats.faults[fault] = self.stats.faults.get(fault, 0) + 1
+            return fault
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # One write per response, or delayed ACKs add ~40ms to each call
+            wbufsize = 64 * 1024
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+                fault = server._fault()
+                if fault == "rate_limited":
+                    return self._reply(
+                        429, {"error": "slow down"}, {"Retry-After": "1"}
+                    )
+                if fault == "server_error":
+                    return self._reply(server.rng.choice([502, 503]), {"error": "down"})
+                if fault == "timeout":
+                    time.sleep(server.faults.timeout_seconds * 2)
+                elif fault == "slow":
+                    time.sleep(server.faults.slow_seconds)
+
+                parts = urlsplit(self.path)
+                content_type = self.headers.get("Content-Type", "")
+                if raw and "json" in content_type:
+                    body = json.loads(raw)
+                elif raw:
+                    body = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+                else:
+                    body = {}
+                status, data = server.apis.handle(
+                    self.command, parts.path, parse_qs(parts.query), body
+                )
+                self._reply(status, data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _serve
+
+            def _reply(self, status: int, data, headers: dict | None = None):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up on a held response
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(
+            target=self.httpd.serve_forever, name="soak-server", daemon=True
+        ).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class RedirectTransport(httpx.HTTPTransport):
+    """Sends every request to the stand-in server, whatever its host."""
+
+    def __init__(self, port: int, **kwargs):
+        super().__init__(**kwargs)
+        self.port = port
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(
+            scheme="http", host="127.0.0.1", port=self.port
+        )
+        return super().handle_request(request)
+
+
+def endpoint(request: httpx.Request) -> str:
+    """Method and path of a request with IDs replaced by placeholders."""
+    path = request.url.path
+    path = re.sub(r"/spaces/[^/]+", "/spaces/{space}", path)
+    path = re.sub(r"/objects/[^/]+", "/objects/{id}", path)
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    return f"{request.method} {path}"
+
+
+class CountingTransport(httpx.BaseTransport):
+    """Serves requests from StandInApis in-process, counting them per endpoint.
+
+    It sits below the caching layer, so responses served from the HTTP cache
+    are not counted: only what would reach the real APIs is.
+    """
+
+    def __init__(self, apis: StandInApis):
+        self.apis = apis
+        self.counts: Counter[tuple[str, str]] = Counter()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.counts[(request.url.host, endpoint(request))] += 1
+        raw = request.read()
+        content_type = request.headers.get("Content-Type", "")
+        if raw and "json" in content_type:
+            body = json.loads(raw)
+        elif raw:
+            body = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+        else:
+            body = {}
+        status, data = self.apis.handle(
+            request.method,
+            request.url.path,
+            parse_qs(request.url.query.decode()),
+            body,
+        )
+        return httpx.Response(status, json=data, request=request)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size, or the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(p) - 1]
+
+
+class SoakHarness:
+    """Drives the Track and Plan engines through many accelerated cycles."""
+
+    def __init__(
+        self,
+        tasks: int = 100,
+        plan: bool = True,
+        faults: FaultPlan | None = None,
+        churn: float = 0.05,
+        time_scale: float = 0.01,
+        rss_every: int = 50,
+        seed: int = 0,
+    ):
+        """Initialize soak harness.
+
+        Args:
+            tasks: Number of Anytype tasks in the stand-in space
+            plan: Whether to run the Plan engine as well as Track
+            faults: Fault probabilities, defaults to FaultPlan()
+            churn: Fraction of tasks and entries edited between cycles
+            time_scale: Multiplier for retry sleeps and breaker cooldowns
+            rss_every: Cycles between RSS samples
+            seed: Random seed for data, edits and faults
+        """
+        self.faults = faults or FaultPlan()
+        self.churn = churn
+        self.time_scale = time_scale
+        self.rss_every = rss_every
+        self.stats = SoakStats()
+        self.apis = StandInApis(tasks, seed)
+        self.server = StandInServer(self.apis, self.faults, self.stats)
+        self.plan = plan
+
+    def _transport(self) -> httpx.BaseTransport:
+        return RedirectTransport(self.server.port)
+
+    def _shorten_timeouts(self, client: httpx.Client):
+        client.timeout = httpx.Timeout(self.faults.timeout_seconds)
+
+    def build_engines(self) -> list:
+        token = f"soak-{id(self)}"
+        # Stand-ins have no quota; keep the local budgets out of the way
+        for scope in ("org", "user"):
+            quota_for(token, scope, 10**9)
+
+        anytype = AnytypeClient(
+            "http://anytype.soak", "soak", SPACE_ID, transport=self._transport()
+        )
+        toggl = TogglClient(token, WORKSPACE_ID, transport=self._transport())
+        self._shorten_timeouts(anytype.client)
+        self._shorten_timeouts(toggl.client)
+        engines = [SyncEngine(anytype, toggl)]
+
+        if self.plan:
+            token_db = os.path.join(tempfile.mkdtemp(prefix="anytoggl-soak-"), "t.db")
+            toggl_plan = TogglPlanClient(
+                PLAN_WORKSPACE_ID,
+                "soak",
+                "soak",
+                "soak",
+                "soak",
+                token_db_path=token_db,
+                transport=self._transport(),
+            )
+            self._shorten_timeouts(toggl_plan.client)
+            engines.append(PlanSyncEngine(anytype, toggl_plan, TaskScheduler()))
+        return engines
+
+    def _count_log(self, message):
+        level = message.record["level"].name
+        self.stats.log_records[level] = self.stats.log_records.get(level, 0) + 1
+
+    def run(self, cycles: int, progress_every: int = 500) -> dict:
+        """Run the soak and return the report."""
+        set_time_scale(self.time_scale)
+        sink = logger.add(self._count_log, level="DEBUG")
+        self.server.start()
+        try:
+            engines = self.build_engines()
+            started = time.monotonic()
+            for cycle in range(1, cycles + 1):
+                self.apis.churn(self.churn)
+                for engine in engines:
+                    cycle_started = time.perf_counter()
+                    try:
+                        engine.run()
+                    except Exception as e:
+                        self.stats.failed_cycles += 1
+                        logger.debug(f"Soak cycle {cycle} failed: {e}")
+                    self.stats.cycle_seconds.append(time.perf_counter() - cycle_started)
+                if cycle % self.rss_every == 0 or cycle == 1:
+                    self.stats.rss_samples.append((cycle, _rss_bytes()))
+                if progress_every and cycle % progress_every == 0:
+                    logger.info(
+                        f"Soak cycle {cycle}/{cycles} "
+                        f"({time.monotonic() - started:.0f}s, "
+                        f"RSS {_rss_bytes() / 2**20:.1f} MiB)"
+                    )
+        finally:
+            logger.remove(sink)
+            self.server.stop()
+            close_transports()
+            set_time_scale(1.0)
+        return self.report()
+
+    def report(self) -> dict:
+        stats = self.stats
+        durations = stats.cycle_seconds
+        rss = stats.rss_samples
+        wasted = sum(
+            stats.faults.get(k, 0) for k in ("rate_limited", "server_error", "timeout")
+        )
+        growth = 0.0
+        if len(rss) >= 2 and rss[-1][0] > rss[0][0]:
+            growth = (rss[-1][1] - rss[0][1]) / (rss[-1][0] - rss[0][0]) * 1000
+        return {
+            "cycles": len(durations),
+            "failed_cycles": stats.failed_cycles,
+            "cycle_ms": {
+                "p50": round(_percentile(durations, 50) * 1000, 2),
+                "p90": round(_percentile(durations, 90) * 1000, 2),
+                "p99": round(_percentile(durations, 99) * 1000, 2),
+                "max": round(max(durations, default=0) * 1000, 2),
+            },
+            "requests": stats.requests,
+            "faults": stats.faults,
+            "wasted_requests": wasted,
+            "wasted_ratio": round(wasted / stats.requests, 4) if stats.requests else 0,
+            "rss_mib": {
+                "first": round(rss[0][1] / 2**20, 1) if rss else None,
+                "last": round(rss[-1][1] / 2**20, 1) if rss else None,
+                "peak": round(max(r for _, r in rss) / 2**20, 1) if rss else None,
+                "growth_kib_per_1000_cycles": round(growth / 1024, 1),
+            },
+            "rss_samples": rss,
+            "log_records": stats.log_records,
+        }
+
+
+def main(
+    cycles: int = 2000,
+    tasks: int = 100,
+    plan: bool = True,
+    rate_limited: float = 0.02,
+    server_error: float = 0.02,
+    timeout: float = 0.005,
+    slow: float = 0.05,
+    churn: float = 0.05,
+    time_scale: float = 0.01,
+    log_level: str = "ERROR",
+    output: str | None = None,
+):
+    """Soak the sync engines against local stand-in APIs with injected faults"""
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+    faults = FaultPlan(
+        rate_limited=rate_limited, server_error=server_error, timeout=timeout, slow=slow
+    )
+    harness = SoakHarness(
+        tasks=tasks, plan=plan, faults=faults, churn=churn, time_scale=time_scale
+    )
+    report = harness.run(cycles)
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+    summary = {k: v for k, v in report.items() if k != "rss_samples"}
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,197 @@
+# tests/test_request_budgets.py
+import os
+import tempfile
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+import pytest
+from loguru import logger
+from anytoggl.cache import configure_cache
+from anytoggl.clients.anytype import AnytypeClient
+from anytoggl.clients.toggl import TogglClient
+from anytoggl.clients.toggl_plan import TogglPlanClient
+from anytoggl.plan_sync_engine import PlanSyncEngine
+from anytoggl.quota import quota_for
+from anytoggl.scheduler import TaskScheduler
+from anytoggl.sync_engine import SyncEngine
+from benchmarks.soak import (
+    PLAN_WORKSPACE_ID,
+    SPACE_ID,
+    WORKSPACE_ID,
+    CountingTransport,
+    StandInApis,
+)
+
+# Tasks in the stand-in space; budgets scale with it
+TASKS = 20
+
+ANYTYPE = "anytype.budget"
+TRACK = "api.track.toggl.com"
+PLAN = "api.plan.toggl.com"
+
+
+def _edit_one_task(apis: StandInApis):
+    apis.edit_task("task-0", name="Budget task renamed")
+
+
+def _add_project(apis: StandInApis):
+    apis.edit_task("task-0", project=apis.add_project("Budget project"))
+
+
+def _stop_timer(apis: StandInApis):
+    apis.stop_timer(1800)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A sync situation whose measured cycle has a request budget."""
+
+    name: str
+    warmup: int  # cycles run before the measured one
+    change: Callable[[StandInApis], None] | None = None
+
+
+SCENARIOS = [
+    Scenario("first-sync", warmup=0),
+    Scenario("steady-state", warmup=2),
+    Scenario("one-edit", warmup=2, change=_edit_one_task),
+    Scenario("new-project", warmup=2, change=_add_project),
+    Scenario("timer-stopped", warmup=2, change=_stop_timer),
+]
+
+# Most requests one measured cycle may send, per (scenario, engine) and
+# (host, endpoint), as a function of the number of tasks. Endpoints not
+# listed have a budget of 0.
+BUDGETS: dict[tuple[str, str], dict[tuple[str, str], Callable[[int], int]]] = {
+    ("first-sync", "track"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (ANYTYPE, "PATCH /v1/spaces/{space}/objects/{id}"): lambda n: n,
+        (TRACK, "GET /api/v9/me/time_entries"): lambda n: 1,
+        (TRACK, "POST /api/v9/workspaces/{id}/time_entries"): lambda n: n,
+    },
+    ("steady-state", "track"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (TRACK, "GET /api/v9/me/time_entries"): lambda n: 1,
+    },
+    ("one-edit", "track"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (TRACK, "GET /api/v9/me/time_entries"): lambda n: 1,
+        (TRACK, "PUT /api/v9/workspaces/{id}/time_entries/{id}"): lambda n: 1,
+    },
+    ("new-project", "track"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (ANYTYPE, "GET /v1/spaces/{space}/objects/{id}"): lambda n: 1,
+        (TRACK, "GET /api/v9/me/time_entries"): lambda n: 1,
+        (TRACK, "GET /api/v9/me/projects/paginated"): lambda n: 1,
+        (TRACK, "POST /api/v9/workspaces/{id}/projects"): lambda n: 1,
+        (TRACK, "PUT /api/v9/workspaces/{id}/time_entries/{id}"): lambda n: 1,
+    },
+    ("timer-stopped", "track"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        # Status pull and tracked-time rollup of the stopped task
+        (ANYTYPE, "PATCH /v1/spaces/{space}/objects/{id}"): lambda n: 2,
+        (TRACK, "GET /api/v9/me/time_entries"): lambda n: 1,
+    },
+    ("first-sync", "plan"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (ANYTYPE, "PATCH /v1/spaces/{space}/objects/{id}"): lambda n: n,
+        (PLAN, "GET /api/v5/{id}/projects"): lambda n: 1,
+        (PLAN, "POST /api/v5/{id}/projects"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/tasks"): lambda n: 1,
+        (PLAN, "POST /api/v5/{id}/tasks"): lambda n: n,
+    },
+    ("steady-state", "plan"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/tasks"): lambda n: 1,
+    },
+    ("one-edit", "plan"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/tasks"): lambda n: 1,
+        (PLAN, "PUT /api/v5/{id}/tasks/{id}"): lambda n: 1,
+    },
+    ("new-project", "plan"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (ANYTYPE, "GET /v1/spaces/{space}/objects/{id}"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/projects"): lambda n: 1,
+        (PLAN, "POST /api/v5/{id}/projects"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/tasks"): lambda n: 1,
+        (PLAN, "PUT /api/v5/{id}/tasks/{id}"): lambda n: 1,
+    },
+    # Plan has no timers: a stopped Track timer is a steady-state cycle
+    ("timer-stopped", "plan"): {
+        (ANYTYPE, "POST /v1/spaces/{space}/search"): lambda n: 1,
+        (PLAN, "GET /api/v5/{id}/tasks"): lambda n: 1,
+    },
+}
+
+
+def _build_engine(engine: str, transport: CountingTransport):
+    anytype = AnytypeClient(f"http://{ANYTYPE}", "budget", SPACE_ID, transport)
+    if engine == "track":
+        token = f"budget-{id(transport)}"
+        # Stand-ins have no quota; keep the local budgets out of the way
+        for scope in ("org", "user"):
+            quota_for(token, scope, 10**9)
+        return SyncEngine(
+            anytype, TogglClient(token, WORKSPACE_ID, transport=transport)
+        )
+
+    token_db = os.path.join(tempfile.mkdtemp(prefix="anytoggl-budget-"), "t.db")
+    toggl_plan = TogglPlanClient(
+        PLAN_WORKSPACE_ID,
+        "budget",
+        "budget",
+        "budget",
+        "budget",
+        token_db_path=token_db,
+        transport=transport,
+    )
+    # A full working day, so every task gets a slot whatever the time
+    return PlanSyncEngine(anytype, toggl_plan, TaskScheduler(start_hour=0, end_hour=24))
+
+
+def measure(scenario: Scenario, engine: str, tasks: int) -> Counter[tuple[str, str]]:
+    """Count the requests of the measured cycle of a scenario.
+
+    Args:
+        scenario: Scenario to run
+        engine: "track" or "plan"
+        tasks: Number of Anytype tasks in the stand-in space
+
+    Returns:
+        Requests per (host, endpoint)
+    """
+    # Nothing cached from an earlier scenario
+    configure_cache(None)
+    apis = StandInApis(tasks)
+    transport = CountingTransport(apis)
+    sync = _build_engine(engine, transport)
+    for _ in range(scenario.warmup):
+        sync.run()
+    if scenario.change:
+        scenario.change(apis)
+    transport.counts.clear()
+    sync.run()
+    return transport.counts
+
+
+@pytest.fixture(autouse=True)
+def quiet_engines():
+    # Per-task log lines of the engines would drown the report
+    logger.disable("anytoggl")
+    yield
+    logger.enable("anytoggl")
+
+
+@pytest.mark.parametrize("engine", ["track", "plan"])
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda s: s.name)
+def test_request_budget(scenario: Scenario, engine: str):
+    """No endpoint is called more often than its budget in the measured cycle."""
+    budget = BUDGETS[(scenario.name, engine)]
+    counts = measure(scenario, engine, TASKS)
+    over = []
+    for key, requests in sorted(counts.items()):
+        limit = budget[key](TASKS) if key in budget else 0
+        if requests > limit:
+            over.append(f"{' '.join(key)}: {requests} > {limit}")
+    assert not over, "Request budget exceeded:\n" + "\n".join(over)